@@ -0,0 +1,93 @@
+"""
+Compare the vectorized Board scoring kernel with the previous iterrows loop.
+
+    python benchmarks/bench_board_recommend.py --players 600 --repeat 50
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import app  # noqa: E402
+
+
+def synthetic_rankings(players: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(0.0, 1.2, size=(players, len(app.VAL_COLS))).round(2), columns=app.VAL_COLS)
+    df.insert(0, "Name", [f"Player {i:04d}" for i in range(players)])
+    inj = np.array([""] * players, dtype=object)
+    inj[rng.random(players) < 0.05] = "INJ 6g"
+    inj[rng.random(players) < 0.02] = "X"
+    df["Inj"] = inj
+    return df
+
+
+def legacy_scores(cand, effective_cols, weights, limit=25):
+    """The pre-vectorization loop from board_recommend, kept as the reference."""
+    scores = []
+    for _, row in cand.iterrows():
+        contrib = {c: float(row[c]) * weights.get(c, 0.0) for c in effective_cols}
+        score = sum(contrib.values())
+        display_name = row["Name"]
+        if "Inj" in cand.columns:
+            inj_raw = str(row.get("Inj", "") or "").strip()
+            m = re.search(r"(?:INJ|SUSP)\s*(\d+)\s*g", inj_raw, flags=re.IGNORECASE)
+            if m:
+                display_name = f"{display_name} ({m.group(1)}g)"
+        top_items = sorted(((c, float(row[c])) for c in effective_cols if weights.get(c, 0) > 0),
+                           key=lambda x: x[1], reverse=True)[:3]
+        top_readable = []
+        for c, v in top_items:
+            label = next((lbl for lbl, vc in app.CAT_LABEL_TO_VALCOL.items() if vc == c), c)
+            top_readable.append({"stat": label, "v": round(v, 2)})
+        scores.append({"Name": display_name, "score": round(score, 3), "top": top_readable})
+    scores.sort(key=lambda x: x["score"], reverse=True)
+    return scores[:limit]
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=600, help="Synthetic pool size (default: 600).")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per implementation.")
+    parser.add_argument("--season", default="", help="Benchmark a real season (e.g. 24-25) instead.")
+    args = parser.parse_args()
+
+    if args.season:
+        ds, _ = app._load_dataset_for_recs(args.season, "nopunts")
+        df = ds.view()
+        df[app.VAL_COLS] = df[app.VAL_COLS].fillna(0.0)
+    else:
+        df = synthetic_rankings(args.players)
+
+    effective_cols = [c for c in app.VAL_COLS if c != "toV"]
+    weights = {c: 1.0 for c in effective_cols}
+    weights["3V"] = 0.0
+    for c in ("bV", "sV", "ft%V"):
+        weights[c] += 0.35
+
+    expected = legacy_scores(df, effective_cols, weights)
+    actual = app._score_candidates(df, effective_cols, weights)
+    if expected != actual:
+        raise SystemExit("Vectorized kernel output differs from the legacy loop.")
+
+    legacy_ms = _time(lambda: legacy_scores(df, effective_cols, weights), args.repeat)
+    kernel_ms = _time(lambda: app._score_candidates(df, effective_cols, weights), args.repeat)
+    print(f"players={len(df)} legacy={legacy_ms:.2f}ms kernel={kernel_ms:.3f}ms speedup={legacy_ms / kernel_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
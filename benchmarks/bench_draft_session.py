@@ -0,0 +1,83 @@
+"""
+Per-pick latency of a live draft: full-state /board/recommend versus draft-session deltas.
+
+    python benchmarks/bench_draft_session.py --teams 16 --rounds 13 --viewers 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import app  # noqa: E402
+
+
+def _stats(samples):
+    return float(np.median(samples)) * 1000.0, float(np.percentile(samples, 95)) * 1000.0
+
+
+def run(client, season, picks, my_slot, teams, viewers):
+    """Replay `picks`; returns per-pick seconds for the full POST, the delta POST and viewer polls."""
+    body = {"taken": [], "my_team": [], "scoringType": "9cat", "punts": []}
+    draft_id = client.post(f"/season/{season}/draft", json=body).get_json()["id"]
+    taken, mine = [], []
+    full, delta, polls = [], [], []
+    for i, name in enumerate(picks):
+        taken.append(name)
+        is_mine = i % teams == my_slot
+        if is_mine:
+            mine.append(name)
+
+        t0 = time.perf_counter()
+        client.post(f"/season/{season}/board/recommend", json=dict(body, taken=taken, my_team=mine))
+        full.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        r = client.post(f"/draft/{draft_id}", json={"add": [name], "my_add": [name] if is_mine else []})
+        delta.append(time.perf_counter() - t0)
+        version = r.get_json()["version"]
+
+        for _ in range(viewers):
+            t0 = time.perf_counter()
+            client.get(f"/draft/{draft_id}?since={version - 1}")
+            polls.append(time.perf_counter() - t0)
+    return full, delta, polls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--season", help="Season key (default: latest with rankings).")
+    parser.add_argument("--teams", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=13)
+    parser.add_argument("--slot", type=int, default=1, help="My draft slot (1-based).")
+    parser.add_argument("--viewers", type=int, default=4, help="Viewers polling after each pick.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    app.DATABASE = os.path.join(tempfile.mkdtemp(), "bench.db")
+    app.init_db()
+    season = args.season or sorted(app.data_files)[-1]
+    ds, _ = app._load_dataset_for_recs(season, "nopunts")
+    names = list(ds.df["Name"].astype(str))
+    # Roughly ADP order: rank order with a little noise.
+    rng = random.Random(args.seed)
+    order = sorted(range(len(names)), key=lambda i: i + rng.gauss(0, 8))
+    picks = [names[i] for i in order[: args.teams * args.rounds]]
+
+    client = app.app.test_client()
+    run(client, season, picks[: args.teams], args.slot - 1, args.teams, 0)  # warm caches
+    full, delta, polls = run(client, season, picks, args.slot - 1, args.teams, args.viewers)
+
+    print(f"{season}: {len(ds)} players, {len(picks)} picks, {args.viewers} viewers")
+    for label, samples in (("full POST", full), ("delta", delta), ("poll", polls)):
+        med, p95 = _stats(samples)
+        print(f"{label:10s} median {med:8.3f} ms   p95 {p95:8.3f} ms")
+    print(f"speedup  {_stats(full)[0] / _stats(delta)[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Stat leaders for one season: BasicParser's full sorts versus partial top-k selection.
+
+    python benchmarks/bench_leaderboards.py --season 24-25 --repeat 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import app  # noqa: E402
+from leaderboards import CATEGORIES, MIN_ATTEMPTS, leaders, stat_matrix  # noqa: E402
+
+
+def full_sorts(df, k):
+    """The old approach: one sort_values(...).head(k) per category."""
+    out = {}
+    for label, col, ascending, attempts in CATEGORIES:
+        d = df if attempts is None else df[df[attempts] * df["g"] >= MIN_ATTEMPTS[attempts]]
+        out[label] = d[["Name", "Team", col]].sort_values(by=col, ascending=ascending).head(k)
+    return out
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000.0, float(np.percentile(samples, 95)) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--season", default="24-25")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    ds, _ = app._load_dataset_for_recs(args.season, "nopunts")
+    if ds is None:
+        raise SystemExit(f"No rankings for {args.season}")
+    values = stat_matrix(ds)
+    client = app.app.test_client()
+
+    old = _time(lambda: full_sorts(ds.df, args.k), args.repeat)
+    new = _time(lambda: leaders(ds.df, k=args.k, values=values), args.repeat)
+    http = _time(lambda: client.get(f"/season/{args.season}/leaders?k={args.k}"), args.repeat)
+
+    print(f"{args.season}: {len(ds)} players, {len(CATEGORIES)} categories, top {args.k}")
+    print(f"full sorts  median {old[0]:8.3f} ms   p95 {old[1]:8.3f} ms")
+    print(f"top-k       median {new[0]:8.3f} ms   p95 {new[1]:8.3f} ms")
+    print(f"endpoint    median {http[0]:8.3f} ms   p95 {http[1]:8.3f} ms (cached)")
+    print(f"speedup     {old[0] / new[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
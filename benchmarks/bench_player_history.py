@@ -0,0 +1,68 @@
+"""
+Latency of a player's multi-season history: per-season datasets versus the cross-season store.
+
+    python benchmarks/bench_player_history.py --repeat 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import app  # noqa: E402
+
+
+def per_season(name):
+    """The old way: look the player up in every season's dataset (warm in-process caches)."""
+    out = []
+    for season in sorted(app.data_files):
+        ds = app._load_dataset(season, "nopunts")
+        rows, _ = ds.lookup([name]) if ds is not None else ((), [])
+        if len(rows):
+            out.append(ds.df.iloc[rows[0]].to_dict())
+    return out
+
+
+def _time(fn, names, repeat, seed=11):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(repeat):
+        name = rng.choice(names)
+        t0 = time.perf_counter()
+        fn(name)
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000.0, float(np.percentile(samples, 95)) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=500, help="Timed lookups per variant.")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    for season in app.data_files:
+        app._load_dataset(season, "nopunts")
+    per_season_load = time.perf_counter() - t0
+    app.PLAYER_HISTORY_CACHE.clear()
+    t0 = time.perf_counter()
+    store = app._player_history()
+    store_load = time.perf_counter() - t0
+    names = sorted({str(n) for n in store.names})
+    client = app.app.test_client()
+
+    old = _time(per_season, names, args.repeat)
+    new = _time(lambda n: store.history(n, "nopunts"), names, args.repeat)
+    http = _time(lambda n: client.get(f"/player/{n}/history"), names, args.repeat)
+
+    print(f"{len(store)} rows, {len(names)} players, {len(store.seasons)} seasons")
+    print(f"load     per-season {per_season_load * 1000:8.1f} ms   store {store_load * 1000:8.1f} ms")
+    print(f"per-season median {old[0]:8.3f} ms   p95 {old[1]:8.3f} ms")
+    print(f"store      median {new[0]:8.3f} ms   p95 {new[1]:8.3f} ms")
+    print(f"endpoint   median {http[0]:8.3f} ms   p95 {http[1]:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
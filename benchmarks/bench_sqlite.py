@@ -0,0 +1,122 @@
+"""
+Compare per-request DB work before and after pooled connections and indexes.
+
+    python benchmarks/bench_sqlite.py --teams 100000 --repeat 200
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import app  # noqa: E402
+
+USERS = 500
+SEASONS = ["21-22", "22-23", "23-24", "24-25", "25-26"]
+
+
+def populate(path: str, teams: int, league: int, seed: int = 7) -> None:
+    """Fill a fresh DB with `teams` saved-team rows and `league` league-team rows."""
+    app.DATABASE = path
+    app.init_db()
+    rng = random.Random(seed)
+    start = datetime(2021, 10, 1)
+    db = app._connect()
+    db.executemany(
+        "INSERT INTO teams(user_id,season,players,ir_players,data_type,created_at) VALUES(?,?,?,?,?,?)",
+        (
+            (rng.randint(1, USERS), rng.choice(SEASONS), '["A","B","C"]', "[]", "nopunts",
+             (start + timedelta(minutes=rng.randint(0, 2_000_000))).isoformat())
+            for _ in range(teams)
+        ),
+    )
+    db.executemany(
+        "INSERT INTO league_teams(user_id,season,team_name,players,ir_players,data_type,created_at) VALUES(?,?,?,?,?,?,?)",
+        (
+            (rng.choice([None] + list(range(1, USERS + 1))), rng.choice(SEASONS), f"Team {i}", '["A","B"]', "[]",
+             "nopunts", (start + timedelta(minutes=i)).isoformat())
+            for i in range(league)
+        ),
+    )
+    db.commit()
+    db.close()
+
+
+def legacy_request(path, user_id, season):
+    """The old pattern: a fresh connection per query and datetime() ordering."""
+    for _ in range(3):
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            "SELECT players, ir_players, data_type FROM teams WHERE user_id=? AND season=? "
+            "ORDER BY datetime(created_at) DESC LIMIT 1",
+            (user_id, season),
+        ).fetchone()
+    conn.execute(
+        "SELECT id, team_name, players FROM league_teams WHERE season=? AND (user_id=? OR user_id IS NULL) "
+        "ORDER BY created_at DESC",
+        (season, user_id),
+    ).fetchall()
+
+
+def pooled_request(user_id, season):
+    """The same queries as one request makes them now."""
+    with app.app.app_context():
+        for _ in range(3):
+            app.get_db().execute(
+                "SELECT players, ir_players, data_type FROM teams WHERE user_id=? AND season=? "
+                "ORDER BY created_at DESC, id DESC LIMIT 1",
+                (user_id, season),
+            ).fetchone()
+        app.get_db().execute(
+            "SELECT id, team_name, players FROM league_teams WHERE " + app.LEAGUE_SCOPE + " ORDER BY created_at DESC",
+            app._league_scope(season, user_id),
+        ).fetchall()
+
+
+def _time(fn, repeat, seed=11):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(repeat):
+        args = (rng.randint(1, USERS), rng.choice(SEASONS))
+        t0 = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000.0, float(np.percentile(samples, 95)) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--teams", type=int, default=100_000, help="Saved-team rows (default: 100000).")
+    parser.add_argument("--league", type=int, default=20_000, help="League-team rows (default: 20000).")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed requests per variant.")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    old_db, new_db = os.path.join(tmp, "old.db"), os.path.join(tmp, "new.db")
+    populate(new_db, args.teams, args.league)
+    populate(old_db, args.teams, args.league)
+    conn = sqlite3.connect(old_db)
+    conn.execute("DROP INDEX idx_teams_user_season_created")
+    conn.execute("DROP INDEX idx_league_teams_season_user")
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+    legacy = _time(lambda u, s: legacy_request(old_db, u, s), args.repeat)
+    app.DATABASE = new_db
+    pooled = _time(pooled_request, args.repeat)
+
+    print(f"{args.teams} teams rows, {args.league} league rows, {args.repeat} requests")
+    print(f"legacy   median {legacy[0]:8.3f} ms   p95 {legacy[1]:8.3f} ms")
+    print(f"pooled   median {pooled[0]:8.3f} ms   p95 {pooled[1]:8.3f} ms")
+    print(f"speedup  {legacy[0] / pooled[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
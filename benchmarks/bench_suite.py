@@ -0,0 +1,298 @@
+"""
+Latency and allocation benchmarks for CourtCraft hot paths on synthetic leagues.
+
+    python benchmarks/bench_suite.py --players 500 2000 --teams 8 30 --repeat 100
+    python benchmarks/bench_suite.py --compare benchmarks/results/<old>.json
+
+Each player-pool size gets a synthetic rankings workbook and each league size
+gets its own user with league teams and a long saved-team history, all in a
+temp directory and SQLite DB. Routes run through the Flask test client and
+helpers are called directly. Results (p50/p95/p99 ms and peak traced
+allocation per operation) are written as JSON so runs from different commits
+can be diffed with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import app  # noqa: E402
+import rankings_store  # noqa: E402
+from headshots import HeadshotResolver  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+TEAMS = ["ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DAL", "DEN", "DET", "GSW", "HOU", "IND", "LAC", "LAL", "MEM",
+         "MIA", "MIL", "MIN", "NOP", "NYK", "OKC", "ORL", "PHI", "PHO", "POR", "SAC", "SAS", "TOR", "UTA", "WAS"]
+POSITIONS = ["PG", "SG", "SF", "PF", "C", "PG,SG", "SF,PF", "PF,C"]
+ROSTER_SIZE = 13
+# --compare flags a p50 slowdown beyond this ratio, ignoring differences under REGRESSION_FLOOR_MS.
+REGRESSION_RATIO = 1.10
+REGRESSION_FLOOR_MS = 0.05
+
+
+# -----------------------------------------------------------------------------
+# Synthetic data
+# -----------------------------------------------------------------------------
+def synthetic_rankings(players: int, seed: int = 7) -> pd.DataFrame:
+    """A BBM-shaped rankings sheet: per-game stats, z-score values, injuries, sorted by Value."""
+    rng = np.random.default_rng(seed)
+    first = ["Jalen", "Jaylen", "Marcus", "Tyrese", "Luka", "Nikola", "Anthony", "Devin", "Scottie", "Cade",
+             "Paolo", "Evan", "Jamal", "Trae", "Zion", "Bam", "Domantas", "Victor", "Chet", "Franz"]
+    last = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Garcia", "Wilson", "Moore",
+            "Taylor", "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Robinson", "Clark", "Lewis"]
+    names = [f"{first[i % len(first)]} {last[(i // len(first)) % len(last)]} {i:04d}" for i in range(players)]
+    vals = rng.normal(0.0, 1.0, size=(players, len(app.VAL_COLS))).round(3)
+    df = pd.DataFrame(vals, columns=app.VAL_COLS)
+    df.insert(0, "Name", names)
+    df.insert(1, "Team", rng.choice(TEAMS, players))
+    df.insert(2, "Pos", rng.choice(POSITIONS, players))
+    inj = np.array([""] * players, dtype=object)
+    inj[rng.random(players) < 0.05] = "INJ 6g"
+    inj[rng.random(players) < 0.02] = "X"
+    df.insert(3, "Inj", inj)
+    df["g"] = rng.integers(1, 82, players)
+    df["m/g"] = rng.uniform(8, 38, players).round(2)
+    for col, scale in (("p/g", 12), ("3/g", 1.4), ("r/g", 5), ("a/g", 3.5), ("s/g", 0.8), ("b/g", 0.6),
+                       ("fga/g", 9), ("fta/g", 2.5), ("to/g", 1.6)):
+        df[col] = rng.gamma(2.0, scale / 2.0, players).round(2)
+    df["fg%"] = rng.normal(0.47, 0.05, players).clip(0.3, 0.75).round(3)
+    df["ft%"] = rng.normal(0.77, 0.08, players).clip(0.4, 0.95).round(3)
+    df["USG"] = rng.uniform(10, 35, players).round(1)
+    df["Value"] = df[app.VAL_COLS].mean(axis=1).round(3)
+    df = df.sort_values("Value", ascending=False, kind="stable").reset_index(drop=True)
+    df.insert(0, "Rank", np.arange(1, players + 1))
+    df.insert(0, "Round", (df["Rank"] - 1) // 12 + 1)
+    return df
+
+
+def setup_season(tmp: str, players: int) -> tuple:
+    """Write a synthetic workbook and register it as its own season; returns (season, names)."""
+    season = f"p{players}"
+    df = synthetic_rankings(players, seed=players)
+    fname = f"BBM_PlayerRankings_{season}_nopunt.xlsx"
+    df.to_excel(os.path.join(tmp, fname), index=False)
+    app.data_files = {**app.data_files, season: {"nopunts": fname}}
+    app.season_data[season] = {"title": f"Synthetic {players}-player season"}
+    return season, df["Name"].tolist()
+
+
+def setup_league(client, season: str, names, teams: int, history: int, seed: int = 3):
+    """Log in a fresh user with `teams` league teams and `history` saved-team rows; returns rosters."""
+    rng = random.Random(seed + teams)
+    username = f"bench_{season}_{teams}"
+    client.post("/register", data={"username": username, "password": "x", "confirm_password": "x"})
+    client.post("/login", data={"username": username, "password": "x"})
+    pool = names[: teams * ROSTER_SIZE + ROSTER_SIZE]
+    rosters = [pool[i::teams + 1][:ROSTER_SIZE] for i in range(teams + 1)]
+    mine = rosters.pop()
+
+    db = app._connect()
+    user_id = db.execute("SELECT id FROM users WHERE username=?", (username,)).fetchone()["id"]
+    start = datetime(2024, 10, 1)
+    for i, roster in enumerate(rosters):
+        cur = db.execute(
+            "INSERT INTO league_teams(user_id,season,team_name,players,ir_players,data_type,created_at) "
+            "VALUES(?,?,?,?,?,?,?)",
+            (user_id, season, f"Team {i + 1}", json.dumps(roster), "[]", "nopunts",
+             (start + timedelta(minutes=i)).isoformat()),
+        )
+        app.set_league_team_players(db, cur.lastrowid, roster, [])
+    # Long saved-team history spread across many users, then the user's own current roster.
+    db.executemany(
+        "INSERT INTO teams(user_id,season,players,ir_players,data_type,created_at) VALUES(?,?,?,?,?,?)",
+        (
+            (rng.randint(1, 1000), season, json.dumps(rng.sample(names, ROSTER_SIZE)), "[]", "nopunts",
+             (start + timedelta(minutes=rng.randint(0, 500_000))).isoformat())
+            for _ in range(history)
+        ),
+    )
+    app.save_roster(db, user_id, season, mine, [], "nopunts")
+    db.commit()
+    db.close()
+    return mine, rosters
+
+
+# -----------------------------------------------------------------------------
+# Operations
+# -----------------------------------------------------------------------------
+def operations(client, season, names, mine, rosters, seed=11):
+    """[(name, fn)] for one season/league; each fn runs one operation."""
+    rng = random.Random(seed)
+    ds, _ = app._load_dataset_for_recs(season, "nopunts")
+    taken = [n for r in rosters for n in r[:5]]
+    draft_id = client.post(f"/season/{season}/draft", json={"taken": taken, "my_team": mine}).get_json()["id"]
+    toggle = {"on": False}
+    league_rows = [
+        {"id": i, "team_name": f"Team {i + 1}", "players": r, "ir_players": [], "data_type": "nopunts",
+         "created_at": ""}
+        for i, r in enumerate(rosters)
+    ]
+    terms = [n[: rng.randint(2, 5)].lower() for n in rng.sample(names, 50)]
+    team_form = {f"player{i + 1}": n for i, n in enumerate(mine)}
+    team_form["data_type"] = "nopunts"
+    trade_form = {
+        "my_roster": "\n".join(mine), "send_players": "\n".join(mine[:2]),
+        "receive_players": "\n".join(rosters[0][:2]), "data_type": "nopunts", "action": "analyze",
+    }
+
+    def draft_delta():
+        toggle["on"] = not toggle["on"]
+        key = "add" if toggle["on"] else "remove"
+        client.post(f"/draft/{draft_id}", json={key: [names[-1]]})
+
+    def power_rankings_cold():
+        app.LEAGUE_RANKINGS_CACHE.clear()
+        app._compute_league_power_rankings(season, league_rows)
+
+    return [
+        ("route.board_recommend", lambda: client.post(
+            f"/season/{season}/board/recommend", json={"taken": taken, "my_team": mine})),
+        ("route.draft_delta", draft_delta),
+        ("helper.league_power_rankings", power_rankings_cold),
+        ("helper.league_power_rankings_cached", lambda: app._compute_league_power_rankings(season, league_rows)),
+        ("route.league_teams", lambda: client.get(f"/season/{season}/league-teams")),
+        ("helper.analyze_trade_side", lambda: app._analyze_trade_side(
+            ds, mine, mine[:2], rosters[0][:2], app.VAL_COLS)),
+        ("route.trade", lambda: client.post(f"/season/{season}/trade", data=trade_form)),
+        ("route.team_assemble_get", lambda: client.get(f"/season/{season}/team")),
+        ("route.team_assemble_post", lambda: client.post(f"/season/{season}/team", data=team_form)),
+        ("route.autocomplete", lambda: client.get(f"/autocomplete/{season}?term={rng.choice(terms)}")),
+        ("route.leaders", lambda: client.get(f"/season/{season}/leaders")),
+    ]
+
+
+def measure(fn, repeat: int, warmup: int, alloc_repeat: int) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    ms = np.array(samples) * 1000.0
+
+    # A separate traced pass so tracemalloc overhead does not skew the timings.
+    peaks = []
+    tracemalloc.start()
+    for _ in range(alloc_repeat):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return {
+        "n": repeat,
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "alloc_peak_kb": round(float(np.median(peaks)) / 1024.0, 1) if peaks else None,
+    }
+
+
+# -----------------------------------------------------------------------------
+# Reporting
+# -----------------------------------------------------------------------------
+def _commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def _key(r) -> str:
+    return f"{r['op']} players={r['players']} teams={r['teams']}"
+
+
+def compare(old_path: str, new: dict, ratio_limit: float = REGRESSION_RATIO) -> int:
+    """Print p50/p95 ratios against an older results file; returns the number of regressions."""
+    with open(old_path) as fh:
+        old = {_key(r): r for r in json.load(fh)["results"]}
+    regressions = 0
+    print(f"\nvs {os.path.basename(old_path)} ({old and next(iter(old.values())).get('commit', '?')})")
+    for r in new["results"]:
+        prev = old.get(_key(r))
+        if prev is None:
+            continue
+        ratio = r["p50_ms"] / prev["p50_ms"] if prev["p50_ms"] else float("inf")
+        slower = r["p50_ms"] - prev["p50_ms"] > REGRESSION_FLOOR_MS
+        flag = "  REGRESSION" if ratio > ratio_limit and slower else ""
+        regressions += bool(flag)
+        print(f"{_key(r):60s} p50 {prev['p50_ms']:9.3f} -> {r['p50_ms']:9.3f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="+", default=[500, 2000], help="Player-pool sizes.")
+    parser.add_argument("--teams", type=int, nargs="+", default=[8, 30], help="League sizes.")
+    parser.add_argument("--history", type=int, default=20_000, help="Saved-team history rows per league.")
+    parser.add_argument("--repeat", type=int, default=100, help="Timed runs per operation.")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed runs first (fills caches).")
+    parser.add_argument("--alloc-repeat", type=int, default=10, help="Traced runs for allocation peaks.")
+    parser.add_argument("--only", action="append", help="Run operations whose name contains this (repeatable).")
+    parser.add_argument("--out", help="Results JSON path (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", help="Older results JSON to diff against; exits 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_RATIO,
+                        help=f"p50 ratio counted as a regression (default: {REGRESSION_RATIO}).")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="courtcraft-bench-")
+    rankings_store.COMPILED_DIR = os.path.join(tmp, "compiled")
+    app.DATABASE = os.path.join(tmp, "bench.db")
+    app.data_dirs = {"nopunts": tmp, "tovpunt": tmp}
+    app.HEADSHOTS = HeadshotResolver(db_path=os.path.join(tmp, "headshots.db"), fetch=lambda url: {"data": []})
+    app.DRAFT_PERSIST = False
+    app.init_db()
+
+    commit = _commit()
+    results = []
+    for players in args.players:
+        season, names = setup_season(tmp, players)
+        for teams in args.teams:
+            client = app.app.test_client()
+            mine, rosters = setup_league(client, season, names, teams, args.history)
+            for op, fn in operations(client, season, names, mine, rosters):
+                if args.only and not any(s in op for s in args.only):
+                    continue
+                r = dict(op=op, players=players, teams=teams, commit=commit,
+                         **measure(fn, args.repeat, args.warmup, args.alloc_repeat))
+                results.append(r)
+                print(f"{_key(r):60s} p50 {r['p50_ms']:9.3f}  p95 {r['p95_ms']:9.3f}  "
+                      f"p99 {r['p99_ms']:9.3f} ms  peak {r['alloc_peak_kb']:9.1f} KB", flush=True)
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "args": vars(args),
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"wrote {out}")
+
+    if args.compare and compare(args.compare, report, args.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,46 @@
 import os
+import sys
 import itertools
 import sqlite3
 import json
+import gzip
+import hashlib
 import re
-import urllib.parse
-import urllib.request
+import numpy as np
 import pandas as pd
+import threading
 import traceback
+from collections import OrderedDict
 from flask import (
     Flask, render_template, request, jsonify,
-    session, flash, redirect, url_for
+    session, flash, redirect, url_for, g, has_app_context, send_file
 )
-from datetime import datetime
+from datetime import datetime, timedelta
     # markupsafe is used for tiny HTML markers in table cells
 from markupsafe import Markup
 from werkzeug.security import generate_password_hash, check_password_hash
-from sync_bbm_rankings import sync_nopunt_xlsx
+from sync_bbm_rankings import (
+    SEASON_FIELD, VARIANTS as SYNC_VARIANTS, _runtime_filename_for_season_key, _season_start_year, sync_rankings_xlsx,
+)
+from rankings_store import _read_excel_bytes, _normalize_rankings_df, load_rankings
+from name_search import NameSearchIndex
+from season_dataset import SeasonDataset
+from scoring import category_weights
+from trade_finder import find_trades
+from jobs import start_job, get_job
+from league_scan import scan_league
+from draft_sim import simulate_drafts
+from draft_session import (
+    DraftSession, SESSION_TTL as DRAFT_SESSION_TTL, TOP_N as DRAFT_TOP_N,
+    add_session as add_draft_session, get_session as get_draft_session, touch_session as touch_draft_session,
+)
+from matchup_sim import simulate_matchup
+from punt_optimizer import optimize_pool, optimize_roster
+from value_engine import DEFAULT_POOL_SIZE, punt_view
+from headshots import HeadshotResolver, ImageCache, placeholder_url, url_version
+from player_history import TREND_COLS, load_history, trend
+from leaderboards import CATEGORIES as LEADER_CATEGORIES, MIN_ATTEMPTS, TOP_K, leaders, stat_matrix
+import metrics
 
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-change-me")
@@ -23,15 +48,65 @@ app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-change-me")
 # -----------------------------------------------------------------------------
 # DB
 # -----------------------------------------------------------------------------
-DATABASE = os.path.join(os.path.dirname(__file__), "users.db")
+DATABASE = os.getenv("COURTCRAFT_DATABASE", os.path.join(os.path.dirname(__file__), "users.db"))
+
+# Per-connection tuning; WAL itself is persistent and set once in init_db().
+DB_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+)
 
-def get_db():
-    conn = sqlite3.connect(DATABASE)
+class _TimedConnection(sqlite3.Connection):
+    """Connection whose statements and commits count towards the "sqlite" stage."""
+
+    def execute(self, *args):
+        with metrics.span("sqlite"):
+            return super().execute(*args)
+
+    def executemany(self, *args):
+        with metrics.span("sqlite"):
+            return super().executemany(*args)
+
+    def commit(self):
+        with metrics.span("sqlite"):
+            return super().commit()
+
+def _connect():
+    conn = sqlite3.connect(DATABASE, factory=_TimedConnection if metrics.ENABLED else sqlite3.Connection)
     conn.row_factory = sqlite3.Row
+    for pragma in DB_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
+def get_db():
+    """One connection per app context (i.e. per request), closed on teardown."""
+    if not has_app_context():
+        return _connect()
+    db = g.get("_db")
+    if db is None:
+        db = g._db = _connect()
+    return db
+
+# A user's league teams plus the shared (user_id IS NULL) ones. Written as two
+# equality branches so SQLite answers each from idx_league_teams_season_user
+# instead of scanning the whole season.
+LEAGUE_SCOPE = "((season=? AND user_id=?) OR (season=? AND user_id IS NULL))"
+
+def _league_scope(season, user_id):
+    return (season, user_id, season)
+
+@app.teardown_appcontext
+def close_db(exc):
+    db = g.pop("_db", None)
+    if db is not None:
+        db.close()
+
 def init_db():
-    db = get_db()
+    db = _connect()
+    db.execute("PRAGMA journal_mode=WAL")
     db.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -74,11 +149,198 @@ def init_db():
     if "user_id" not in league_cols:
         db.execute("ALTER TABLE league_teams ADD COLUMN user_id INTEGER")
 
+    # Current roster per (user, season); `teams` is kept as the compacted save history.
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS rosters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            data_type TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            UNIQUE(user_id, season),
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        );
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS roster_players (
+            roster_id INTEGER NOT NULL,
+            is_ir INTEGER NOT NULL,
+            slot INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY(roster_id, is_ir, slot),
+            FOREIGN KEY(roster_id) REFERENCES rosters(id)
+        );
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS league_team_players (
+            league_team_id INTEGER NOT NULL,
+            is_ir INTEGER NOT NULL,
+            slot INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY(league_team_id, is_ir, slot),
+            FOREIGN KEY(league_team_id) REFERENCES league_teams(id)
+        );
+    """)
+
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS draft_sessions (
+            id TEXT PRIMARY KEY,
+            season TEXT NOT NULL,
+            user_id INTEGER,
+            state TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """)
+
+    # created_at is ISO-8601, so it sorts correctly as text and the index can serve
+    # "latest team" lookups directly.
+    db.execute("CREATE INDEX IF NOT EXISTS idx_teams_user_season_created ON teams(user_id, season, created_at)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_league_teams_season_user ON league_teams(season, user_id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_draft_sessions_updated ON draft_sessions(updated_at)")
+
+    if db.execute("PRAGMA user_version").fetchone()[0] < 1:
+        _migrate_normalized_rosters(db)
+        db.execute("PRAGMA user_version=1")
+
     db.commit()
     db.close()
 
+# Saved-team history kept per (user, season); identical consecutive saves are not recorded.
+TEAM_HISTORY_LIMIT = 20
+
+def _json_list(raw):
+    try:
+        return [str(n).strip() for n in (json.loads(raw) or []) if str(n).strip()]
+    except Exception:
+        return []
+
+def _player_rows(owner_id, players, ir_players):
+    return [(owner_id, 0, i, n) for i, n in enumerate(players)] + [(owner_id, 1, i, n) for i, n in enumerate(ir_players)]
+
+def _migrate_normalized_rosters(db):
+    """One-off: fill rosters / league_team_players from the JSON columns and compact `teams`."""
+    history = {}
+    for r in db.execute("SELECT id, user_id, season, players, ir_players, data_type, created_at FROM teams ORDER BY created_at, id"):
+        history.setdefault((r["user_id"], r["season"]), []).append(r)
+    drop = []
+    for (user_id, season), saves in history.items():
+        kept = []
+        for r in saves:
+            if kept and (r["players"], r["ir_players"], r["data_type"]) == (kept[-1]["players"], kept[-1]["ir_players"], kept[-1]["data_type"]):
+                drop.append(r["id"])
+            else:
+                kept.append(r)
+        drop.extend(r["id"] for r in kept[:-TEAM_HISTORY_LIMIT])
+        latest = kept[-1]
+        cur = db.execute(
+            "INSERT OR IGNORE INTO rosters(user_id, season, data_type, updated_at) VALUES(?,?,?,?)",
+            (user_id, season, latest["data_type"], latest["created_at"]),
+        )
+        if cur.rowcount:
+            db.executemany(
+                "INSERT INTO roster_players(roster_id, is_ir, slot, name) VALUES(?,?,?,?)",
+                _player_rows(cur.lastrowid, _json_list(latest["players"]), _json_list(latest["ir_players"])),
+            )
+    db.executemany("DELETE FROM teams WHERE id=?", [(i,) for i in drop])
+
+    for r in db.execute("SELECT id, players, ir_players FROM league_teams").fetchall():
+        db.execute("DELETE FROM league_team_players WHERE league_team_id=?", (r["id"],))
+        db.executemany(
+            "INSERT INTO league_team_players(league_team_id, is_ir, slot, name) VALUES(?,?,?,?)",
+            _player_rows(r["id"], _json_list(r["players"]), _json_list(r["ir_players"])),
+        )
+
+def load_roster(db, user_id, season):
+    """Current (players, ir_players, data_type, updated_at) for a user and season, or None."""
+    rows = db.execute(
+        "SELECT r.data_type, r.updated_at, p.is_ir, p.name FROM rosters r "
+        "LEFT JOIN roster_players p ON p.roster_id = r.id "
+        "WHERE r.user_id=? AND r.season=? ORDER BY p.is_ir, p.slot",
+        (user_id, season),
+    ).fetchall()
+    if not rows:
+        return None
+    players = [r["name"] for r in rows if r["name"] is not None and not r["is_ir"]]
+    ir_players = [r["name"] for r in rows if r["name"] is not None and r["is_ir"]]
+    return players, ir_players, rows[0]["data_type"], rows[0]["updated_at"]
+
+def save_roster(db, user_id, season, players, ir_players, data_type):
+    """Replace the current roster and append it to the history when it changed. Caller commits."""
+    players = [str(n).strip() for n in players if str(n).strip()]
+    ir_players = [str(n).strip() for n in ir_players if str(n).strip()]
+    current = load_roster(db, user_id, season)
+    if current is not None and current[:3] == (players, ir_players, data_type):
+        return
+    now = datetime.now().isoformat()
+    db.execute(
+        "INSERT INTO rosters(user_id, season, data_type, updated_at) VALUES(?,?,?,?) "
+        "ON CONFLICT(user_id, season) DO UPDATE SET data_type=excluded.data_type, updated_at=excluded.updated_at",
+        (user_id, season, data_type, now),
+    )
+    roster_id = db.execute("SELECT id FROM rosters WHERE user_id=? AND season=?", (user_id, season)).fetchone()[0]
+    db.execute("DELETE FROM roster_players WHERE roster_id=?", (roster_id,))
+    db.executemany(
+        "INSERT INTO roster_players(roster_id, is_ir, slot, name) VALUES(?,?,?,?)",
+        _player_rows(roster_id, players, ir_players),
+    )
+    db.execute(
+        "INSERT INTO teams(user_id,season,players,ir_players,data_type,created_at) VALUES(?,?,?,?,?,?)",
+        (user_id, season, json.dumps(players), json.dumps(ir_players), data_type, now),
+    )
+    db.execute(
+        "DELETE FROM teams WHERE user_id=? AND season=? AND id NOT IN ("
+        "SELECT id FROM teams WHERE user_id=? AND season=? ORDER BY created_at DESC, id DESC LIMIT ?)",
+        (user_id, season, user_id, season, TEAM_HISTORY_LIMIT),
+    )
+
+def set_league_team_players(db, team_id, players, ir_players):
+    db.execute("DELETE FROM league_team_players WHERE league_team_id=?", (team_id,))
+    db.executemany(
+        "INSERT INTO league_team_players(league_team_id, is_ir, slot, name) VALUES(?,?,?,?)",
+        _player_rows(team_id, players, ir_players),
+    )
+
+def load_league_players(db, season, user_id):
+    """{league team id: (players, ir_players)} for every team in the user's league, in saved order."""
+    out = {}
+    for r in db.execute(
+        "SELECT p.league_team_id, p.is_ir, p.name FROM league_team_players p "
+        "JOIN league_teams t ON t.id = p.league_team_id WHERE " + LEAGUE_SCOPE +
+        " ORDER BY p.league_team_id, p.is_ir, p.slot",
+        _league_scope(season, user_id),
+    ):
+        out.setdefault(r["league_team_id"], ([], []))[1 if r["is_ir"] else 0].append(r["name"])
+    return out
+
 init_db()
 
+# -----------------------------------------------------------------------------
+# Metrics (COURTCRAFT_METRICS=1, see metrics.py)
+# -----------------------------------------------------------------------------
+# Nothing below is wired up when metrics are off, so requests pay no extra hooks.
+render_template = metrics.timed("render_template")(render_template)
+
+if metrics.ENABLED:
+    @app.before_request
+    def _metrics_begin():
+        metrics.begin_request()
+
+    @app.after_request
+    def _metrics_end(resp):
+        stages = metrics.end_request(request.endpoint or "unmatched", request.method, resp.status_code)
+        if stages:
+            resp.headers["Server-Timing"] = ", ".join(
+                f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages.items()
+            )
+        return resp
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus text exposition of request, stage and cache metrics."""
+    if not metrics.ENABLED:
+        return "metrics disabled (set COURTCRAFT_METRICS=1)\n", 404, {"Content-Type": "text/plain"}
+    return metrics.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
 # -----------------------------------------------------------------------------
 # Template globals
 # -----------------------------------------------------------------------------
@@ -103,6 +365,20 @@ data_files = {
     "20-21": {"nopunts": "BBM_PlayerRankings2021_nopunt.xls", "tovpunt": "BBM_PlayerRankings2021_tovpunt.xls"}
 }
 
+def _synced_data_files(files, root=os.path.dirname(__file__)):
+    """
+    `files` with every season/data type that sync_bbm_rankings.py has written a
+    runtime copy for pointing at that copy, so a CLI sync is picked up on restart.
+    """
+    seasons = set(files) | {s.replace("/", "-") for s in nba_seasons}
+    out = {season: dict(types) for season, types in files.items()}
+    for data_type in SYNC_VARIANTS:
+        for season in seasons:
+            fname = _runtime_filename_for_season_key(season, data_type)
+            if os.path.exists(os.path.join(root, data_dirs[data_type], fname)):
+                out.setdefault(season, {})[data_type] = fname
+    return out
+
 ALLOWED_EXT = {"xls", "xlsx"}
 def allowed_file(filename): return "." in filename and filename.rsplit(".",1)[1].lower() in ALLOWED_EXT
 
@@ -112,6 +388,7 @@ def get_color(value, min_val, max_val):
     return f"hsl({hue},100%,85%)"
 
 nba_seasons = [f"{y%100:02d}/{(y+1)%100:02d}" for y in range(2025, 2010, -1)]
+data_files = _synced_data_files(data_files)
 season_data = {
     "25-26": {"title": "2025/26 NBA Season"},
     "24-25": {"title": "2024/25 NBA Season"},
@@ -121,8 +398,35 @@ season_data = {
     "20-21": {"title": "2020/21 NBA Season"}
 }
 
-PLAYER_HEADSHOT_CACHE = {}
+HEADSHOTS = HeadshotResolver()
+HEADSHOT_IMAGES = ImageCache()
+HEADSHOT_MAX_AGE = 30 * 24 * 3600
+HEADSHOT_SHORT_MAX_AGE = 300
+# Lower-cased names from every registered rankings file; only these are looked up
+# upstream. Built at startup and replaced whenever a dataset is published.
+KNOWN_PLAYERS = {"names": frozenset()}
 RANKINGS_DF_CACHE = {}
+NAME_SEARCH_CACHE = {}
+PLAYERS_JSON_CACHE = {}
+PLAYER_HISTORY_CACHE = {}
+# Encoded stat-leader bodies by (dataset source, version, k, min attempts); least recently used first.
+LEADERS_CACHE = OrderedDict()
+LEADERS_CACHE_MAX = 256
+_LEADERS_CACHE_LOCK = threading.Lock()
+# Parsed custom uploads by content hash: {sha1: {"dataset", "bytes"}}, least recently used first.
+UPLOAD_CACHE = OrderedDict()
+UPLOAD_CACHE_MAX_BYTES = int(float(os.getenv("COURTCRAFT_UPLOAD_CACHE_MB", "64")) * 1024 * 1024)
+_UPLOAD_CACHE_LOCK = threading.Lock()
+# Guards swaps of data_files together with the matching RANKINGS_DF_CACHE entry.
+_DATA_FILES_LOCK = threading.Lock()
+# Latest BBM sync job per season; BBM_FETCH_HTML(url) -> html replaces the network fetch when set.
+SYNC_JOBS = {}
+_SYNC_LOCK = threading.Lock()
+BBM_FETCH_HTML = None
+# {(season, league version, dataset versions): (teams, h2h matrix)}; least recently used first.
+LEAGUE_RANKINGS_CACHE = OrderedDict()
+LEAGUE_RANKINGS_CACHE_MAX = 64
+_LEAGUE_RANKINGS_LOCK = threading.Lock()
 
 def _strip_player_name(name: str) -> str:
     cleaned = re.sub(r"<[^>]*>", "", str(name or ""))
@@ -131,81 +435,73 @@ def _strip_player_name(name: str) -> str:
     cleaned = re.sub(r"\s+", " ", cleaned).strip()
     return cleaned
 
+def _known_player(clean_name: str) -> bool:
+    """True when the name appears in some season's rankings (see _refresh_known_players)."""
+    return clean_name.lower() in KNOWN_PLAYERS["names"]
+
+def _headshot_lookup(clean_name: str):
+    """
+    HEADSHOTS.lookup() for players in the rankings. Any other name gets its
+    placeholder without queueing an upstream lookup or a headshots.db row, so
+    the public endpoints cannot be used to drive traffic or grow the cache.
+    """
+    if not _known_player(clean_name):
+        return placeholder_url(clean_name), False
+    return HEADSHOTS.lookup(clean_name)
+
+@metrics.timed("headshot_url")
 def player_headshot_url(name: str) -> str:
-    """Best-effort player headshot URL without needing local image files."""
+    """
+    Proxied headshot URL for a player. The `v` tag follows the upstream image,
+    so the URL changes when the placeholder is replaced by a resolved photo.
+    """
     clean_name = _strip_player_name(name)
     if not clean_name:
         return ""
-
-    key = clean_name.lower()
-    if key in PLAYER_HEADSHOT_CACHE:
-        return PLAYER_HEADSHOT_CACHE[key]
-
-    fallback = (
-        "https://ui-avatars.com/api/?name="
-        + urllib.parse.quote(clean_name)
-        + "&background=f5b448&color=1f2a44&rounded=true&size=64"
-    )
-
+    return url_for("headshot", player=clean_name, v=url_version(_headshot_lookup(clean_name)[0]))
+
+@app.route("/headshots", methods=["POST"])
+def headshots():
+    """Resolved headshot URLs for the posted names; names still being looked up are left out."""
+    names = (request.get_json(silent=True) or {}).get("names") or []
+    out = {}
+    for name in names[:200]:
+        clean_name = _strip_player_name(name)
+        if clean_name:
+            url, pending = _headshot_lookup(clean_name)
+            if not pending:
+                out[name] = url_for("headshot", player=clean_name, v=url_version(url))
+    return jsonify(out)
+
+@app.route("/headshot/<path:player>")
+def headshot(player):
+    """Serve a headshot from the local image cache, filling it from upstream on first use."""
+    clean_name = _strip_player_name(player)
+    if not clean_name:
+        return "", 404
+    if not _known_player(clean_name):
+        return redirect(placeholder_url(clean_name))
+    upstream, pending = HEADSHOTS.lookup(clean_name)
     try:
-        api = "https://www.balldontlie.io/api/v1/players?search=" + urllib.parse.quote(clean_name)
-        with urllib.request.urlopen(api, timeout=2.5) as resp:
-            payload = json.loads(resp.read().decode("utf-8", "ignore"))
-        players = payload.get("data") or []
-        if players:
-            exact = next(
-                (p for p in players if (p.get("first_name", "") + " " + p.get("last_name", "")).strip().lower() == key),
-                players[0]
-            )
-            pid = exact.get("id")
-            if pid:
-                url = f"https://cdn.nba.com/headshots/nba/latest/260x190/{pid}.png"
-                PLAYER_HEADSHOT_CACHE[key] = url
-                return url
+        path, content_type, sha = HEADSHOT_IMAGES.get(upstream)
     except Exception:
-        pass
-
-    PLAYER_HEADSHOT_CACHE[key] = fallback
-    return fallback
+        return redirect(upstream)
+    # A request for the current version can be cached for a long time; anything
+    # else (placeholder, old tag) should be re-checked soon.
+    current = not pending and request.args.get("v") == url_version(upstream)
+    return send_file(
+        path, mimetype=content_type, etag=sha, conditional=True,
+        max_age=HEADSHOT_MAX_AGE if current else HEADSHOT_SHORT_MAX_AGE,
+    )
 
 # -----------------------------------------------------------------------------
-# SAFE EXCEL READER (handles .xls/.xlsx and engine selection)
+# Rankings loading (compiled .npz artifacts, see rankings_store.py)
 # -----------------------------------------------------------------------------
-def _read_excel_safe(path: str):
+def _read_rankings_cached(path: str):
     """
-    Return a DataFrame or None. Picks the appropriate engine for .xls or .xlsx.
-    Requires: xlrd==2.0.1 for .xls, openpyxl for .xlsx.
+    Shared SeasonDataset for a rankings file, with a process-level mtime cache.
+    The dataset is read-only; use dataset.view() before mutating anything.
     """
-    if not os.path.exists(path):
-        return None
-    _, ext = os.path.splitext(path.lower())
-    try_paths = [path]
-
-    # Fallback to sibling extension when one file is missing/locked/unsupported.
-    stem = os.path.splitext(path)[0]
-    if ext == ".xls":
-        xlsx_sibling = stem + ".xlsx"
-        if os.path.exists(xlsx_sibling):
-            try_paths.append(xlsx_sibling)
-    elif ext == ".xlsx":
-        xls_sibling = stem + ".xls"
-        if os.path.exists(xls_sibling):
-            try_paths.append(xls_sibling)
-
-    for candidate in try_paths:
-        _, c_ext = os.path.splitext(candidate.lower())
-        try:
-            if c_ext == ".xlsx":
-                return pd.read_excel(candidate, engine="openpyxl")
-            if c_ext == ".xls":
-                return pd.read_excel(candidate, engine="xlrd")
-            return pd.read_excel(candidate)
-        except Exception:
-            continue
-    return None
-
-def _read_rankings_cached(path: str):
-    """Read and normalize rankings with a process-level mtime cache."""
     if not path or not os.path.exists(path):
         return None
     try:
@@ -215,73 +511,168 @@ def _read_rankings_cached(path: str):
 
     cached = RANKINGS_DF_CACHE.get(path)
     if cached and cached.get("mtime") == mtime:
-        return cached["df"].copy()
+        metrics.count("rankings", "hit")
+        return cached["dataset"]
 
-    df = _read_excel_safe(path)
+    metrics.count("rankings", "miss")
+    with metrics.span("rankings_load"):
+        dataset = _build_rankings_dataset(path)
+    if dataset is None:
+        return None
+    RANKINGS_DF_CACHE[path] = {"mtime": mtime, "dataset": dataset}
+    return dataset
+
+def _build_rankings_dataset(path: str):
+    # Artifacts are keyed by content hash, so a restart reuses the compiled copy.
+    df, version = load_rankings(path)
     if df is None or "Name" not in df.columns:
         return None
-    df = _normalize_rankings_df(df)
-    RANKINGS_DF_CACHE[path] = {"mtime": mtime, "df": df}
-    return df.copy()
-
-def _normalize_rankings_df(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalize rankings columns so numeric comparisons/sums are always safe."""
-    out = df.copy()
-    out.columns = [str(c).strip() for c in out.columns]
-
-    if "Name" in out.columns:
-        out["Name"] = out["Name"].astype(str).str.strip()
-        # Basketball Monster export repeats header rows in the table body; drop placeholder names.
-        out = out[~out["Name"].str.lower().isin({"name", "", "nan"})].copy()
-
-    # Unify alternate value headers that may appear in exported files.
-    rename_map = {}
-    for c in out.columns:
-        lc = c.lower()
-        if lc in ("leagv", "leaguev"):
-            rename_map[c] = "LeagV"
-        if lc in ("puntv", "puntiv"):
-            rename_map[c] = "puntV"
-    if rename_map:
-        out.rename(columns=rename_map, inplace=True)
-
-    numeric_cols = [
-        "Round", "Rank", "Value", "g", "m/g", "p/g", "3/g", "r/g", "a/g", "s/g", "b/g",
-        "fg%", "fga/g", "ft%", "fta/g", "to/g", "USG",
-        "pV", "3V", "rV", "aV", "sV", "bV", "fg%V", "ft%V", "toV",
-        "LeagV", "puntV"
-    ]
-    for c in numeric_cols:
-        if c in out.columns:
-            out[c] = pd.to_numeric(out[c], errors="coerce")
+    return SeasonDataset(df, VAL_COLS, version=version, source=path)
 
-    # Remove any residual non-player rows (e.g., repeated headers with no numeric values).
-    if "Rank" in out.columns:
-        out = out[out["Rank"].notna()].copy()
+def _publish_rankings(season: str, data_type: str, path: str):
+    """
+    Load a freshly written rankings file and make it live: the dataset cache
+    entry and data_files are replaced together under a lock. data_files is
+    swapped for a new dict rather than edited, so readers see either the old
+    mapping or the new one, and requests already holding a dataset keep it.
+    """
+    global data_files
+    dataset = _build_rankings_dataset(path)
+    if dataset is None:
+        raise RuntimeError(f"Could not read synced rankings: {os.path.basename(path)}")
+    mtime = os.path.getmtime(path)
+    with _DATA_FILES_LOCK:
+        RANKINGS_DF_CACHE[path] = {"mtime": mtime, "dataset": dataset}
+        data_files = {**data_files, season: {**data_files.get(season, {}), data_type: os.path.basename(path)}}
+    _refresh_known_players()
+    return dataset
+
+def _uploaded_dataset(sheet_hash: str):
+    """Cached dataset for a previously uploaded sheet, or None once it has been evicted."""
+    with _UPLOAD_CACHE_LOCK:
+        entry = UPLOAD_CACHE.get(sheet_hash or "")
+        if entry is None:
+            return None
+        UPLOAD_CACHE.move_to_end(sheet_hash)
+        return entry["dataset"]
+
+def _load_uploaded_rankings(data: bytes, filename: str):
+    """
+    Parse an uploaded rankings workbook in memory and cache it by content hash.
+    Returns (dataset or None, sha1). The cache is bounded by UPLOAD_CACHE_MAX_BYTES.
+    """
+    sheet_hash = hashlib.sha1(data).hexdigest()
+    dataset = _uploaded_dataset(sheet_hash)
+    if dataset is not None:
+        return dataset, sheet_hash
 
-    return out
+    df = _read_excel_bytes(data, filename)
+    if df is None:
+        return None, sheet_hash
+    # Normalize columns and dtypes once to avoid string/int runtime issues.
+    df = _normalize_rankings_df(df)
+    if "Name" not in df.columns:
+        return None, sheet_hash
+    dataset = SeasonDataset(df, VAL_COLS, version=sheet_hash, source=f"upload:{sheet_hash}")
+    size = int(df.memory_usage(deep=True).sum()) + dataset.values.nbytes
+    with _UPLOAD_CACHE_LOCK:
+        UPLOAD_CACHE[sheet_hash] = {"dataset": dataset, "bytes": size}
+        total = sum(e["bytes"] for e in UPLOAD_CACHE.values())
+        while total > UPLOAD_CACHE_MAX_BYTES and len(UPLOAD_CACHE) > 1:
+            _, evicted = UPLOAD_CACHE.popitem(last=False)
+            total -= evicted["bytes"]
+    return dataset, sheet_hash
 
 # ----- Player name loader (union of nopunts/tovpunt) -----
-def load_all_player_names(season: str):
-    names = set()
+def _season_rankings_paths(season: str):
+    """(data_type, path) for every rankings file registered for a season."""
+    paths = []
     for data_type in ("nopunts", "tovpunt"):
         try:
             fname = data_files[season][data_type]
-            path = os.path.join(os.path.dirname(__file__), data_dirs[data_type], fname)
         except KeyError:
             continue
-        df = _read_excel_safe(path)
-        if df is None or "Name" not in df.columns:
+        paths.append((data_type, os.path.join(os.path.dirname(__file__), data_dirs[data_type], fname)))
+    return paths
+
+def _season_name_index(season: str):
+    """Per-season NameSearchIndex, rebuilt only when a source file's mtime changes."""
+    stamp = []
+    for _, path in _season_rankings_paths(season):
+        try:
+            stamp.append((path, os.path.getmtime(path)))
+        except OSError:
             continue
-        for n in df["Name"].dropna().astype(str).str.strip().unique():
-            if n:
-                names.add(n)
-    return sorted(names, key=lambda s: s.lower())
+    stamp = tuple(stamp)
+
+    cached = NAME_SEARCH_CACHE.get(season)
+    if cached and cached["stamp"] == stamp:
+        return cached["index"]
+
+    names = set()
+    versions = []
+    for path, _ in stamp:
+        ds = _read_rankings_cached(path)
+        if ds is not None:
+            names.update(ds.df["Name"].dropna().astype(str).str.strip())
+            versions.append(ds.version or "")
+    index = NameSearchIndex(names)
+    version = hashlib.sha1("|".join(versions).encode("utf-8")).hexdigest()
+    NAME_SEARCH_CACHE[season] = {"stamp": stamp, "index": index, "version": version}
+    return index
+
+def _season_names_version(season: str) -> str:
+    """Dataset version behind the season's name list (changes when any source file changes)."""
+    _season_name_index(season)
+    return NAME_SEARCH_CACHE[season]["version"]
+
+def load_all_player_names(season: str):
+    return list(_season_name_index(season).names)
+
+def _refresh_known_players() -> None:
+    """Rebuild KNOWN_PLAYERS from every season's rankings (startup and after a publish)."""
+    names = set()
+    for season in sorted(data_files):
+        names.update(_strip_player_name(n).lower() for n in _season_name_index(season).names)
+    KNOWN_PLAYERS["names"] = frozenset(names)
+
+def _players_json_payload(season: str):
+    """Sorted names for a season as pre-encoded JSON + gzip bodies, cached per dataset version."""
+    version = _season_names_version(season)
+    cached = PLAYERS_JSON_CACHE.get(season)
+    if cached and cached["version"] == version:
+        return cached
+
+    body = json.dumps({"names": load_all_player_names(season)}, separators=(",", ":")).encode("utf-8")
+    etag = hashlib.sha1(body).hexdigest()[:24]
+    payload = {
+        "version": version,
+        "body": body,
+        "gzip_body": gzip.compress(body, compresslevel=9, mtime=0),
+        "etag": etag,
+        "gzip_etag": etag + "-gz",
+    }
+    PLAYERS_JSON_CACHE[season] = payload
+    return payload
 
 @app.route("/players/<season>")
 def players_for_season(season):
     """Return all valid player names for a season (used to validate Board inputs)."""
-    return jsonify({"names": load_all_player_names(season)})
+    payload = _players_json_payload(season)
+    use_gzip = request.accept_encodings["gzip"] > 0
+    etag = payload["gzip_etag"] if use_gzip else payload["etag"]
+
+    # The URL is not versioned, so clients revalidate every time; a BBM sync changes the ETag.
+    if request.if_none_match.contains(payload["etag"]) or request.if_none_match.contains(payload["gzip_etag"]):
+        resp = app.response_class(status=304)
+    else:
+        resp = app.response_class(payload["gzip_body"] if use_gzip else payload["body"], mimetype="application/json")
+        if use_gzip:
+            resp.headers["Content-Encoding"] = "gzip"
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "public, no-cache"
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
 
 # -----------------------------------------------------------------------------
 # Routes: basic pages
@@ -296,28 +687,131 @@ def season_page(season):
     data = season_data.get(season, {})
     return render_template("season.html", season=formatted, season_url=season, **data)
 
+def _sync_bbm_job(job, season):
+    job.progress(0, total=4)
+    output_dir = os.path.join(os.path.dirname(__file__), data_dirs["nopunts"])
+    # Select the season on the BBM page too, as sync_batch does; otherwise a past
+    # season would be filled with the current season's rankings.
+    out_path = sync_rankings_xlsx(
+        output_dir, season, "nopunts", fetch_html=BBM_FETCH_HTML,
+        progress=lambda message: job.progress(job.done + 1, message=message),
+        fields={SEASON_FIELD: str(_season_start_year(season))},
+    )
+    job.check_cancelled()
+    job.progress(job.done + 1, message="Loading rankings")
+    # Point the app at the runtime copy (safe when the main file is open in Excel).
+    dataset = _publish_rankings(season, "nopunts", out_path)
+    job.progress(job.total, message="Done")
+    return {"file": os.path.basename(out_path), "players": len(dataset), "version": dataset.version}
+
 @app.route("/season/<season>/sync-bbm", methods=["POST"])
 def sync_bbm_for_season(season):
-    try:
-        output_dir = os.path.join(os.path.dirname(__file__), data_dirs["nopunts"])
-        out_path = sync_nopunt_xlsx(output_dir=output_dir, season_key=season)
-
-        # Ensure the app points to the runtime copy (safe when the main file is open in Excel).
-        out_name = os.path.basename(out_path)
-        if season not in data_files:
-            data_files[season] = {"nopunts": out_name}
-        else:
-            data_files[season]["nopunts"] = out_name
-
-        flash(f"Synced latest BBM rankings: {out_name}", "success")
-    except Exception as e:
-        flash(f"BBM sync failed: {e}", "danger")
+    """
+    Start (or join) the season's BBM sync job. JSON clients get the job id; forms
+    are redirected. Only logged-in users can sync, and only the user who
+    started a job can cancel it; anyone can follow its progress.
+    """
+    wants_json = request.accept_mimetypes.best == "application/json"
+    if season not in season_data:
+        if wants_json:
+            return jsonify({"error": "Unknown season."}), 404
+        flash("Unknown season.", "danger")
+        return redirect(url_for("home"))
+    user_id = session.get("user_id")
+    if not user_id:
+        if wants_json:
+            return jsonify({"error": "Please log in to sync rankings."}), 401
+        flash("Please log in to sync rankings.", "warning")
+        return redirect(url_for("season_page", season=season))
+
+    with _SYNC_LOCK:
+        job = SYNC_JOBS.get(season)
+        if job is None or job.finished_at is not None:
+            job = start_job("bbm-sync", _sync_bbm_job, season, owner=user_id)
+            SYNC_JOBS[season] = job
+
+    if wants_json:
+        return jsonify({"job_id": job.id, "status_url": url_for("job_status", job_id=job.id)}), 202
+    flash("BBM sync started; rankings update when it finishes.", "info")
     return redirect(url_for("season_page", season=season))
 
 @app.route("/season/<season>/data")
 def season_data_page(season):
-    flash("Stats Leaders was removed.", "info")
-    return redirect(url_for("season_page", season=season))
+    """Stats Leaders: top players per category for the season."""
+    try:
+        payload = _leaders_payload(season, *_leaders_args())
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for("season_data_page", season=season))
+    if payload is None:
+        flash("Rankings are not available for this season.", "warning")
+        return redirect(url_for("season_page", season=season))
+    data = json.loads(payload["body"])
+    results = {}
+    for label, col, _, attempts in LEADER_CATEGORIES:
+        rows = []
+        for e in data["leaders"].get(label, []):
+            row = {"#": e["rank"], "Player": e["Name"], "Team": e["Team"], col: round(e[col], 3)}
+            if attempts:
+                row[attempts] = round(e[attempts], 1)
+                row["Attempts"] = e["attempts"]
+            rows.append(row)
+        heading = f"{label} (min {data['min_attempts'][attempts]:g} attempts)" if attempts else label
+        results[heading] = rows
+    return render_template("data_calculation.html", season=season.replace("-", "/"), results=results)
+
+def _leaders_args():
+    """(k, {attempts column: minimum}) from the query string; raises ValueError on bad input."""
+    try:
+        k = min(max(int(request.args.get("k", TOP_K)), 1), 100)
+        min_attempts = {
+            "fga/g": float(request.args.get("min_fga", MIN_ATTEMPTS["fga/g"])),
+            "fta/g": float(request.args.get("min_fta", MIN_ATTEMPTS["fta/g"])),
+        }
+    except ValueError:
+        raise ValueError("k, min_fga and min_fta must be numbers.")
+    return k, min_attempts
+
+def _leaders_payload(season, k, min_attempts):
+    """Encoded stat leaders for a season, cached per dataset version and query."""
+    ds, _ = _load_dataset_for_recs(season, "nopunts")
+    if ds is None:
+        return None
+    key = (ds.source, ds.version, k, tuple(sorted(min_attempts.items())))
+    if ds.version is not None:
+        with _LEADERS_CACHE_LOCK:
+            cached = LEADERS_CACHE.get(key)
+            if cached is not None:
+                LEADERS_CACHE.move_to_end(key)
+                return cached
+
+    result = leaders(ds.df, k=k, min_attempts=min_attempts, values=stat_matrix(ds))
+    body = json.dumps({"season": season, "k": k, "min_attempts": min_attempts, "leaders": result},
+                      separators=(",", ":")).encode("utf-8")
+    payload = {"body": body, "etag": hashlib.sha1(body).hexdigest()[:24]}
+    if ds.version is not None:
+        with _LEADERS_CACHE_LOCK:
+            LEADERS_CACHE[key] = payload
+            while len(LEADERS_CACHE) > LEADERS_CACHE_MAX:
+                LEADERS_CACHE.popitem(last=False)
+    return payload
+
+@app.route("/season/<season>/leaders")
+def season_leaders_json(season):
+    """Top-k players per stat category; FG%/FT% only rank players above the attempt minimums."""
+    try:
+        payload = _leaders_payload(season, *_leaders_args())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if payload is None:
+        return jsonify({"error": "Dataset not available for this season."}), 404
+    if request.if_none_match.contains(payload["etag"]):
+        resp = app.response_class(status=304)
+    else:
+        resp = app.response_class(payload["body"], mimetype="application/json")
+    resp.set_etag(payload["etag"])
+    resp.headers["Cache-Control"] = "public, no-cache"
+    return resp
 
 # -----------------------------------------------------------------------------
 # Assemble Team
@@ -331,18 +825,10 @@ def team_assemble_page(season):
     ir_players = []
 
     if request.method=="GET" and session.get("user_id"):
-        db = get_db()
-        row = db.execute(
-            "SELECT players,ir_players,data_type FROM teams WHERE user_id=? AND season=? ORDER BY created_at DESC LIMIT 1",
-            (session["user_id"], season)
-        ).fetchone()
-        if row:
-            registered = json.loads(row["players"]); raw_type = row["data_type"]
+        roster = load_roster(get_db(), session["user_id"], season)
+        if roster:
+            registered, ir_players, raw_type, _ = roster
             data_type = "tovpunt" if "tov" in raw_type else "nopunts"
-            try:
-                ir_players = json.loads(row["ir_players"]) or []
-            except Exception:
-                ir_players = []
         else:
             registered = []
     else:
@@ -351,6 +837,8 @@ def team_assemble_page(season):
     results = totals = analysis = None
     ir_rows = None
     punt_buttons = []
+    punt_builds = None
+    custom_sheet = (request.form.get("custom_sheet") or "").strip() if request.method=="POST" else ""
 
     if request.method=="POST":
         registered = [request.form.get(f"player{i}", "").strip()
@@ -360,35 +848,28 @@ def team_assemble_page(season):
 
         if session.get("user_id"):
             db = get_db()
-            db.execute(
-                "INSERT INTO teams(user_id,season,players,ir_players,data_type,created_at) VALUES(?,?,?,?,?,?)",
-                (
-                    session["user_id"],
-                    season,
-                    json.dumps(registered),
-                    json.dumps(ir_players),
-                    raw_type,
-                    datetime.now().isoformat(),
-                )
-            )
+            save_roster(db, session["user_id"], season, registered, ir_players, raw_type)
             db.commit()
 
-        # ---- READ EXCEL (uploaded or default) via SAFE READER ----
+        # ---- READ EXCEL (uploaded, previously uploaded, or default) ----
         uploaded = request.files.get("custom_excel")
+        ds = None
         if uploaded and allowed_file(uploaded.filename):
-            tmp_ext = os.path.splitext(uploaded.filename)[1].lower()
-            tmp_path = os.path.join(os.path.dirname(__file__), f"_upload{tmp_ext}")
-            uploaded.save(tmp_path)
-            df = _read_excel_safe(tmp_path)
-            try: os.remove(tmp_path)
-            except Exception: pass
+            ds, custom_sheet = _load_uploaded_rankings(uploaded.read(), uploaded.filename)
+            if ds is None:
+                custom_sheet = ""
         else:
-            df, used_type = _load_df_for_recs(season, data_type)
-            if used_type != data_type:
-                data_type = used_type
-                raw_type = used_type
-
-        if df is None:
+            ds = _uploaded_dataset(custom_sheet) if custom_sheet else None
+            if ds is None:
+                if custom_sheet:
+                    flash("Your custom rankings sheet is no longer cached; using the default rankings. Upload it again to keep using it.", "warning")
+                    custom_sheet = ""
+                ds, used_type = _load_dataset_for_recs(season, data_type)
+                if used_type != data_type:
+                    data_type = used_type
+                    raw_type = used_type
+
+        if ds is None:
             flash("Could not read the rankings file. Install/upgrade xlrd (for .xls) and openpyxl (for .xlsx).", "danger")
             return render_template(
                 "team_assemble.html",
@@ -396,19 +877,14 @@ def team_assemble_page(season):
                 registered_players=registered,
                 ir_players=ir_players, ir_rows=None,
                 results=None, totals=None, analysis=None,
-                punt_buttons=[], raw_type=raw_type, data_type=data_type
+                punt_buttons=[], raw_type=raw_type, data_type=data_type, custom_sheet=""
             )
 
-        # Normalize columns and dtypes once to avoid string/int runtime issues.
-        df = _normalize_rankings_df(df)
-
-        clean = [n.lower() for n in registered]
-        ir_clean = {n.lower() for n in ir_players}
-
         exclude = ["Round","Rank","Value","Team","Inj","Pos","m/g","USG","fga/g", "fta/g","LeagV", "puntV", "g", "p/g","r/g","a/g","s/g","b/g","to/g","3/g","fg%","ft%"]
 
         # IR players are tracked separately and excluded from active totals.
-        df_ir = df[df['Name'].str.lower().isin(ir_clean)] if ir_clean else df.iloc[0:0]
+        ir_pos, _ = ds.lookup(ir_players)
+        df_ir = ds.rows(ir_pos)
         ir_rows = df_ir.to_dict(orient='records') if not df_ir.empty else []
         for r in ir_rows:
             r["plain_name"] = str(r.get("Name", "")).strip()
@@ -416,9 +892,8 @@ def team_assemble_page(season):
             for c in exclude:
                 r.pop(c, None)
 
-        df_f = df[df['Name'].str.lower().isin(clean)]
-        if ir_clean:
-            df_f = df_f[~df_f['Name'].str.lower().isin(ir_clean)]
+        active_pos, _ = ds.lookup(registered)
+        df_f = ds.rows(np.setdiff1d(active_pos, ir_pos))
         results = df_f.to_dict(orient='records')
 
         for r in results:
@@ -464,6 +939,12 @@ def team_assemble_page(season):
         else:
             punt_buttons = ["nopunts"]
 
+        if not df_f.empty:
+            punt_builds = optimize_roster(
+                ds, df_f["Name"].tolist(), [c for c in VAL_COLS if c in ds.value_cols],
+                labels=VALCOL_TO_CAT_LABEL,
+            )
+
         if data_type=="nopunts":
             for r in results: r["LeagV"] = r["puntV"] = ""
             totals["LeagV"] = totals["puntV"] = ""
@@ -474,8 +955,8 @@ def team_assemble_page(season):
         registered_players=registered,
         ir_players=ir_players, ir_rows=ir_rows,
         results=results, totals=totals,
-        analysis=analysis, punt_buttons=punt_buttons,
-        raw_type=raw_type, data_type=data_type
+        analysis=analysis, punt_buttons=punt_buttons, punt_builds=punt_builds,
+        raw_type=raw_type, data_type=data_type, custom_sheet=custom_sheet
     )
 
 # -----------------------------------------------------------------------------
@@ -487,14 +968,13 @@ def compare_teams(season):
     data_type = "nopunts"
     teamA_name = request.form.get("teamA_name","Team A") if request.method=="POST" else "Team A"
     teamB_name = request.form.get("teamB_name","Team B") if request.method=="POST" else "Team B"
-    teamA=[]; teamB=[]; comparison=None; match_winner=None; teamA_advice=[]
+    teamA=[]; teamB=[]; comparison=None; match_winner=None; teamA_advice=[]; sim=None
 
     if request.method=="POST":
         teamA = [request.form.get(f"A_player{i}","").strip() for i in range(1,14) if request.form.get(f"A_player{i}","").strip()]
         teamB = [request.form.get(f"B_player{i}","").strip() for i in range(1,14) if request.form.get(f"B_player{i}","").strip()]
-        fp = os.path.join(os.path.dirname(__file__), data_dirs[data_type], data_files[season][data_type])
-        df = _read_excel_safe(fp)
-        if df is None:
+        ds = _load_dataset(season, data_type)
+        if ds is None:
             flash("Could not read default dataset for comparison. Install/upgrade xlrd/openpyxl.", "danger")
             return render_template(
                 "compare_teams.html",
@@ -504,11 +984,9 @@ def compare_teams(season):
                 comparison=None, match_winner=None, teamA_advice=[]
             )
 
-        df = _normalize_rankings_df(df)
         val_cols = ["pV","rV","aV","sV","bV","toV","fg%V","ft%V","3V"]
         def sum_stats(roster):
-            sub = df[df['Name'].str.lower().isin([n.lower() for n in roster])]
-            s   = sub[val_cols].sum(numeric_only=True)
+            s, _ = ds.totals(roster, val_cols)
             return {c:round(s[c],2) for c in val_cols}
         totalsA = sum_stats(teamA); totalsB = sum_stats(teamB)
 
@@ -521,12 +999,94 @@ def compare_teams(season):
             comp.append({"stat":c,"teamA":a,"teamB":b,"winner":winner})
         comparison=comp; match_winner = teamA_name if cntA>cntB else (teamB_name if cntB>cntA else "Tie")
 
+        if request.form.get("action") == "simulate" and teamA and teamB:
+            try:
+                sims = int(request.form.get("sims") or 10000)
+            except ValueError:
+                sims = 10000
+            sim = simulate_matchup(ds, teamA, teamB, sims=sims)
+
     return render_template(
         "compare_teams.html",
         season=formatted, season_url=season,
         teamA=teamA, teamB=teamB,
         teamA_name=teamA_name, teamB_name=teamB_name,
-        comparison=comparison, match_winner=match_winner, teamA_advice=teamA_advice
+        comparison=comparison, match_winner=match_winner, teamA_advice=teamA_advice,
+        sim=sim
+    )
+
+# -----------------------------------------------------------------------------
+# Player history (all seasons)
+# -----------------------------------------------------------------------------
+# Columns where a smaller number is better, for the comparison color scale.
+LOWER_IS_BETTER = {"Round", "Rank", "to/g"}
+
+def _history_sources():
+    """(season, data_type, path) for every registered rankings file."""
+    return [(season, data_type, path) for season in data_files for data_type, path in _season_rankings_paths(season)]
+
+def _player_history():
+    """Cross-season PlayerHistory, rebuilt only when a source file's mtime changes."""
+    sources = _history_sources()
+    stamp = []
+    for _, _, path in sources:
+        try:
+            stamp.append((path, os.path.getmtime(path)))
+        except OSError:
+            continue
+    stamp = tuple(stamp)
+
+    cached = PLAYER_HISTORY_CACHE.get("store")
+    if cached and cached["stamp"] == stamp:
+        return cached["store"]
+    store = load_history(sources)
+    PLAYER_HISTORY_CACHE["store"] = {"stamp": stamp, "store": store}
+    return store
+
+@app.route("/player/<path:name>/history")
+def player_history(name):
+    """A player's rank, value and stats for every season on file."""
+    data_type = request.args.get("data_type", "nopunts")
+    cols = [c.strip() for c in (request.args.get("cols") or "").split(",") if c.strip()] or None
+    store = _player_history()
+    rows = store.history(name, data_type, cols=cols)
+    if rows is None:
+        return jsonify({"error": f"No rankings found for {name} ({data_type})."}), 404
+    return jsonify({
+        "name": store.display_name(name),
+        "data_type": data_type,
+        "seasons": rows,
+        "trend": trend(rows, [c for c in TREND_COLS if cols is None or c in cols]),
+    })
+
+@app.route("/player/compare")
+def player_compare():
+    store = _player_history()
+    players = [n.strip() for n in request.args.getlist("player") if n.strip()][:6]
+    stat = request.args.get("stat", "Value")
+    data_type = request.args.get("data_type", "nopunts")
+    if stat not in store.columns:
+        stat = "Value"
+
+    missing = [n for n in players if n not in store]
+    if missing:
+        flash(f"No rankings found for: {', '.join(missing)}", "warning")
+    series = store.compare([n for n in players if n in store], stat, data_type)
+
+    colors = {}
+    present = [v for vals in series.values() for v in vals if v is not None]
+    if present:
+        lo, hi = min(present), max(present)
+        flip = stat in LOWER_IS_BETTER
+        for name, vals in series.items():
+            colors[name] = [None if v is None else (get_color(-v, -hi, -lo) if flip else get_color(v, lo, hi))
+                            for v in vals]
+
+    return render_template(
+        "player_compare.html",
+        players=players, stat=stat, data_type=data_type,
+        columns=store.columns, data_types=store.data_types, seasons=store.seasons,
+        series=series, colors=colors,
     )
 
 # -----------------------------------------------------------------------------
@@ -545,9 +1105,7 @@ def register():
     try:
         db.execute("INSERT INTO users(username,password_hash) VALUES(?,?)", (username, generate_password_hash(pwd)))
         db.commit()
-        row = db.execute("SELECT id FROM users WHERE username=?", (username)).fetchone()  # type: ignore
-        if not row:
-            row = db.execute("SELECT id FROM users WHERE username=?", (username,)).fetchone()
+        row = db.execute("SELECT id FROM users WHERE username=?", (username,)).fetchone()
         session["user"] = username; session["user_id"] = row["id"]; flash("Registered & logged in!","success")
     except sqlite3.IntegrityError:
         flash("Username already taken","danger")
@@ -585,43 +1143,21 @@ def list_teams():
     return render_template("teams.html", teams=teams)
 
 # -----------------------------------------------------------------------------
-# Autocomplete (uses safe reader)
+# Autocomplete (in-memory name index)
 # -----------------------------------------------------------------------------
 @app.route("/autocomplete/<season>")
 def autocomplete(season):
     term = (request.args.get("term", "") or "").strip().lower()
     if len(term) < 2: return jsonify([])
-    names = set()
-    for data_type in ("nopunts", "tovpunt"):
-        try:
-            fname = data_files[season][data_type]
-            path = os.path.join(os.path.dirname(__file__), data_dirs[data_type], fname)
-        except KeyError:
-            continue
-        df = _read_excel_safe(path)
-        if df is None or "Name" not in df.columns: continue
-        try:
-            series = df["Name"].dropna().astype(str).str.strip().unique()
-        except Exception:
-            continue
-        for name in series:
-            if term in name.lower(): names.add(name)
-    return jsonify(sorted(names)[:50])
+    return jsonify(_season_name_index(season).search(term, limit=50))
 
 # -----------------------------------------------------------------------------
 # Helper: latest team for a season
 # -----------------------------------------------------------------------------
 def load_latest_team(user_id: int, season: str, include_ir: bool = False):
-    db = get_db()
-    row = db.execute(
-        "SELECT players, ir_players, data_type FROM teams WHERE user_id=? AND season=? ORDER BY datetime(created_at) DESC LIMIT 1",
-        (user_id, season)
-    ).fetchone()
-    if not row: return [], "nopunts"
-    try: players = json.loads(row["players"]) or []
-    except Exception: players = []
-    try: ir_players = json.loads(row["ir_players"]) or []
-    except Exception: ir_players = []
+    roster = load_roster(get_db(), user_id, season)
+    if not roster: return [], "nopunts"
+    players, ir_players, data_type, _ = roster
     if include_ir:
         all_players = []
         seen = set()
@@ -631,7 +1167,7 @@ def load_latest_team(user_id: int, season: str, include_ir: bool = False):
                 seen.add(key)
                 all_players.append(str(name).strip())
         players = all_players
-    return players, row["data_type"]
+    return players, data_type
 
 # -----------------------------------------------------------------------------
 # Recommendation API
@@ -641,8 +1177,12 @@ CAT_LABEL_TO_VALCOL = {
     "TO": "toV", "FG%": "fg%V", "FT%": "ft%V", "3PM": "3V"
 }
 VAL_COLS = ["pV","rV","aV","sV","bV","toV","fg%V","ft%V","3V"]
+VALCOL_TO_CAT_LABEL = {vc: lbl for lbl, vc in CAT_LABEL_TO_VALCOL.items()}
+
+# Punted value columns behind each data type.
+DATA_TYPE_PUNTS = {"nopunts": (), "tovpunt": ("toV",)}
 
-def _load_df_for_recs(season: str, preferred_type: str):
+def _load_dataset_for_recs(season: str, preferred_type: str):
     order = []
     if preferred_type in ("nopunts","tovpunt"): order.append(preferred_type)
     if "nopunts" not in order: order.append("nopunts")
@@ -652,15 +1192,18 @@ def _load_df_for_recs(season: str, preferred_type: str):
             path = os.path.join(os.path.dirname(__file__), data_dirs[t], data_files[season][t])
         except KeyError:
             continue
-        df = _read_rankings_cached(path)
-        if df is not None:
-            return df, t
+        ds = _read_rankings_cached(path)
+        if ds is not None:
+            if t != preferred_type and preferred_type in DATA_TYPE_PUNTS:
+                # No export for the requested type: recompute its values from this sheet's per-game stats.
+                return punt_view(ds, VAL_COLS, punts=DATA_TYPE_PUNTS[preferred_type], season=season), preferred_type
+            return ds, t
     return None, preferred_type or "nopunts"
 
-def _current_totals(df, roster):
-    sub = df[df["Name"].str.lower().isin([n.lower() for n in roster])]
-    totals = sub[VAL_COLS].sum(numeric_only=True)
-    return {c: float(totals.get(c, 0.0)) for c in VAL_COLS}
+@metrics.timed("team_totals")
+def _current_totals(ds, roster):
+    totals, _ = ds.totals(roster, VAL_COLS)
+    return totals
 
 def _team_quality_label(count_positive: int) -> str:
     return "bad team" if count_positive < 2 else (
@@ -669,56 +1212,79 @@ def _team_quality_label(count_positive: int) -> str:
         )
     )
 
-def _load_df_for_exact_type(season: str, data_type: str):
+def _load_dataset(season: str, data_type: str):
     try:
         path = os.path.join(os.path.dirname(__file__), data_dirs[data_type], data_files[season][data_type])
     except KeyError:
         return None
     return _read_rankings_cached(path)
 
+def _row_get(r, key, default=None):
+    try:
+        return r[key]
+    except (KeyError, IndexError):
+        return default
+
+def _league_version(rows) -> str:
+    """Fingerprint of the saved league rosters; changes whenever a team is added, edited or removed."""
+    payload = [
+        [_row_get(r, k) for k in ("id", "team_name", "players", "ir_players", "data_type", "created_at", "is_my_team")]
+        for r in rows
+    ]
+    return hashlib.sha1(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+
+def _h2h_matrix(totals):
+    """Category wins/losses for every ordered pair of teams from an (n_teams, n_cats) totals array."""
+    a = totals[:, None, :]
+    b = totals[None, :, :]
+    return (a > b).sum(axis=2), (a < b).sum(axis=2)
+
+@metrics.timed("power_rankings")
 def _compute_league_power_rankings(season: str, rows):
-    df_cache = {}
+    """
+    Teams ordered by expected head-to-head record: every team plays every other
+    once, winning a matchup by taking more categories. Returns (teams, matrix)
+    where matrix[i][j] is team i's category record against team j (None on the
+    diagonal), both in ranking order. Cached per league and dataset version.
+    """
+    ds_cache = {}
 
-    def _get_df_cached(dtype: str):
-        if dtype in df_cache:
-            return df_cache[dtype], dtype
+    def _get_ds_cached(dtype: str):
+        if dtype in ds_cache:
+            return ds_cache[dtype], dtype
 
-        df = _load_df_for_exact_type(season, dtype)
+        ds = _load_dataset(season, dtype)
         used_type = dtype
-        if df is None:
-            df, used_type = _load_df_for_recs(season, dtype)
+        if ds is None:
+            ds, used_type = _load_dataset_for_recs(season, dtype)
 
-        df_cache[dtype] = df
+        ds_cache[dtype] = ds
         if used_type != dtype:
-            df_cache[used_type] = df
-        return df, used_type
+            ds_cache[used_type] = ds
+        return ds, used_type
 
-    teams = []
+    resolved = []
     for r in rows:
-        is_my_team = False
-        try:
-            is_my_team = bool(r["is_my_team"])
-        except Exception:
-            is_my_team = False
+        data_type = r["data_type"] if r["data_type"] in ("nopunts", "tovpunt") else "nopunts"
+        resolved.append(_get_ds_cached(data_type))
+    ds_versions = tuple(sorted({(t, getattr(ds, "version", None)) for ds, t in resolved}))
+    cache_key = (season, _league_version(rows), ds_versions)
+    with _LEAGUE_RANKINGS_LOCK:
+        cached = LEAGUE_RANKINGS_CACHE.get(cache_key)
+        if cached is not None:
+            LEAGUE_RANKINGS_CACHE.move_to_end(cache_key)
+            return cached
 
-        try:
-            players = json.loads(r["players"]) or []
-        except Exception:
-            players = []
-        try:
-            ir_players = json.loads(r["ir_players"]) or []
-        except Exception:
-            ir_players = []
+    teams = []
+    for r, (ds, data_type) in zip(rows, resolved):
+        is_my_team = bool(_row_get(r, "is_my_team", False))
 
-        data_type = r["data_type"] if r["data_type"] in ("nopunts", "tovpunt") else "nopunts"
-        df, data_type = _get_df_cached(data_type)
+        players, ir_players = r["players"], r["ir_players"]
 
         vals = {c: 0.0 for c in VAL_COLS}
-        if df is not None:
+        if ds is not None:
             active = [n for n in players if n and n.strip() and n.lower() not in {x.lower() for x in ir_players}]
-            sub = df[df["Name"].str.lower().isin([n.lower() for n in active])]
-            sums = sub[VAL_COLS].sum(numeric_only=True)
-            vals = {c: float(sums.get(c, 0.0)) for c in VAL_COLS}
+            vals, _ = ds.totals(active, VAL_COLS)
 
         positive = sum(1 for c in VAL_COLS if vals.get(c, 0.0) > 0)
         power_score = round(sum(vals.get(c, 0.0) for c in VAL_COLS), 3)
@@ -734,35 +1300,60 @@ def _compute_league_power_rankings(season: str, rows):
             "power_score": power_score,
             "totals": {k: round(v, 2) for k, v in vals.items()},
             "created_at": r["created_at"],
+            "_raw": [vals.get(c, 0.0) for c in VAL_COLS],
         })
 
     teams.sort(key=lambda t: (t["power_score"], t["positive_cats"]), reverse=True)
     for idx, t in enumerate(teams, start=1):
         t["power_rank"] = idx
-    return teams
+
+    n = len(teams)
+    wins, losses = _h2h_matrix(np.array([t.pop("_raw") for t in teams], dtype=float).reshape(n, len(VAL_COLS)))
+    cat_ties = len(VAL_COLS) - wins - losses
+    np.fill_diagonal(cat_ties, 0)
+    match_w = (wins > losses).sum(axis=1)
+    match_l = (wins < losses).sum(axis=1)
+    match_t = (n - 1) - match_w - match_l
+    games = max(n - 1, 1)
+    for i, t in enumerate(teams):
+        t["h2h"] = {
+            "wins": int(match_w[i]), "losses": int(match_l[i]), "ties": int(match_t[i]),
+            "pct": round(float(match_w[i] + 0.5 * match_t[i]) / games, 3),
+            "cat_pct": round(float(wins[i].sum() + 0.5 * cat_ties[i].sum()) / (games * len(VAL_COLS)), 3),
+        }
+
+    # Matchup win % first, then category win %, then the power score order.
+    order = sorted(range(n), key=lambda i: (-teams[i]["h2h"]["pct"], -teams[i]["h2h"]["cat_pct"], i))
+    ranked = [teams[i] for i in order]
+    for idx, t in enumerate(ranked, start=1):
+        t["h2h_rank"] = idx
+    matrix = [
+        [None if i == j else {"w": int(wins[i, j]), "l": int(losses[i, j]), "t": int(cat_ties[i, j])} for j in order]
+        for i in order
+    ]
+
+    result = (ranked, matrix)
+    with _LEAGUE_RANKINGS_LOCK:
+        LEAGUE_RANKINGS_CACHE[cache_key] = result
+        while len(LEAGUE_RANKINGS_CACHE) > LEAGUE_RANKINGS_CACHE_MAX:
+            LEAGUE_RANKINGS_CACHE.popitem(last=False)
+    return result
 
 def _load_league_taken_players(season: str, user_id=None):
     if not user_id:
         return []
-    db = get_db()
-    rows = db.execute(
-        "SELECT players, ir_players FROM league_teams WHERE season=? AND (user_id=? OR user_id IS NULL)",
-        (season, user_id),
+    rows = get_db().execute(
+        "SELECT p.name FROM league_team_players p JOIN league_teams t ON t.id = p.league_team_id "
+        "WHERE " + LEAGUE_SCOPE + " ORDER BY p.league_team_id, p.is_ir, p.slot",
+        _league_scope(season, user_id),
     ).fetchall()
     names = []
     seen = set()
     for r in rows:
-        for col in ("players", "ir_players"):
-            try:
-                arr = json.loads(r[col]) or []
-            except Exception:
-                arr = []
-            for n in arr:
-                name = str(n).strip()
-                key = name.lower()
-                if name and key not in seen:
-                    seen.add(key)
-                    names.append(name)
+        key = r["name"].lower()
+        if key not in seen:
+            seen.add(key)
+            names.append(r["name"])
     return names
 
 @app.route("/season/<season>/league-teams", methods=["GET", "POST"])
@@ -786,10 +1377,12 @@ def league_teams_page(season):
         if action == "delete":
             team_id = request.form.get("team_id", "").strip()
             if team_id.isdigit():
-                db.execute(
+                cur = db.execute(
                     "DELETE FROM league_teams WHERE id=? AND season=? AND (user_id=? OR user_id IS NULL)",
                     (int(team_id), season, user_id),
                 )
+                if cur.rowcount:
+                    set_league_team_players(db, int(team_id), [], [])
                 db.commit()
                 flash("League team removed.", "success")
             else:
@@ -807,7 +1400,7 @@ def league_teams_page(season):
         else:
             normalized_type = "tovpunt" if "tov" in form_data_type else "nopunts"
             if edit_team_id.isdigit():
-                db.execute(
+                cur = db.execute(
                     "UPDATE league_teams SET user_id=?, team_name=?, players=?, ir_players=?, data_type=?, created_at=? WHERE id=? AND season=? AND (user_id=? OR user_id IS NULL)",
                     (
                         user_id,
@@ -821,13 +1414,18 @@ def league_teams_page(season):
                         user_id,
                     ),
                 )
+                if cur.rowcount:
+                    set_league_team_players(db, int(edit_team_id), players, ir_players)
                 flash(f"Updated league team: {team_name}", "success")
             else:
-                db.execute(
-                    "DELETE FROM league_teams WHERE season=? AND (user_id=? OR user_id IS NULL) AND lower(team_name)=lower(?)",
-                    (season, user_id, team_name),
-                )
-                db.execute(
+                replaced = db.execute(
+                    "SELECT id FROM league_teams WHERE " + LEAGUE_SCOPE + " AND lower(team_name)=lower(?)",
+                    (*_league_scope(season, user_id), team_name),
+                ).fetchall()
+                for r in replaced:
+                    db.execute("DELETE FROM league_teams WHERE id=?", (r["id"],))
+                    set_league_team_players(db, r["id"], [], [])
+                cur = db.execute(
                     "INSERT INTO league_teams(user_id, season, team_name, players, ir_players, data_type, created_at) VALUES(?,?,?,?,?,?,?)",
                     (
                         user_id,
@@ -839,6 +1437,7 @@ def league_teams_page(season):
                         datetime.now().isoformat(),
                     ),
                 )
+                set_league_team_players(db, cur.lastrowid, players, ir_players)
                 flash(f"Saved league team: {team_name}", "success")
             db.commit()
             return redirect(url_for("league_teams_page", season=season))
@@ -849,20 +1448,13 @@ def league_teams_page(season):
         else:
             db = get_db()
             row = db.execute(
-                "SELECT id, team_name, players, ir_players, data_type FROM league_teams WHERE id=? AND season=? AND (user_id=? OR user_id IS NULL)",
+                "SELECT id, team_name, data_type FROM league_teams WHERE id=? AND season=? AND (user_id=? OR user_id IS NULL)",
                 (int(edit_team_id), season, user_id),
             ).fetchone()
             if row:
                 form_team_name = row["team_name"]
                 form_data_type = row["data_type"] if row["data_type"] in ("nopunts", "tovpunt") else "nopunts"
-                try:
-                    p = json.loads(row["players"]) or []
-                except Exception:
-                    p = []
-                try:
-                    ir = json.loads(row["ir_players"]) or []
-                except Exception:
-                    ir = []
+                p, ir = load_league_players(db, season, user_id).get(row["id"], ([], []))
                 form_players = [p[i] if i < len(p) else "" for i in range(13)]
                 form_ir_players = [ir[0] if len(ir) > 0 else "", ir[1] if len(ir) > 1 else ""]
             else:
@@ -871,29 +1463,30 @@ def league_teams_page(season):
     rows = []
     if user_id:
         db = get_db()
-        rows = list(db.execute(
-            "SELECT id, team_name, players, ir_players, data_type, created_at FROM league_teams WHERE season=? AND (user_id=? OR user_id IS NULL) ORDER BY created_at DESC",
-            (season, user_id),
-        ).fetchall())
+        league_players = load_league_players(db, season, user_id)
+        rows = [
+            dict(r, players=league_players.get(r["id"], ([], []))[0], ir_players=league_players.get(r["id"], ([], []))[1])
+            for r in db.execute(
+                "SELECT id, team_name, data_type, created_at FROM league_teams WHERE " + LEAGUE_SCOPE + " ORDER BY created_at DESC",
+                _league_scope(season, user_id),
+            )
+        ]
 
     # Also include the logged-in user's latest Assemble Team roster in rankings.
     if user_id:
-        my_row = db.execute(
-            "SELECT players, ir_players, data_type, created_at FROM teams WHERE user_id=? AND season=? ORDER BY datetime(created_at) DESC LIMIT 1",
-            (user_id, season),
-        ).fetchone()
-        if my_row:
+        my_roster = load_roster(db, user_id, season)
+        if my_roster:
             rows.append({
                 "id": None,
                 "team_name": f"{session.get('user', 'My Team')} (My Team)",
-                "players": my_row["players"],
-                "ir_players": my_row["ir_players"],
-                "data_type": my_row["data_type"],
-                "created_at": my_row["created_at"],
+                "players": my_roster[0],
+                "ir_players": my_roster[1],
+                "data_type": my_roster[2],
+                "created_at": my_roster[3],
                 "is_my_team": True,
             })
 
-    power_rankings = _compute_league_power_rankings(season, rows)
+    power_rankings, h2h_matrix = _compute_league_power_rankings(season, rows)
 
     return render_template(
         "league_teams.html",
@@ -906,17 +1499,18 @@ def league_teams_page(season):
         form_ir_players=form_ir_players,
         edit_team_id=edit_team_id,
         power_rankings=power_rankings,
+        h2h_matrix=h2h_matrix,
     )
 
-def _totals_for_players(df, players, cols):
+def _totals_for_players(ds, players, cols):
     if not players:
         return {c: 0.0 for c in cols}
-    subset = df[df["Name"].str.lower().isin({n.lower() for n in players})]
-    sums = subset[cols].sum(numeric_only=True)
-    return {c: float(sums.get(c, 0.0)) for c in cols}
+    totals, _ = ds.totals(players, cols)
+    return totals
 
-def _analyze_trade_side(df, roster, send_players, receive_players, cols):
-    before = _totals_for_players(df, roster, cols)
+@metrics.timed("trade_analysis")
+def _analyze_trade_side(ds, roster, send_players, receive_players, cols):
+    before = _totals_for_players(ds, roster, cols)
 
     send_l = {n.lower() for n in send_players}
     base_after = [p for p in roster if p.lower() not in send_l]
@@ -926,7 +1520,7 @@ def _analyze_trade_side(df, roster, send_players, receive_players, cols):
             base_after.append(p)
             existing.add(p.lower())
 
-    after = _totals_for_players(df, base_after, cols)
+    after = _totals_for_players(ds, base_after, cols)
     delta = {c: round(after[c] - before[c], 2) for c in cols}
     return {
         "before": {c: round(before[c], 2) for c in cols},
@@ -955,6 +1549,7 @@ def trade_analyzer_page(season):
     my_result = None
     opp_result = None
     verdict = None
+    found_trades = None
     missing_names = []
 
     if session.get("user_id"):
@@ -976,67 +1571,73 @@ def trade_analyzer_page(season):
         send_players = [n.strip() for n in send_text.splitlines() if n.strip()]
         receive_players = [n.strip() for n in receive_text.splitlines() if n.strip()]
 
+        action = request.form.get("action", "analyze")
+
         if not my_roster:
             flash("Add your roster first (one name per line).", "warning")
-        elif not send_players and not receive_players:
+        elif action == "find" and not opp_roster:
+            flash("Add the opponent roster to search for trades.", "warning")
+        elif action != "find" and not send_players and not receive_players:
             flash("Add at least one player to send or receive.", "warning")
         else:
-            df, _ = _load_df_for_recs(season, data_type)
-            if df is None:
+            ds, _ = _load_dataset_for_recs(season, data_type)
+            if ds is None:
                 flash("Could not read rankings dataset for trade analysis.", "danger")
             else:
-                cols = [c for c in VAL_COLS if c in df.columns]
+                cols = [c for c in VAL_COLS if c in ds.columns]
                 if scoring_type == "8cat" and "toV" in cols:
                     cols = [c for c in cols if c != "toV"]
 
                 punt_valcols = {CAT_LABEL_TO_VALCOL.get(lbl) for lbl in punts}
                 eval_cols = [c for c in cols if c not in punt_valcols]
 
-                all_names = {n.lower() for n in df["Name"].dropna().astype(str).str.strip().unique()}
-                for n in set(my_roster + opp_roster + send_players + receive_players):
-                    if n.lower() not in all_names:
-                        missing_names.append(n)
-
-                my_result = _analyze_trade_side(df, my_roster, send_players, receive_players, cols)
-                if opp_roster:
-                    opp_result = _analyze_trade_side(df, opp_roster, receive_players, send_players, cols)
-
-                improved = sum(1 for c in eval_cols if my_result["delta"].get(c, 0.0) > 0)
-                declined = sum(1 for c in eval_cols if my_result["delta"].get(c, 0.0) < 0)
-                neutral = max(len(eval_cols) - improved - declined, 0)
+                _, missing_names = ds.lookup(set(my_roster + opp_roster + send_players + receive_players))
+                col_to_label = {v: k for k, v in CAT_LABEL_TO_VALCOL.items()}
 
-                if improved > declined:
-                    overall = "Good for your build"
-                elif declined > improved:
-                    overall = "Likely negative for your build"
+                if action == "find":
+                    found_trades = find_trades(ds, my_roster, opp_roster, eval_cols, labels=col_to_label)
+                    if not found_trades["trades"]:
+                        flash("No mutually beneficial 1-for-1, 2-for-1 or 2-for-2 trades found.", "info")
                 else:
-                    overall = "Close to neutral"
-
-                col_to_label = {v: k for k, v in CAT_LABEL_TO_VALCOL.items()}
-                top_gains = sorted(
-                    [(c, my_result["delta"].get(c, 0.0)) for c in eval_cols],
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:3]
-                top_losses = sorted(
-                    [(c, my_result["delta"].get(c, 0.0)) for c in eval_cols],
-                    key=lambda x: x[1]
-                )[:3]
-
-                verdict = {
-                    "overall": overall,
-                    "improved": improved,
-                    "declined": declined,
-                    "neutral": neutral,
-                    "top_gains": [
-                        {"cat": col_to_label.get(c, c), "delta": round(v, 2)}
-                        for c, v in top_gains if v > 0
-                    ],
-                    "top_losses": [
-                        {"cat": col_to_label.get(c, c), "delta": round(v, 2)}
-                        for c, v in top_losses if v < 0
-                    ]
-                }
+                    my_result = _analyze_trade_side(ds, my_roster, send_players, receive_players, cols)
+                    if opp_roster:
+                        opp_result = _analyze_trade_side(ds, opp_roster, receive_players, send_players, cols)
+
+                    improved = sum(1 for c in eval_cols if my_result["delta"].get(c, 0.0) > 0)
+                    declined = sum(1 for c in eval_cols if my_result["delta"].get(c, 0.0) < 0)
+                    neutral = max(len(eval_cols) - improved - declined, 0)
+
+                    if improved > declined:
+                        overall = "Good for your build"
+                    elif declined > improved:
+                        overall = "Likely negative for your build"
+                    else:
+                        overall = "Close to neutral"
+
+                    top_gains = sorted(
+                        [(c, my_result["delta"].get(c, 0.0)) for c in eval_cols],
+                        key=lambda x: x[1],
+                        reverse=True
+                    )[:3]
+                    top_losses = sorted(
+                        [(c, my_result["delta"].get(c, 0.0)) for c in eval_cols],
+                        key=lambda x: x[1]
+                    )[:3]
+
+                    verdict = {
+                        "overall": overall,
+                        "improved": improved,
+                        "declined": declined,
+                        "neutral": neutral,
+                        "top_gains": [
+                            {"cat": col_to_label.get(c, c), "delta": round(v, 2)}
+                            for c, v in top_gains if v > 0
+                        ],
+                        "top_losses": [
+                            {"cat": col_to_label.get(c, c), "delta": round(v, 2)}
+                            for c, v in top_losses if v < 0
+                        ]
+                    }
 
     return render_template(
         "trade_analyzer.html",
@@ -1052,9 +1653,80 @@ def trade_analyzer_page(season):
         my_result=my_result,
         opp_result=opp_result,
         verdict=verdict,
+        found_trades=found_trades,
         missing_names=sorted(set(missing_names), key=lambda s: s.lower())
     )
 
+# Each scan keeps a process pool busy, so one user can only run this many at once.
+SCANS_PER_USER = int(os.getenv("COURTCRAFT_SCANS_PER_USER", "1"))
+
+@app.route("/season/<season>/trade/scan", methods=["POST"])
+def trade_scan_start(season):
+    """Start a background scan for trades with every saved league team."""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"error": "Please log in to scan your league."}), 401
+
+    data_type = request.form.get("data_type", "nopunts")
+    scoring_type = request.form.get("scoring_type", "9cat")
+    punts = request.form.getlist("punts")
+    my_roster = [n.strip() for n in (request.form.get("my_roster") or "").splitlines() if n.strip()]
+    if not my_roster:
+        my_roster, _ = load_latest_team(user_id, season)
+    if not my_roster:
+        return jsonify({"error": "Save a roster in Assemble Team or add your roster first."}), 400
+
+    ds, _ = _load_dataset_for_recs(season, data_type)
+    if ds is None:
+        return jsonify({"error": "Could not read rankings dataset for trade analysis."}), 404
+
+    db = get_db()
+    league_players = load_league_players(db, season, user_id)
+    rows = db.execute(
+        "SELECT id, team_name FROM league_teams WHERE " + LEAGUE_SCOPE,
+        _league_scope(season, user_id),
+    ).fetchall()
+    my_keys = {n.lower() for n in my_roster}
+    teams = []
+    for r in rows:
+        players = league_players.get(r["id"], ([], []))[0]
+        # Skip a saved copy of my own roster.
+        if players and {str(n).strip().lower() for n in players} != my_keys:
+            teams.append({"team_name": r["team_name"], "players": players})
+    if not teams:
+        return jsonify({"error": "Add league teams for this season first."}), 400
+
+    cols = [c for c in VAL_COLS if c in ds.columns]
+    if scoring_type == "8cat":
+        cols = [c for c in cols if c != "toV"]
+    punt_valcols = {CAT_LABEL_TO_VALCOL.get(lbl) for lbl in punts}
+    eval_cols = [c for c in cols if c not in punt_valcols]
+    col_to_label = {v: k for k, v in CAT_LABEL_TO_VALCOL.items()}
+
+    job = start_job("trade-scan", scan_league, ds, my_roster, teams, eval_cols,
+                    labels=col_to_label, owner=user_id, max_active=SCANS_PER_USER)
+    if job is None:
+        return jsonify({"error": "A league scan is already running. Wait for it or cancel it first."}), 429
+    return jsonify({"job_id": job.id, "status_url": url_for("job_status", job_id=job.id)}), 202
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = get_job(job_id, owner=session.get("user_id"))
+    if job is None:
+        # Season sync jobs are shared: anyone who joined one can follow it.
+        job = next((j for j in list(SYNC_JOBS.values()) if j.id == job_id), None)
+    if job is None:
+        return jsonify({"error": "Unknown job."}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/cancel", methods=["POST"])
+def job_cancel(job_id):
+    job = get_job(job_id, owner=session.get("user_id"))
+    if job is None:
+        return jsonify({"error": "Unknown job."}), 404
+    job.cancel()
+    return jsonify(job.to_dict())
+
 @app.route("/season/<season>/board/recommend", methods=["POST"])
 def board_recommend(season):
     payload = request.get_json(force=True, silent=True) or {}
@@ -1064,13 +1736,15 @@ def board_recommend(season):
     scoring = (payload.get("scoringType") or "9cat").lower()
     punts_labels = payload.get("punts", []) or []
 
-    df, used_type = _load_df_for_recs(season, data_type)
-    if df is None:
+    ds, used_type = _load_dataset_for_recs(season, data_type)
+    if ds is None:
         return jsonify({"recommendations": [], "error": "Dataset not available for this season."})
 
-    exclude = {n.lower() for n in my_team} | taken
-    cand = df[~df["Name"].str.lower().isin(exclude)].copy()
-    cand = cand[~cand["Name"].str.lower().isin({"name", "", "nan"})].copy()
+    # Placeholder names were already dropped by _normalize_rankings_df.
+    exclude_pos, _ = ds.lookup(set(my_team) | taken)
+    keep = np.ones(len(ds), dtype=bool)
+    keep[exclude_pos] = False
+    cand = ds.view(keep)
 
     # Do not recommend players marked with X in INJ (out for season).
     if "Inj" in cand.columns:
@@ -1083,36 +1757,269 @@ def board_recommend(season):
 
     effective_cols = [c for c in cols if not (scoring == "8cat" and c == "toV")]
     punt_valcols = {CAT_LABEL_TO_VALCOL.get(lbl) for lbl in punts_labels}
-    weights = {c: (0.0 if c in (punt_valcols or set()) else 1.0) for c in effective_cols}
+    totals = _current_totals(ds, my_team) if my_team else {c:0.0 for c in VAL_COLS}
+    weights = dict(zip(effective_cols, category_weights(effective_cols, punt_valcols, totals).tolist()))
+
+    recs = _score_candidates(cand, effective_cols, weights, limit=25)
+    return jsonify({"recommendations": recs, "used_type": used_type})
+
+@app.route("/season/<season>/values")
+def punt_values_json(season):
+    """Player values recomputed for any punt set and player-pool size."""
+    labels = [lbl.strip() for lbl in (request.args.get("punts") or "").split(",") if lbl.strip()]
+    unknown = [lbl for lbl in labels if lbl not in CAT_LABEL_TO_VALCOL]
+    if unknown:
+        return jsonify({"error": f"Unknown categories: {', '.join(unknown)}"}), 400
+    try:
+        pool_size = min(max(int(request.args.get("pool", DEFAULT_POOL_SIZE)), 2), 1000)
+        limit = min(max(int(request.args.get("limit", 100)), 1), 1000)
+    except ValueError:
+        return jsonify({"error": "pool and limit must be integers."}), 400
+    base, used_type = _load_dataset_for_recs(season, "nopunts")
+    if base is None:
+        return jsonify({"error": "Dataset not available for this season."}), 404
+
+    view = punt_view(base, VAL_COLS, punts=[CAT_LABEL_TO_VALCOL[lbl] for lbl in labels],
+                     pool_size=pool_size, season=season)
+    top = view.df.head(limit)
+    players = [
+        {"Name": name, "Rank": int(rank), "Value": round(float(value), 3),
+         **{VALCOL_TO_CAT_LABEL[c]: round(float(v), 2) for c, v in zip(VAL_COLS, vals)}}
+        for name, rank, value, vals in zip(top["Name"], top["Rank"], top["Value"], top[VAL_COLS].to_numpy())
+    ]
+    return jsonify({"punts": labels, "pool_size": pool_size, "used_type": used_type, "players": players})
 
-    totals = _current_totals(df, my_team) if my_team else {c:0.0 for c in VAL_COLS}
-    ordered_needs = sorted([c for c in effective_cols], key=lambda c: totals.get(c, 0.0))
-    for c in set(ordered_needs[:3]):
-        if weights.get(c,0) > 0: weights[c] += 0.35
+@app.route("/season/<season>/punts")
+def punt_builds_json(season):
+    """Best punt builds to draft from the whole player pool."""
+    data_type = request.args.get("data_type", "nopunts")
+    try:
+        teams = min(max(int(request.args.get("teams", 12)), 2), 30)
+        slot = request.args.get("slot")
+        slot = int(slot) if slot else None
+        top = min(max(int(request.args.get("top", 5)), 1), 50)
+    except ValueError:
+        return jsonify({"error": "teams, slot and top must be integers."}), 400
+    ds, used_type = _load_dataset_for_recs(season, data_type)
+    if ds is None:
+        return jsonify({"error": "Dataset not available for this season."}), 404
+    result = optimize_pool(ds, [c for c in VAL_COLS if c in ds.value_cols], teams=teams, slot=slot,
+                           labels=VALCOL_TO_CAT_LABEL, top=top)
+    return jsonify(dict(result, used_type=used_type))
+
+@app.route("/season/<season>/board/simulate", methods=["POST"])
+def board_simulate(season):
+    """Monte Carlo snake drafts using the Board's punt-aware picking for my team."""
+    payload = request.get_json(force=True, silent=True) or {}
+    data_type = payload.get("data_type", "nopunts")
+    scoring = (payload.get("scoringType") or "9cat").lower()
+    punts_labels = payload.get("punts", []) or []
+    try:
+        teams = int(payload.get("teams", 12))
+        slot = int(payload.get("slot", 1))
+        rounds = int(payload.get("rounds", 13))
+        sims = int(payload.get("sims", 10000))
+        noise = float(payload.get("noise", 0.15))
+        seed = payload.get("seed")
+        seed = int(seed) if seed not in (None, "") else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "teams, slot, rounds, sims, noise and seed must be numbers."}), 400
+    if not (2 <= teams <= 30 and 1 <= rounds <= 30 and noise >= 0):
+        return jsonify({"error": "Use 2-30 teams, 1-30 rounds and a non-negative noise."}), 400
+
+    ds, used_type = _load_dataset_for_recs(season, data_type)
+    if ds is None:
+        return jsonify({"error": "Dataset not available for this season."}), 404
+    cols = [c for c in VAL_COLS if c in ds.value_cols]
+    effective_cols = [c for c in cols if not (scoring == "8cat" and c == "toV")]
+    punt_valcols = {CAT_LABEL_TO_VALCOL.get(lbl) for lbl in punts_labels}
+    try:
+        result = simulate_drafts(
+            ds, cols, effective_cols, punt_valcols, teams=teams, slot=slot, rounds=rounds,
+            sims=sims, noise=noise, seed=seed, labels=VALCOL_TO_CAT_LABEL,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result["used_type"] = used_type
+    return jsonify(result)
 
-    scores = []
-    for _, row in cand.iterrows():
-        contrib = {c: float(row[c]) * weights.get(c, 0.0) for c in effective_cols}
-        score = sum(contrib.values())
-        display_name = row["Name"]
+_INJ_GAMES_RE = re.compile(r"(?:INJ|SUSP)\s*(\d+)\s*g", flags=re.IGNORECASE)
 
+@metrics.timed("recommendations")
+def _score_candidates(cand, effective_cols, weights, limit=25):
+    """Weighted value score over the candidate matrix; returns the top `limit` recommendations."""
+    if cand.empty or not effective_cols:
+        return []
+    values = cand[effective_cols].to_numpy(dtype=float)
+    w = np.array([weights.get(c, 0.0) for c in effective_cols])
+
+    # Accumulate column by column (same float order as a per-row sum) so scores match exactly.
+    score = np.zeros(len(values))
+    for j in range(len(effective_cols)):
+        score += values[:, j] * w[j]
+
+    # Partial selection on raw scores, widened so anything that could tie after
+    # rounding to 3 decimals is still in the final (stable) sort.
+    if len(score) > limit:
+        cutoff = np.partition(score, len(score) - limit)[len(score) - limit]
+        picked = np.flatnonzero(score >= cutoff - 1e-3)
+    else:
+        picked = np.arange(len(score))
+    rounded = [round(float(score[i]), 3) for i in picked]
+    order = sorted(range(len(picked)), key=lambda k: (-rounded[k], picked[k]))[:limit]
+    rows = picked[order]
+
+    names = cand["Name"].to_numpy()[rows]
+    inj = cand["Inj"].to_numpy()[rows] if "Inj" in cand.columns else None
+    return _format_recommendations(names, inj, values[rows], [rounded[k] for k in order], effective_cols, w)
+
+def _format_recommendations(names, inj, values, scores, effective_cols, w):
+    """Board recommendation rows: display name, score and the top 3 weighted category strengths."""
+    active = np.flatnonzero(np.asarray(w) > 0)
+    top_idx = np.argsort(-values[:, active], axis=1, kind="stable")[:, :3]
+    recs = []
+    for k in range(len(names)):
+        display_name = names[k]
         # For injured/suspended players, show games in parentheses when available (e.g., INJ 8g / SUSP 4g).
-        if "Inj" in cand.columns:
-            inj_raw = str(row.get("Inj", "") or "").strip()
-            m = re.search(r"(?:INJ|SUSP)\s*(\d+)\s*g", inj_raw, flags=re.IGNORECASE)
+        if inj is not None:
+            inj_raw = "" if pd.isna(inj[k]) else str(inj[k] or "").strip()
+            m = _INJ_GAMES_RE.search(inj_raw)
             if m:
                 display_name = f"{display_name} ({m.group(1)}g)"
-
-        top_items = sorted(((c, float(row[c])) for c in effective_cols if weights.get(c,0)>0),
-                           key=lambda x: x[1], reverse=True)[:3]
         top_readable = []
-        for c, v in top_items:
-            label = next((lbl for lbl, vc in CAT_LABEL_TO_VALCOL.items() if vc == c), c)
-            top_readable.append({"stat": label, "v": round(v, 2)})
-        scores.append({"Name": display_name, "score": round(score, 3), "top": top_readable})
+        for j in active[top_idx[k]]:
+            c = effective_cols[j]
+            top_readable.append({"stat": VALCOL_TO_CAT_LABEL.get(c, c), "v": round(float(values[k, j]), 2)})
+        recs.append({"Name": display_name, "score": float(scores[k]), "top": top_readable})
+    return recs
+
+# -----------------------------------------------------------------------------
+# Draft sessions
+# -----------------------------------------------------------------------------
+# Live Board state kept server-side; clients send pick deltas and viewers poll.
+DRAFT_PERSIST = os.getenv("COURTCRAFT_DRAFT_PERSIST", "1") != "0"
+# Anonymous drafts this browser created (kept in its session cookie) and may edit.
+DRAFTS_PER_BROWSER = 20
+
+def _remember_draft(draft_id):
+    session["drafts"] = [d for d in session.get("drafts", []) if d != draft_id][-(DRAFTS_PER_BROWSER - 1):] + [draft_id]
+
+def _can_edit_draft(s) -> bool:
+    if s.owner is not None:
+        return s.owner == session.get("user_id")
+    return s.id in session.get("drafts", [])
+
+def _prune_drafts(db):
+    """Drop stored drafts idle for longer than the in-memory session TTL."""
+    cutoff = (datetime.now() - timedelta(seconds=DRAFT_SESSION_TTL)).isoformat()
+    db.execute("DELETE FROM draft_sessions WHERE updated_at < ?", (cutoff,))
+
+def _persist_draft(s):
+    if not DRAFT_PERSIST:
+        return
+    db = get_db()
+    _prune_drafts(db)
+    db.execute(
+        "INSERT INTO draft_sessions(id, season, user_id, state, updated_at) VALUES(?,?,?,?,?) "
+        "ON CONFLICT(id) DO UPDATE SET state=excluded.state, updated_at=excluded.updated_at",
+        (s.id, s.season, s.owner, json.dumps(s.snapshot()), datetime.now().isoformat()),
+    )
+    db.commit()
 
-    scores.sort(key=lambda x: x["score"], reverse=True)
-    return jsonify({"recommendations": scores[:25], "used_type": used_type})
+def _find_draft(draft_id):
+    """Live session, reloaded from SQLite after a restart when persistence is on."""
+    s = get_draft_session(draft_id)
+    if s is not None or not DRAFT_PERSIST:
+        return s
+    db = get_db()
+    _prune_drafts(db)
+    db.commit()
+    row = db.execute("SELECT season, user_id, state, updated_at FROM draft_sessions WHERE id=?", (draft_id,)).fetchone()
+    if row is None:
+        return None
+    state = json.loads(row["state"])
+    s = DraftSession(
+        row["season"], data_type=state.get("data_type", "nopunts"), scoring=state.get("scoringType", "9cat"),
+        punts=state.get("punts", []), taken=state.get("taken", []), my_team=state.get("my_team", []),
+        owner=row["user_id"], session_id=draft_id, version=int(state.get("version", 0)),
+    )
+    # Idle time carries over a restart; reloading is not activity.
+    s.updated_at = datetime.fromisoformat(row["updated_at"]).timestamp()
+    return add_draft_session(s)
+
+@metrics.timed("recommendations")
+def _draft_response(s, limit=DRAFT_TOP_N):
+    """Session state plus its top recommendations, computed once per session version."""
+    with s.lock:
+        ds, used_type = _load_dataset_for_recs(s.season, s.data_type)
+        state = s.snapshot()
+        if ds is None:
+            return dict(state, recommendations=[], error="Dataset not available for this season.")
+        cached = s.cached_recommendations(ds.version, limit) if ds.version is not None else None
+        if cached is not None:
+            return dict(state, **cached)
+        cols = [c for c in VAL_COLS if c in ds.columns]
+        if not cols:
+            return dict(state, recommendations=[], error="Value columns not found in dataset.")
+        effective_cols = [c for c in cols if not (s.scoring == "8cat" and c == "toV")]
+        punt_valcols = {CAT_LABEL_TO_VALCOL.get(lbl) for lbl in s.punts}
+        rows, scores, weights = s.top(ds, effective_cols, punt_valcols, VAL_COLS, limit=limit)
+        values = np.nan_to_num(ds.values[np.ix_(rows, [ds.value_cols.index(c) for c in effective_cols])])
+        inj = ds.df["Inj"].to_numpy()[rows] if "Inj" in ds.columns else None
+        payload = {
+            "recommendations": _format_recommendations(
+                ds.df["Name"].to_numpy()[rows], inj, values, scores, effective_cols, weights),
+            "used_type": used_type,
+        }
+        if ds.version is not None:
+            s.cache_recommendations(state["version"], ds.version, limit, payload)
+        return dict(state, **payload)
+
+def _names_arg(payload, key):
+    return [str(n).strip() for n in (payload.get(key) or []) if n and str(n).strip()]
+
+@app.route("/season/<season>/draft", methods=["POST"])
+def draft_create(season):
+    """Start a draft session from the Board's full state."""
+    payload = request.get_json(force=True, silent=True) or {}
+    punts = payload.get("punts")
+    s = add_draft_session(DraftSession(
+        season, data_type=payload.get("data_type", "nopunts"),
+        scoring=(payload.get("scoringType") or "9cat").lower(), punts=punts if isinstance(punts, list) else [],
+        taken=_names_arg(payload, "taken"), my_team=_names_arg(payload, "my_team"),
+        owner=session.get("user_id"),
+    ))
+    if s.owner is None:
+        _remember_draft(s.id)
+    _persist_draft(s)
+    return jsonify(_draft_response(s)), 201
+
+@app.route("/draft/<draft_id>", methods=["GET", "POST"])
+def draft_session(draft_id):
+    """GET polls (pass ?since=<version> to skip unchanged state); POST applies a pick delta."""
+    s = _find_draft(draft_id)
+    if s is None:
+        return jsonify({"error": "Unknown draft session."}), 404
+    if request.method == "GET":
+        since = request.args.get("since")
+        if since is not None and since == str(s.version):
+            return jsonify({"id": s.id, "version": s.version, "unchanged": True})
+        return jsonify(_draft_response(s))
+
+    if not _can_edit_draft(s):
+        return jsonify({"error": "Only the session owner can change this draft."}), 403
+    payload = request.get_json(force=True, silent=True) or {}
+    scoring = payload.get("scoringType")
+    punts = payload.get("punts")
+    changed = s.apply(
+        add=_names_arg(payload, "add"), remove=_names_arg(payload, "remove"),
+        my_add=_names_arg(payload, "my_add"), my_remove=_names_arg(payload, "my_remove"),
+        scoring=scoring.lower() if scoring else None, punts=punts if isinstance(punts, list) else None,
+    )
+    if changed:
+        touch_draft_session(s)
+        _persist_draft(s)
+    return jsonify(_draft_response(s))
 
 # -----------------------------------------------------------------------------
 # Board page
@@ -1137,9 +2044,11 @@ def board_page(season):
         flash("Internal server error while preparing the board page.", "danger")
         return render_template("board.html", season=season, team_players=[], team_data_type="nopunts", league_taken_players=[])
 
+# Loads every season's rankings once, so headshot requests never do it.
+_refresh_known_players()
+
 if __name__ == "__main__":
-    app.run(
-        debug=(os.getenv("FLASK_DEBUG", "0") == "1"),
-        host=os.getenv("FLASK_HOST", "127.0.0.1"),
-        port=int(os.getenv("FLASK_PORT", "5000")),
-    )
+    # Scan/simulation workers are spawned and re-import __main__; serve.py keeps that to
+    # a few lines instead of a second copy of this module, its DB init and rankings load.
+    serve = os.path.join(os.path.dirname(os.path.abspath(__file__)), "serve.py")
+    os.execv(sys.executable, [sys.executable, serve, *sys.argv[1:]])
@@ -0,0 +1,277 @@
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from scoring import category_weights
+from season_dataset import normalize_name
+
+TOP_N = 25
+SESSION_TTL = 12 * 3600
+MAX_SESSIONS = 500
+_RANKING_CACHE_MAX = 256
+
+SESSIONS = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+# {(source, version, cols, weights): (order, pos, scores)}; oldest dropped past the cap.
+_RANKINGS = {}
+_RANKINGS_LOCK = threading.Lock()
+
+
+class Fenwick:
+    """0/1 flags over positions 0..n-1 with O(log n) updates and k-th set flag lookup."""
+
+    def __init__(self, flags):
+        n = len(flags)
+        tree = [0] * (n + 1)
+        for i, f in enumerate(flags, start=1):
+            tree[i] += int(f)
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self.n = n
+        self.tree = tree
+        self._top_bit = 1 << (n.bit_length() - 1) if n else 0
+
+    def add(self, i: int, delta: int) -> None:
+        i += 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def kth(self, k: int) -> int:
+        """Position of the k-th (1-based) set flag, or -1 when fewer than k are set."""
+        pos, step = 0, self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos if pos < self.n else -1
+
+
+def _eligible(ds) -> np.ndarray:
+    """Players the Board may recommend: everyone not out for the season (X in Inj)."""
+    keep = np.ones(len(ds), dtype=bool)
+    if "Inj" in ds.columns:
+        keep &= ~ds.df["Inj"].fillna("").astype(str).str.strip().str.upper().str.startswith("X").to_numpy()
+    return keep
+
+
+def ranking(ds, effective_cols, weights):
+    """
+    Eligible rows ordered best first for one weight vector, plus each row's
+    position in that order (-1 when ineligible) and the rounded scores. Ties
+    are broken by sheet order, as on the stateless recommend endpoint.
+    """
+    key = (ds.source, ds.version, tuple(effective_cols), tuple(float(w) for w in weights))
+    if ds.version is not None:
+        with _RANKINGS_LOCK:
+            hit = _RANKINGS.get(key)
+        if hit is not None:
+            return hit
+
+    col_pos = [ds.value_cols.index(c) for c in effective_cols]
+    values = np.nan_to_num(ds.values[:, col_pos])
+    # Column by column, matching the float order of the recommend endpoint.
+    score = np.zeros(len(values))
+    for j in range(len(effective_cols)):
+        score += values[:, j] * weights[j]
+    scores = np.array([round(float(s), 3) for s in score])
+    rows = np.flatnonzero(_eligible(ds))
+    order = rows[np.lexsort((rows, -scores[rows]))]
+    pos = np.full(len(ds), -1, dtype=np.intp)
+    pos[order] = np.arange(len(order))
+    result = (order, pos, scores)
+
+    if ds.version is not None:
+        with _RANKINGS_LOCK:
+            _RANKINGS[key] = result
+            while len(_RANKINGS) > _RANKING_CACHE_MAX:
+                _RANKINGS.pop(next(iter(_RANKINGS)))
+    return result
+
+
+class DraftSession:
+    """
+    One live draft: taken players, my team and the scoring settings, held
+    server-side so clients only send pick deltas.
+
+    Recommendations come from a cached full ranking for the current weights
+    and a Fenwick tree over it marking who is still available. A pick or an
+    undo flips one flag in O(log n), and the top N is N k-th lookups. The tree
+    is rebuilt only when the weights change, which happens when my team's
+    weakest categories or the settings change.
+    """
+
+    def __init__(self, season, data_type="nopunts", scoring="9cat", punts=(), taken=(), my_team=(),
+                 owner=None, session_id=None, version=0):
+        self.id = session_id or uuid.uuid4().hex
+        self.season = season
+        self.data_type = data_type
+        self.scoring = scoring
+        self.punts = list(punts)
+        self.owner = owner
+        self.taken = OrderedDict()
+        self.my_team = OrderedDict()
+        self.version = version
+        self.updated_at = time.time()
+        self.lock = threading.RLock()
+        self._ds = None
+        self._index = None      # (ranking key, order, pos, scores, fenwick)
+        self._excluded = Counter()
+        self._recs = None       # (version, ds version, limit, payload)
+        for n in taken:
+            self._add(self.taken, n)
+        for n in my_team:
+            self._add(self.my_team, n)
+
+    # ---- state ----
+    def _names(self):
+        return list(self.taken.values()) + list(self.my_team.values())
+
+    def _rows(self, name):
+        return self._ds.lookup([name])[0] if self._ds is not None else ()
+
+    def _exclude(self, name, delta):
+        for row in self._rows(name):
+            before = self._excluded[row] > 0
+            self._excluded[row] += delta
+            if self._excluded[row] <= 0:
+                del self._excluded[row]
+            after = self._excluded[row] > 0 if row in self._excluded else False
+            if self._index is not None and before != after:
+                p = self._index[2][row]
+                if p >= 0:
+                    self._index[4].add(int(p), -1 if after else 1)
+
+    def _add(self, bucket, name):
+        name = str(name or "").strip()
+        key = normalize_name(name)
+        if not key or key in bucket:
+            return False
+        bucket[key] = name
+        self._exclude(name, 1)
+        return True
+
+    def _remove(self, bucket, name):
+        name = bucket.pop(normalize_name(name), None)
+        if name is None:
+            return False
+        self._exclude(name, -1)
+        return True
+
+    def apply(self, add=(), remove=(), my_add=(), my_remove=(), scoring=None, punts=None) -> bool:
+        """Apply a delta; returns whether anything changed (and bumps the version if so)."""
+        with self.lock:
+            changed = False
+            for n in remove:
+                changed |= self._remove(self.taken, n)
+            for n in my_remove:
+                changed |= self._remove(self.my_team, n)
+            for n in add:
+                changed |= self._add(self.taken, n)
+            for n in my_add:
+                changed |= self._add(self.my_team, n)
+            if scoring is not None and scoring != self.scoring:
+                self.scoring, changed = scoring, True
+            if punts is not None and list(punts) != self.punts:
+                self.punts, changed = list(punts), True
+            if changed:
+                self.version += 1
+                self.updated_at = time.time()
+            return changed
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "id": self.id,
+                "season": self.season,
+                "version": self.version,
+                "data_type": self.data_type,
+                "scoringType": self.scoring,
+                "punts": list(self.punts),
+                "taken": list(self.taken.values()),
+                "my_team": list(self.my_team.values()),
+            }
+
+    # ---- recommendations ----
+    def _bind(self, ds):
+        """Attach (or re-attach after a rankings sync) the dataset rows are looked up in."""
+        if self._ds is ds:
+            return
+        self._ds = ds
+        self._index = None
+        self._excluded = Counter()
+        for name in self._names():
+            self._exclude(name, 1)
+
+    def top(self, ds, effective_cols, punt_valcols, value_cols, limit=TOP_N):
+        """(rows, scores, weights) of the best `limit` available players for my team."""
+        with self.lock:
+            self._bind(ds)
+            totals, _ = ds.totals(list(self.my_team.values()), value_cols)
+            weights = category_weights(effective_cols, punt_valcols, totals)
+            key = (tuple(effective_cols), tuple(weights.tolist()))
+            if self._index is None or self._index[0] != key:
+                order, pos, scores = ranking(ds, effective_cols, weights)
+                flags = np.ones(len(order), dtype=bool)
+                gone = pos[np.fromiter(self._excluded, dtype=np.intp, count=len(self._excluded))]
+                flags[gone[gone >= 0]] = False
+                self._index = (key, order, pos, scores, Fenwick(flags))
+            _, order, _, scores, fenwick = self._index
+            rows = []
+            for k in range(1, limit + 1):
+                p = fenwick.kth(k)
+                if p < 0:
+                    break
+                rows.append(order[p])
+            rows = np.array(rows, dtype=np.intp)
+            return rows, scores[rows], weights
+
+    def cached_recommendations(self, ds_version, limit):
+        with self.lock:
+            if self._recs and self._recs[:3] == (self.version, ds_version, limit):
+                return self._recs[3]
+            return None
+
+    def cache_recommendations(self, version, ds_version, limit, payload):
+        with self.lock:
+            self._recs = (version, ds_version, limit, payload)
+
+
+def _prune(now):
+    # SESSIONS is ordered by last change (add_session / touch_session), so the head is the stalest.
+    while SESSIONS:
+        oldest = next(iter(SESSIONS.values()))
+        if len(SESSIONS) <= MAX_SESSIONS and now - oldest.updated_at < SESSION_TTL:
+            break
+        SESSIONS.popitem(last=False)
+
+
+def add_session(s: DraftSession) -> DraftSession:
+    with _SESSIONS_LOCK:
+        SESSIONS[s.id] = s
+        SESSIONS.move_to_end(s.id)
+        _prune(time.time())
+    return s
+
+
+def get_session(session_id: str):
+    """Live session, or None once it has been idle for SESSION_TTL. Reading does not renew it."""
+    with _SESSIONS_LOCK:
+        s = SESSIONS.get(session_id or "")
+        if s is not None and time.time() - s.updated_at >= SESSION_TTL:
+            del SESSIONS[s.id]
+            return None
+        return s
+
+
+def touch_session(s: DraftSession) -> None:
+    """Mark a session as just changed, so it is evicted last (call after apply())."""
+    with _SESSIONS_LOCK:
+        if s.id in SESSIONS:
+            SESSIONS.move_to_end(s.id)
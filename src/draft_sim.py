@@ -0,0 +1,190 @@
+import atexit
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from scoring import category_weights_batch
+
+SIM_WORKERS = int(os.getenv("COURTCRAFT_SIM_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Drafts per task. Fixed so a given seed gives the same result for any worker count.
+SIM_CHUNK = 500
+MAX_SIMS = 50000
+
+_POOL_LOCK = threading.Lock()
+_POOL = {"workers": None, "executor": None}
+
+
+def _snake_order(teams: int, rounds: int) -> np.ndarray:
+    """Team index on the clock for every pick of a snake draft."""
+    order = [list(range(teams)) if r % 2 == 0 else list(range(teams - 1, -1, -1)) for r in range(rounds)]
+    return np.array(order, dtype=np.intp).ravel()
+
+
+def _simulate_chunk(task):
+    """
+    Run `n` snake drafts side by side. Every array carries a leading draft axis,
+    so each pick is one vectorized step across all drafts in the chunk.
+    """
+    (n, seed, values, eff_pos, punt_mask, log_rank, window, teams, slot, rounds, noise) = task
+    rng = np.random.default_rng(seed)
+    players = values.shape[0]
+    eff_values = values[:, eff_pos]
+    eff_cols = list(range(len(eff_pos)))
+    punt_cols = {j for j in eff_cols if punt_mask[j]}
+
+    # Each opponent drafts off its own noisy copy of the rankings (log-normal
+    # noise on rank, so later picks wander further than early ones).
+    opp_keys = rng.standard_normal((teams, n, window), dtype=np.float32)
+    opp_keys *= noise
+    opp_keys += log_rank[:window].astype(np.float32)
+    taken = np.zeros((n, players), dtype=bool)
+    totals = np.zeros((n, teams, values.shape[1]))
+    my_picks = np.empty((n, rounds), dtype=np.intp)
+    drafts = np.arange(n)
+
+    for pick_no, team in enumerate(_snake_order(teams, rounds)):
+        if team == slot:
+            weights = category_weights_batch(eff_cols, punt_cols, totals[:, slot, eff_pos])
+            scores = weights @ eff_values.T
+            scores[taken] = -np.inf
+            pick = np.argmax(scores, axis=1)
+            my_picks[:, pick_no // teams] = pick
+        else:
+            pick = np.argmin(opp_keys[team], axis=1)
+        taken[drafts, pick] = True
+        totals[:, team, :] += values[pick]
+        in_window = pick < window
+        opp_keys[:, drafts[in_window], pick[in_window]] = np.inf
+
+    power = totals.sum(axis=2)
+    positive = (totals > 0).sum(axis=2)
+    mine_p, mine_c = power[:, slot, None], positive[:, slot, None]
+    ahead = (power > mine_p) | ((power == mine_p) & (positive > mine_c))
+    ranks = 1 + ahead.sum(axis=1)
+    return totals[:, slot, :], ranks, my_picks
+
+
+def _executor(workers: int):
+    with _POOL_LOCK:
+        if _POOL["workers"] != workers:
+            if _POOL["executor"] is not None:
+                _POOL["executor"].shutdown(wait=False, cancel_futures=True)
+            _POOL.update(workers=workers, executor=ProcessPoolExecutor(
+                max_workers=workers, mp_context=mp.get_context("spawn"),
+            ))
+        return _POOL["executor"]
+
+
+@atexit.register
+def _cleanup_pool(executor=None) -> None:
+    """Shut the pool down (only if it is still `executor`, when given)."""
+    with _POOL_LOCK:
+        if _POOL["executor"] is None or executor not in (None, _POOL["executor"]):
+            return
+        _POOL["executor"].shutdown(wait=False, cancel_futures=True)
+        _POOL.update(workers=None, executor=None)
+
+
+def _summary(samples: np.ndarray) -> dict:
+    p10, p50, p90 = np.percentile(samples, [10, 50, 90])
+    return {
+        "mean": round(float(samples.mean()), 2),
+        "std": round(float(samples.std()), 2),
+        "p10": round(float(p10), 2),
+        "p50": round(float(p50), 2),
+        "p90": round(float(p90), 2),
+    }
+
+
+def simulate_drafts(ds, cols, effective_cols, punt_valcols=(), teams=12, slot=1, rounds=13,
+                    sims=10000, noise=0.15, seed=None, labels=None, workers=None):
+    """
+    Monte Carlo snake drafts from draft slot `slot` (1-based).
+
+    Opponents take the best available player by Rank after log-normal noise
+    (`noise` is the standard deviation of log(rank)). My team picks like the
+    Board: weighted value with punts zeroed and the three weakest categories
+    boosted, re-weighted after every pick. `cols` are summed for the power
+    score (as on the league page); `effective_cols` drive my picks and the
+    reported category distribution.
+    """
+    labels = labels or {}
+    workers = SIM_WORKERS if workers is None else workers
+    teams, rounds = max(2, int(teams)), max(1, int(rounds))
+    slot = min(max(1, int(slot)), teams) - 1
+    sims = min(max(1, int(sims)), MAX_SIMS)
+    started = time.perf_counter()
+
+    df = ds.df
+    pool = np.ones(len(df), dtype=bool)
+    if "Inj" in df.columns:
+        pool &= ~df["Inj"].fillna("").astype(str).str.strip().str.upper().str.startswith("X").to_numpy()
+    rank = np.arange(1, len(df) + 1, dtype=float)
+    if "Rank" in df.columns:
+        rank = pd.to_numeric(df["Rank"], errors="coerce").to_numpy(dtype=float)
+        rank = np.where(np.isfinite(rank) & (rank > 0), rank, np.nanmax(rank, initial=0) + 1 + np.arange(len(df)))
+    # Draft pool sorted by rank, so opponents' candidates are a prefix of it.
+    rows = np.flatnonzero(pool)
+    rows = rows[np.argsort(rank[rows], kind="stable")]
+    if len(rows) < teams * rounds:
+        raise ValueError(f"Only {len(rows)} draftable players for {teams * rounds} picks.")
+
+    col_pos = [ds.value_cols.index(c) for c in cols]
+    values = np.nan_to_num(ds.values[np.ix_(rows, col_pos)])
+    eff_pos = np.array([cols.index(c) for c in effective_cols], dtype=np.intp)
+    punt_mask = np.array([c in set(punt_valcols) for c in effective_cols])
+    window = min(len(rows), int(teams * rounds * 1.3) + teams)
+
+    seeds = np.random.SeedSequence(seed).spawn((sims + SIM_CHUNK - 1) // SIM_CHUNK)
+    tasks = [
+        (min(SIM_CHUNK, sims - k * SIM_CHUNK), s, values, eff_pos, punt_mask,
+         np.log(rank[rows]), window, teams, slot, rounds, float(noise))
+        for k, s in enumerate(seeds)
+    ]
+    if workers <= 0 or len(tasks) < 2:
+        parts = [_simulate_chunk(t) for t in tasks]
+    else:
+        executor = _executor(workers)
+        try:
+            parts = list(executor.map(_simulate_chunk, tasks))
+        except BrokenProcessPool:
+            # A worker died (or could not start); drop the pool and finish inline.
+            _cleanup_pool(executor)
+            parts = [_simulate_chunk(t) for t in tasks]
+
+    my_totals = np.concatenate([p[0] for p in parts])
+    ranks = np.concatenate([p[1] for p in parts])
+    picks = np.concatenate([p[2] for p in parts])
+
+    counts = np.bincount(picks.ravel(), minlength=len(rows))
+    round_sums = np.bincount(picks.ravel(), weights=np.tile(np.arange(1, rounds + 1), len(picks)), minlength=len(rows))
+    names = df["Name"].to_numpy()[rows]
+    most_drafted = [
+        {"Name": str(names[i]), "pct": round(100.0 * float(counts[i]) / sims, 1),
+         "avg_round": round(float(round_sums[i] / counts[i]), 1)}
+        for i in np.argsort(-counts, kind="stable")[:20] if counts[i]
+    ]
+    rank_counts = np.bincount(ranks, minlength=teams + 1)[1:]
+
+    return {
+        "sims": sims,
+        "teams": teams,
+        "slot": slot + 1,
+        "rounds": rounds,
+        "categories": [
+            dict(cat=labels.get(c, c), **_summary(my_totals[:, cols.index(c)])) for c in effective_cols
+        ],
+        "power_score": _summary(my_totals.sum(axis=1)),
+        "power_rank": {
+            "mean": round(float(ranks.mean()), 2),
+            "distribution": [{"rank": r + 1, "pct": round(100.0 * k / sims, 1)} for r, k in enumerate(rank_counts.tolist())],
+        },
+        "most_drafted": most_drafted,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 1),
+    }
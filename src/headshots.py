@@ -0,0 +1,352 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+
+# Player search endpoint (balldontlie-compatible: ?search=<name> -> {"data": [...]}).
+API_URL = os.getenv("COURTCRAFT_HEADSHOT_API", "https://www.balldontlie.io/api/v1/players")
+API_KEY = os.getenv("COURTCRAFT_HEADSHOT_API_KEY", "")
+CDN_URL = "https://cdn.nba.com/headshots/nba/latest/260x190/{pid}.png"
+DB_PATH = os.getenv("COURTCRAFT_HEADSHOT_DB", os.path.join(os.path.dirname(__file__), "headshots.db"))
+WORKERS = int(os.getenv("COURTCRAFT_HEADSHOT_WORKERS", "4"))
+TIMEOUT = 2.5
+# Image proxy cache (content-addressed files + an LRU index).
+IMAGE_DIR = os.getenv("COURTCRAFT_HEADSHOT_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".headshots"))
+IMAGE_CACHE_MAX_BYTES = int(float(os.getenv("COURTCRAFT_HEADSHOT_CACHE_MB", "200")) * 1024 * 1024)
+IMAGE_TIMEOUT = 5.0
+# Recording every hit would turn reads into writes; last_used is refreshed at most this often.
+TOUCH_INTERVAL = 3600
+
+HIT_TTL = 30 * 24 * 3600    # found a photo
+MISS_TTL = 24 * 3600        # API answered, no match
+ERROR_TTL = 5 * 60          # API unreachable; retry soon
+
+
+def placeholder_url(name: str) -> str:
+    return (
+        "https://ui-avatars.com/api/?name="
+        + urllib.parse.quote(name)
+        + "&background=f5b448&color=1f2a44&rounded=true&size=64"
+    )
+
+
+def fetch_json(url: str, timeout: float = TIMEOUT):
+    headers = {"Authorization": API_KEY} if API_KEY else {}
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8", "ignore"))
+
+
+def fetch_bytes(url: str, timeout: float = IMAGE_TIMEOUT):
+    """(body, content type) for an image URL."""
+    req = urllib.request.Request(url, headers={"User-Agent": "CourtCraft"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return resp.read(), resp.headers.get_content_type()
+
+
+def url_version(url: str) -> str:
+    """Short stable tag for an upstream URL, used to bust browser caches when it changes."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:10]
+
+
+class HeadshotResolver:
+    """
+    Player name -> headshot URL, resolved on a background thread pool.
+
+    Lookups never block on the network: a miss returns the placeholder and
+    queues the name; results (including "no photo") land in memory and in a
+    SQLite file with a TTL, so they survive restarts. Expired entries keep
+    serving their old URL while they are refreshed. `fetch` takes a URL and
+    returns parsed JSON, so tests can point `api_url` at a stub server.
+    """
+
+    def __init__(self, db_path=DB_PATH, api_url=API_URL, fetch=fetch_json, workers=WORKERS,
+                 hit_ttl=HIT_TTL, miss_ttl=MISS_TTL, error_ttl=ERROR_TTL):
+        self.db_path = db_path
+        self.api_url = api_url
+        self.fetch = fetch
+        self.workers = max(1, int(workers))
+        self.ttl = {"hit": hit_ttl, "miss": miss_ttl, "error": error_ttl}
+        self._mem = {}          # key -> (url or None, expires_at)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._readers = threading.local()
+        self._executor = None
+
+    # ---- storage ----
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS headshots (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn = conn
+        return self._conn
+
+    def _reader(self):
+        """Per-thread read connection, so lookups never wait on the resolver lock (WAL lets them run alongside writes)."""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            with self._lock:
+                self._db()  # creates the file and table
+            conn = self._readers.conn = sqlite3.connect(self.db_path)
+        return conn
+
+    def _entry(self, key):
+        entry = self._mem.get(key)
+        if entry is not None:
+            return entry
+        row = self._reader().execute("SELECT url, expires_at FROM headshots WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            # A resolution may have landed while we read; it wins over the older row.
+            return self._mem.setdefault(key, (row[0], row[1]))
+
+    def _store(self, key, url, outcome):
+        entry = (url, time.time() + self.ttl[outcome])
+        with self._lock:
+            self._mem[key] = entry
+            self._pending.discard(key)
+            db = self._db()
+            db.execute("INSERT OR REPLACE INTO headshots(key, url, expires_at) VALUES(?,?,?)", (key, url, entry[1]))
+            db.commit()
+
+    # ---- resolution ----
+    def resolve(self, name: str):
+        """Look `name` up now (blocking) and cache the outcome. Returns the photo URL or None."""
+        key = name.lower()
+        try:
+            with metrics.span("headshot_fetch"):
+                payload = self.fetch(self.api_url + "?search=" + urllib.parse.quote(name))
+        except Exception:
+            # Keep serving a previously found photo; just try again sooner.
+            stale = self._mem.get(key)
+            self._store(key, stale[0] if stale else None, "error")
+            return stale[0] if stale else None
+        players = (payload or {}).get("data") or []
+        exact = next(
+            (p for p in players if (p.get("first_name", "") + " " + p.get("last_name", "")).strip().lower() == key),
+            players[0] if players else None,
+        )
+        pid = (exact or {}).get("id")
+        url = CDN_URL.format(pid=pid) if pid else None
+        self._store(key, url, "hit" if url else "miss")
+        return url
+
+    def _schedule(self, name, key):
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="headshot")
+            executor = self._executor
+        executor.submit(self.resolve, name)
+
+    def lookup(self, name: str):
+        """(url, pending) without blocking; queues a background lookup for unknown or expired names."""
+        key = name.lower()
+        entry = self._entry(key)
+        if entry is None or entry[1] < time.time():
+            metrics.count("headshot", "miss" if entry is None else "stale")
+            self._schedule(name, key)
+        else:
+            metrics.count("headshot", "hit")
+        if entry is None:
+            return placeholder_url(name), True
+        return entry[0] or placeholder_url(name), False
+
+    def url(self, name: str) -> str:
+        return self.lookup(name)[0]
+
+    def ensure(self, name: str) -> str:
+        """Like url(), but resolves unknown or expired names right away (blocking)."""
+        entry = self._entry(name.lower())
+        if entry is None or entry[1] < time.time():
+            return self.resolve(name) or placeholder_url(name)
+        return entry[0] or placeholder_url(name)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class ImageCache:
+    """
+    Upstream image URL -> local file. Bodies are stored once per SHA-256 under
+    `directory`; a SQLite index maps URLs to them and tracks last use so the
+    least recently used images go first once the cache passes `max_bytes`.
+    `fetch` takes a URL and returns (bytes, content type).
+    """
+
+    def __init__(self, directory=IMAGE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES, fetch=fetch_bytes):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.fetch = fetch
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS images (
+                    url TEXT PRIMARY KEY,
+                    sha TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_images_sha ON images(sha)")
+            self._conn = conn
+        return self._conn
+
+    def path(self, sha: str) -> str:
+        return os.path.join(self.directory, sha[:2], sha)
+
+    def _cached(self, url):
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT sha, content_type, last_used FROM images WHERE url=?", (url,)).fetchone()
+            if row is None or not os.path.exists(self.path(row[0])):
+                return None
+            now = time.time()
+            if now - row[2] > TOUCH_INTERVAL:
+                db.execute("UPDATE images SET last_used=? WHERE url=?", (now, url))
+                db.commit()
+            return self.path(row[0]), row[1], row[0]
+
+    def get(self, url: str):
+        """(path, content type, sha) for `url`, fetching it on first use. Raises if the fetch fails."""
+        hit = self._cached(url)
+        if hit is not None:
+            metrics.count("headshot_image", "hit")
+            return hit
+        metrics.count("headshot_image", "miss")
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            try:
+                # Another request may have filled it while we waited.
+                hit = self._cached(url)
+                if hit is not None:
+                    return hit
+                with metrics.span("headshot_image_fetch"):
+                    body, content_type = self.fetch(url)
+                sha = hashlib.sha256(body).hexdigest()
+                path = self.path(sha)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp = f"{path}.{threading.get_ident()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(body)
+                    os.replace(tmp, path)
+                with self._lock:
+                    db = self._db()
+                    db.execute(
+                        "INSERT OR REPLACE INTO images(url, sha, content_type, size, last_used) VALUES(?,?,?,?,?)",
+                        (url, sha, content_type or "application/octet-stream", len(body), time.time()),
+                    )
+                    db.commit()
+                    self._evict(keep=sha)
+                return path, content_type, sha
+            finally:
+                # Drop the per-URL lock on every path, including a failed fetch.
+                with self._lock:
+                    if self._url_locks.get(url) is url_lock:
+                        del self._url_locks[url]
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total()
+
+    def _total(self):
+        row = self._db().execute("SELECT SUM(size) FROM (SELECT MAX(size) AS size FROM images GROUP BY sha)").fetchone()
+        return int(row[0] or 0)
+
+    def _evict(self, keep=None):
+        total = self._total()
+        if total <= self.max_bytes:
+            return
+        db = self._db()
+        for sha, size in db.execute(
+            "SELECT sha, MAX(size) FROM images GROUP BY sha ORDER BY MAX(last_used)"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            if sha == keep:
+                continue
+            db.execute("DELETE FROM images WHERE sha=?", (sha,))
+            try:
+                os.remove(self.path(sha))
+            except OSError:
+                pass
+            total -= size
+        db.commit()
+
+
+def prefetch(names, resolver, images, workers=8, progress=None):
+    """Resolve and download headshots for `names`, at most `workers` at a time. Returns (ok, failed)."""
+    def one(name):
+        images.get(resolver.ensure(name))
+
+    ok = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="headshot-prefetch") as pool:
+        futures = {pool.submit(one, n): n for n in names}
+        for done, fut in enumerate(as_completed(futures), start=1):
+            try:
+                fut.result()
+                ok += 1
+            except Exception:
+                failed += 1
+            if progress:
+                progress(done, len(futures), futures[fut])
+    return ok, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Warm the headshot cache for every player in a season's rankings.")
+    parser.add_argument("--season", action="append", required=True, help="Season like 24-25 (repeatable).")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads (default: 8).")
+    args = parser.parse_args()
+
+    import app
+
+    names = sorted({n for season in args.season for n in app.load_all_player_names(season)})
+    if not names:
+        raise SystemExit("No players found for " + ", ".join(args.season))
+
+    def report(done, total, name):
+        if done % 50 == 0 or done == total:
+            print(f"{done}/{total} ({name})")
+
+    ok, failed = prefetch(names, app.HEADSHOTS, app.HEADSHOT_IMAGES, workers=args.workers, progress=report)
+    print(f"cached {ok} headshots, {failed} failed, {app.HEADSHOT_IMAGES.total_bytes() / 1e6:.1f} MB on disk")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
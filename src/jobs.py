@@ -0,0 +1,107 @@
+import threading
+import time
+import traceback
+import uuid
+
+# Finished jobs are kept this long so clients can still poll their result.
+JOB_TTL_SECONDS = 15 * 60
+
+JOBS = {}
+_JOBS_LOCK = threading.Lock()
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """A background task with progress, cancellation and a JSON-friendly status."""
+
+    def __init__(self, kind: str, owner=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.status = "queued"
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, done: int, total=None, message=None) -> None:
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def _prune_finished() -> None:
+    cutoff = time.time() - JOB_TTL_SECONDS
+    for job_id in [j.id for j in JOBS.values() if j.finished_at and j.finished_at < cutoff]:
+        JOBS.pop(job_id, None)
+
+
+def start_job(kind: str, fn, *args, owner=None, max_active=None, **kwargs):
+    """Run fn(job, *args, **kwargs) on a daemon thread; its return value becomes job.result.
+
+    With max_active, returns None instead when `owner` already has that many unfinished `kind` jobs.
+    """
+    job = Job(kind, owner=owner)
+    with _JOBS_LOCK:
+        _prune_finished()
+        if max_active is not None:
+            active = sum(1 for j in JOBS.values() if j.kind == kind and j.owner == owner and j.finished_at is None)
+            if active >= max_active:
+                return None
+        JOBS[job.id] = job
+
+    def _run():
+        job.status = "running"
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "cancelled" if job.cancelled else "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    threading.Thread(target=_run, name=f"{kind}-{job.id[:8]}", daemon=True).start()
+    return job
+
+
+def get_job(job_id: str, owner=None):
+    job = JOBS.get(job_id)
+    if job is None or (job.owner is not None and job.owner != owner):
+        return None
+    return job
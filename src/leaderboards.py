@@ -0,0 +1,168 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from rankings_store import load_rankings
+from season_dataset import NameIndex
+
+TOP_K = 10
+# (label, stat column, smaller is better, attempts column for percentage categories)
+CATEGORIES = (
+    ("PTS", "p/g", False, None),
+    ("REB", "r/g", False, None),
+    ("AST", "a/g", False, None),
+    ("STL", "s/g", False, None),
+    ("BLK", "b/g", False, None),
+    ("3PM", "3/g", False, None),
+    ("TO", "to/g", True, None),
+    ("FG%", "fg%", False, "fga/g"),
+    ("FT%", "ft%", False, "fta/g"),
+)
+# Season attempts (per-game attempts x games) needed to qualify for a percentage leaderboard.
+MIN_ATTEMPTS = {"fga/g": 250.0, "fta/g": 100.0}
+STAT_COLS = list(dict.fromkeys(["g"] + [c for _, col, _, att in CATEGORIES for c in (col, att) if c]))
+
+# Stat matrices by (source, version); oldest dropped past the cap.
+_MATRICES = {}
+_MATRICES_MAX = 32
+_MATRICES_LOCK = threading.Lock()
+
+
+def top_k(values, k, ascending=False, mask=None):
+    """
+    Row positions of the k best finite values, best first. Partial selection
+    picks the cutoff, so only rows tied with or better than it are sorted;
+    ties keep sheet order.
+    """
+    score = values if ascending else -values
+    ok = np.isfinite(score)
+    if mask is not None:
+        ok &= mask
+    rows = np.flatnonzero(ok)
+    if k <= 0:
+        return rows[:0]
+    if len(rows) > k:
+        cand = score[rows]
+        cutoff = cand[np.argpartition(cand, k - 1)[k - 1]]
+        rows = rows[cand <= cutoff]
+    return rows[np.lexsort((rows, score[rows]))][:k]
+
+
+def stat_matrix(ds):
+    """STAT_COLS as a float matrix for a SeasonDataset, cached per dataset version."""
+    key = (ds.source, ds.version)
+    if ds.version is not None:
+        with _MATRICES_LOCK:
+            hit = _MATRICES.get(key)
+        if hit is not None:
+            return hit
+    values = NameIndex(ds.df, STAT_COLS).values
+    if ds.version is not None:
+        with _MATRICES_LOCK:
+            _MATRICES[key] = values
+            while len(_MATRICES) > _MATRICES_MAX:
+                _MATRICES.pop(next(iter(_MATRICES)))
+    return values
+
+
+def leaders(df, k=TOP_K, min_attempts=None, values=None):
+    """
+    {category label: [{"rank", "Name", "Team", stat, ...}]} for one rankings
+    frame. Percentage categories only rank players with at least
+    `min_attempts` season attempts (defaulting to MIN_ATTEMPTS); their entries
+    also carry per-game and season attempts.
+    """
+    thresholds = dict(MIN_ATTEMPTS, **(min_attempts or {}))
+    if values is None:
+        values = NameIndex(df, STAT_COLS).values
+    col_pos = {c: j for j, c in enumerate(STAT_COLS)}
+    names = df["Name"].astype(str).to_numpy()
+    teams = df["Team"].fillna("").astype(str).to_numpy() if "Team" in df.columns else None
+    # Sheets without games played fall back to per-game attempts.
+    games = np.nan_to_num(values[:, col_pos["g"]], nan=0.0) if "g" in df.columns else 1.0
+
+    out = {}
+    for label, col, ascending, attempts in CATEGORIES:
+        if col not in df.columns:
+            continue
+        mask = total = None
+        if attempts is not None and attempts in df.columns:
+            total = values[:, col_pos[attempts]] * games
+            mask = total >= thresholds.get(attempts, 0.0)
+        rows = top_k(values[:, col_pos[col]], k, ascending=ascending, mask=mask)
+        board = []
+        for rank, r in enumerate(rows.tolist(), start=1):
+            entry = {"rank": rank, "Name": names[r], "Team": teams[r] if teams is not None else "",
+                     col: float(values[r, col_pos[col]])}
+            if total is not None:
+                entry[attempts] = float(values[r, col_pos[attempts]])
+                entry["attempts"] = round(float(total[r]))
+            board.append(entry)
+        out[label] = board
+    return out
+
+
+def season_leaders(path, k=TOP_K, min_attempts=None):
+    """leaders() for a rankings workbook path (compiled artifacts are reused); None if unreadable."""
+    df, _ = load_rankings(path)
+    if df is None or "Name" not in df.columns:
+        return None
+    return leaders(df, k=k, min_attempts=min_attempts)
+
+
+def format_text(result):
+    lines = []
+    for label, board in result.items():
+        lines.append(f"{label}:")
+        for e in board:
+            stat = next(v for c, v in e.items() if c not in ("rank", "Name", "Team"))
+            lines.append(f"  {e['rank']:2d}. {e['Name']:28s} {e['Team']:4s} {stat:8.3f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print per-category stat leaders for one or more seasons.")
+    parser.add_argument("--season", action="append", help="Season like 24-25 (repeatable; default: all).")
+    parser.add_argument("--k", type=int, default=TOP_K, help=f"Players per category (default: {TOP_K}).")
+    parser.add_argument("--min-fga", type=float, default=MIN_ATTEMPTS["fga/g"], help="Season FGA to qualify for FG%%.")
+    parser.add_argument("--min-fta", type=float, default=MIN_ATTEMPTS["fta/g"], help="Season FTA to qualify for FT%%.")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Seasons computed in parallel (default: up to 4).")
+    parser.add_argument("--json", action="store_true", help="Emit {season: leaders} as JSON.")
+    args = parser.parse_args()
+
+    import app
+
+    seasons = args.season or sorted(app.data_files, reverse=True)
+    paths = {}
+    for season in seasons:
+        found = dict(app._season_rankings_paths(season))
+        if found:
+            paths[season] = found.get("nopunts", next(iter(found.values())))
+    missing = [s for s in seasons if s not in paths]
+    if missing:
+        raise SystemExit("No rankings for " + ", ".join(missing))
+
+    min_attempts = {"fga/g": args.min_fga, "fta/g": args.min_fta}
+    jobs = [(paths[s], args.k, min_attempts) for s in seasons]
+    if args.workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs)), mp_context=mp.get_context("spawn")) as ex:
+            results = list(ex.map(season_leaders, *zip(*jobs)))
+    else:
+        results = [season_leaders(*job) for job in jobs]
+
+    if args.json:
+        print(json.dumps(dict(zip(seasons, results)), indent=2))
+        return
+    for season, result in zip(seasons, results):
+        print(f"== {season} ==")
+        print(format_text(result or {}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import atexit
+import multiprocessing as mp
+import os
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from jobs import JobCancelled
+from trade_finder import format_trades, search_trades
+
+SCAN_WORKERS = int(os.getenv("COURTCRAFT_SCAN_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Parent side: pools by (source, version, workers), each with its value matrix
+# in shared memory. Only the newest key gets new scans; an older pool is torn
+# down once the scans still running on it finish.
+_POOL_LOCK = threading.Lock()
+_POOLS = {}
+_CURRENT = {"key": None}
+
+# Worker side: the attached matrix, set once by _init_worker.
+_WORKER = {"shm": None, "values": None}
+
+
+def _attach(name: str):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Spawned workers share the parent's resource tracker, so the extra
+    # registration is a no-op and the parent's unlink still clears it.
+    return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(shm_name, shape, dtype):
+    try:
+        shm = _attach(shm_name)
+    except FileNotFoundError:
+        # The pool was retired (and its matrix unlinked) while this worker was starting.
+        return
+    _WORKER["shm"] = shm
+    _WORKER["values"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _scan_team(task):
+    team_idx, my_rows, opp_rows, col_pos, cols, my_punts, limit = task
+    values = _WORKER["values"][:, col_pos]
+    return team_idx, search_trades(
+        values, np.array(my_rows, dtype=np.intp), np.array(opp_rows, dtype=np.intp),
+        cols, my_punts=my_punts, limit=limit, budget_s=float("inf"),
+    )
+
+
+def _shutdown(entry) -> None:
+    entry["executor"].shutdown(wait=False, cancel_futures=True)
+    entry["shm"].close()
+    entry["shm"].unlink()
+
+
+def _acquire_pool(ds, workers: int):
+    """Pool entry whose workers share `ds.values`; release it with _release_pool when done."""
+    key = (ds.source, ds.version, workers)
+    with _POOL_LOCK:
+        entry = _POOLS.get(key)
+        if entry is None:
+            values = np.ascontiguousarray(ds.values, dtype=np.float64)
+            shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(shm.name, values.shape, values.dtype.str),
+            )
+            entry = _POOLS[key] = {"key": key, "executor": executor, "shm": shm, "users": 0}
+        entry["users"] += 1
+        _CURRENT["key"] = key
+        # Idle pools for other datasets go now; busy ones in _release_pool.
+        for other in [e for k, e in _POOLS.items() if k != key and e["users"] == 0]:
+            del _POOLS[other["key"]]
+            _shutdown(other)
+        return entry
+
+
+def _release_pool(entry, broken: bool = False) -> None:
+    key = entry["key"]
+    with _POOL_LOCK:
+        entry["users"] -= 1
+        if broken and _POOLS.get(key) is entry:
+            # A dead worker poisons the executor; drop it so the next scan starts fresh.
+            del _POOLS[key]
+        retired = _POOLS.get(key) is not entry or key != _CURRENT["key"]
+        if entry["users"] == 0 and retired:
+            if _POOLS.get(key) is entry:
+                del _POOLS[key]
+            _shutdown(entry)
+
+
+@atexit.register
+def _cleanup_pool() -> None:
+    with _POOL_LOCK:
+        for entry in _POOLS.values():
+            _shutdown(entry)
+        _POOLS.clear()
+
+
+def scan_league(job, ds, my_roster, teams, cols, my_punts=(), labels=None,
+                per_team=3, limit=10, workers=None):
+    """
+    Search trades between my roster and every league team; runs as a job.
+
+    `teams` is a list of {"team_name", "players"}. Each team is one task on the
+    process pool (or run inline when workers == 0). Returns partners ranked by
+    their best trade plus the overall top `limit` trades.
+    """
+    workers = SCAN_WORKERS if workers is None else workers
+    my_rows, _ = ds.lookup(my_roster)
+    col_pos = [ds.value_cols.index(c) for c in cols]
+    tasks = []
+    for i, team in enumerate(teams):
+        opp_rows, _ = ds.lookup(team["players"])
+        if len(opp_rows):
+            tasks.append((i, my_rows.tolist(), opp_rows.tolist(), col_pos, list(cols), set(my_punts), per_team))
+    job.progress(0, len(tasks), "Scanning league rosters")
+
+    raw = {}
+    if workers <= 0 or len(tasks) < 2:
+        for task in tasks:
+            job.check_cancelled()
+            values = ds.values[:, col_pos]
+            raw[task[0]] = search_trades(
+                values, my_rows, np.array(task[2], dtype=np.intp), cols,
+                my_punts=my_punts, limit=per_team, budget_s=float("inf"),
+            )
+            job.progress(len(raw))
+    else:
+        entry = _acquire_pool(ds, workers)
+        broken = False
+        try:
+            executor = entry["executor"]
+            pending = {executor.submit(_scan_team, task) for task in tasks}
+            while pending:
+                if job.cancelled:
+                    for f in pending:
+                        f.cancel()
+                    raise JobCancelled()
+                finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for f in finished:
+                    team_idx, res = f.result()
+                    raw[team_idx] = res
+                job.progress(len(raw))
+        except BrokenProcessPool:
+            broken = True
+            raise
+        except CancelledError:
+            raise RuntimeError("The trade scan was interrupted; please run it again.") from None
+        finally:
+            _release_pool(entry, broken=broken)
+
+    names = ds.df["Name"].to_numpy()
+    partners = []
+    overall = []
+    for team_idx, res in raw.items():
+        trades = format_trades(res["trades"], names, cols, labels)
+        if not trades:
+            continue
+        team_name = teams[team_idx]["team_name"]
+        partners.append({
+            "team_name": team_name,
+            "best_gain": max(t["my_gain"] for t in trades),
+            "trades": trades,
+        })
+        overall.extend(dict(t, team_name=team_name) for t in trades)
+    partners.sort(key=lambda p: p["best_gain"], reverse=True)
+    overall.sort(key=lambda t: (t["my_gain"], t["opp_gain"]), reverse=True)
+    return {
+        "teams_scanned": len(tasks),
+        "trades_evaluated": sum(r["evaluated"] for r in raw.values()),
+        "partners": partners,
+        "top_trades": overall[:limit],
+    }
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+# Per-game columns the simulation needs from a rankings sheet.
+STAT_COLS = ["g", "p/g", "3/g", "r/g", "a/g", "s/g", "b/g", "fg%", "fga/g", "ft%", "fta/g", "to/g"]
+# Category label -> value column, in Compare Teams order.
+CATEGORIES = [("PTS", "pV"), ("REB", "rV"), ("AST", "aV"), ("STL", "sV"), ("BLK", "bV"),
+              ("TO", "toV"), ("FG%", "fg%V"), ("FT%", "ft%V"), ("3PM", "3V")]
+LOWER_IS_BETTER = {"TO"}
+
+GAMES_PER_WEEK = 3.5
+# Variance / mean of a player's weekly count (1 would be Poisson); box-score
+# counts are over-dispersed game to game.
+DISPERSION = {"fga/g": 1.6, "fta/g": 1.8, "r/g": 1.5, "a/g": 1.5, "s/g": 1.2, "b/g": 1.4, "to/g": 1.3}
+MAX_SIMS = 50000
+
+
+def _weekly_counts(rng, per_game, games, phi):
+    """Negative-binomial weekly totals: a gamma-mixed Poisson with variance phi * mean."""
+    mean = per_game[None, :] * games
+    lam = rng.gamma(np.maximum(mean, 1e-9) / (phi - 1.0), phi - 1.0)
+    return rng.poisson(lam)
+
+
+def _player_stats(ds, roster):
+    rows, missing = ds.lookup(roster)
+    frame = ds.rows(rows)
+    stats = {c: pd.to_numeric(frame[c], errors="coerce").fillna(0.0).to_numpy(dtype=float) for c in STAT_COLS}
+    return stats, missing
+
+
+def simulate_matchup(ds, team_a, team_b, sims=10000, games_per_week=GAMES_PER_WEEK, seed=None, cats=None):
+    """
+    Simulate `sims` head-to-head weeks between two rosters in one batch.
+
+    Each player gets 3-4 scheduled games (averaging `games_per_week`), plays
+    each with probability from their games-played share, and produces
+    negative-binomial attempts and counting stats. Makes are binomial on
+    attempts, threes a binomial share of field-goal makes and points are
+    2*FGM + 3PM + FTM, so team FG%/FT% are true makes / attempts.
+
+    Returns per-category and overall win probabilities for team A.
+    """
+    cats = cats or [lbl for lbl, _ in CATEGORIES]
+    sims = min(max(1, int(sims)), MAX_SIMS)
+    rng = np.random.default_rng(seed)
+    stats_a, missing_a = _player_stats(ds, team_a)
+    stats_b, missing_b = _player_stats(ds, team_b)
+    n_a = len(stats_a["g"])
+    stats = {c: np.concatenate([stats_a[c], stats_b[c]]) for c in STAT_COLS}
+    n = len(stats["g"])
+
+    season_games = max(float(np.max(ds.df["g"].to_numpy(dtype=float), initial=0.0)), 1.0)
+    available = np.clip(stats["g"] / season_games, 0.0, 1.0)
+    base = int(games_per_week)
+    scheduled = base + (rng.random((sims, n)) < games_per_week - base)
+    games = rng.binomial(scheduled, available[None, :])
+
+    fga = _weekly_counts(rng, stats["fga/g"], games, DISPERSION["fga/g"])
+    fta = _weekly_counts(rng, stats["fta/g"], games, DISPERSION["fta/g"])
+    fgm = rng.binomial(fga, np.clip(stats["fg%"], 0.0, 1.0)[None, :])
+    ftm = rng.binomial(fta, np.clip(stats["ft%"], 0.0, 1.0)[None, :])
+    made = stats["fga/g"] * stats["fg%"]
+    three_share = np.divide(stats["3/g"], made, out=np.zeros(n), where=made > 0)
+    tpm = rng.binomial(fgm, np.clip(three_share, 0.0, 1.0)[None, :])
+
+    box = {
+        "PTS": 2 * fgm + tpm + ftm,
+        "3PM": tpm,
+        "REB": _weekly_counts(rng, stats["r/g"], games, DISPERSION["r/g"]),
+        "AST": _weekly_counts(rng, stats["a/g"], games, DISPERSION["a/g"]),
+        "STL": _weekly_counts(rng, stats["s/g"], games, DISPERSION["s/g"]),
+        "BLK": _weekly_counts(rng, stats["b/g"], games, DISPERSION["b/g"]),
+        "TO": _weekly_counts(rng, stats["to/g"], games, DISPERSION["to/g"]),
+    }
+
+    def team_totals(sl):
+        out = {k: v[:, sl].sum(axis=1).astype(float) for k, v in box.items()}
+        for lbl, makes, atts in (("FG%", fgm, fga), ("FT%", ftm, fta)):
+            m, a = makes[:, sl].sum(axis=1), atts[:, sl].sum(axis=1)
+            out[lbl] = np.divide(m, a, out=np.zeros(sims), where=a > 0)
+        return out
+
+    tot_a, tot_b = team_totals(slice(0, n_a)), team_totals(slice(n_a, n))
+    wins_a = np.zeros(sims)
+    wins_b = np.zeros(sims)
+    categories = []
+    for lbl in cats:
+        a, b = tot_a[lbl], tot_b[lbl]
+        a_wins, b_wins = (a < b, a > b) if lbl in LOWER_IS_BETTER else (a > b, a < b)
+        wins_a += a_wins
+        wins_b += b_wins
+        categories.append({
+            "cat": lbl,
+            "a_mean": round(float(a.mean()), 3 if "%" in lbl else 1),
+            "b_mean": round(float(b.mean()), 3 if "%" in lbl else 1),
+            "a_win": round(float(a_wins.mean()), 3),
+            "b_win": round(float(b_wins.mean()), 3),
+            "tie": round(float(1.0 - a_wins.mean() - b_wins.mean()), 3),
+        })
+
+    return {
+        "sims": sims,
+        "categories": categories,
+        "a_win": round(float((wins_a > wins_b).mean()), 3),
+        "b_win": round(float((wins_b > wins_a).mean()), 3),
+        "tie": round(float((wins_a == wins_b).mean()), 3),
+        "a_cats": round(float(wins_a.mean()), 2),
+        "b_cats": round(float(wins_b.mean()), 2),
+        "missing": missing_a + missing_b,
+    }
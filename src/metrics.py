@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+# Request and stage timings plus cache counters, exported as Prometheus text.
+# Off unless COURTCRAFT_METRICS=1. While off, `timed` returns functions
+# unchanged, `span` hands back a shared no-op context and `count` returns
+# immediately, so instrumented code pays next to nothing.
+ENABLED = os.getenv("COURTCRAFT_METRICS", "0") == "1"
+# Seconds; covers sub-millisecond cache hits up to multi-second Excel loads.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+_LOCK = threading.Lock()
+# {(name, labels tuple): [bucket counts..., sum, count]}
+_HISTOGRAMS = {}
+# {(name, labels tuple): value}
+_COUNTERS = {}
+_HELP = {
+    "courtcraft_request_seconds": ("histogram", "Request latency by endpoint, method and status."),
+    "courtcraft_stage_seconds": ("histogram", "Time spent in an instrumented stage."),
+    "courtcraft_cache_requests_total": ("counter", "Cache lookups by cache and result."),
+}
+# Stage totals for the request running on this thread (see begin_request).
+_local = threading.local()
+
+
+def observe(name, labels, seconds):
+    key = (name, labels)
+    with _LOCK:
+        h = _HISTOGRAMS.get(key)
+        if h is None:
+            h = _HISTOGRAMS[key] = [0] * len(BUCKETS) + [0.0, 0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+                break
+        h[-2] += seconds
+        h[-1] += 1
+
+
+def count(cache, result, n=1):
+    """Bump courtcraft_cache_requests_total{cache, result}."""
+    if not ENABLED:
+        return
+    key = ("courtcraft_cache_requests_total", (("cache", cache), ("result", result)))
+    with _LOCK:
+        _COUNTERS[key] = _COUNTERS.get(key, 0) + n
+
+
+class _Span:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        observe("courtcraft_stage_seconds", (("stage", self.stage),), elapsed)
+        stages = getattr(_local, "stages", None)
+        if stages is not None:
+            stages[self.stage] = stages.get(self.stage, 0.0) + elapsed
+        return False
+
+
+def span(stage):
+    """Context manager timing one stage (no-op when metrics are off)."""
+    return _Span(stage) if ENABLED else _NOOP
+
+
+def timed(stage):
+    """Decorator form of span(); leaves the function untouched when metrics are off."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def begin_request():
+    _local.stages = {}
+    _local.started = time.perf_counter()
+
+
+def end_request(endpoint, method, status):
+    """Record the request latency; returns its {stage: seconds} breakdown."""
+    started = getattr(_local, "started", None)
+    stages = getattr(_local, "stages", None) or {}
+    _local.stages = _local.started = None
+    if started is not None:
+        observe("courtcraft_request_seconds",
+                (("endpoint", endpoint), ("method", method), ("status", str(status))),
+                time.perf_counter() - started)
+    return stages
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                    for k, v in pairs)
+    return "{" + body + "}"
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _LOCK:
+        histograms = {k: list(v) for k, v in _HISTOGRAMS.items()}
+        counters = dict(_COUNTERS)
+    lines = []
+    for name, (kind, help_text) in _HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (n, labels), h in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, c in zip(BUCKETS, h):
+                    cumulative += c
+                    lines.append(f"{name}_bucket{_labels(labels, [('le', repr(bound))])} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {h[-1]}")
+                lines.append(f"{name}_sum{_labels(labels)} {h[-2]:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {h[-1]}")
+        else:
+            for (n, labels), v in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_labels(labels)} {v}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    with _LOCK:
+        _HISTOGRAMS.clear()
+        _COUNTERS.clear()
@@ -0,0 +1,74 @@
+class NameSearchIndex:
+    """
+    In-memory player-name search: a prefix trie plus character n-gram postings.
+
+    Results are ranked full-name prefix first, then word prefix (e.g. last name),
+    then any other substring; ties are broken alphabetically.
+    """
+
+    NGRAM = 3
+
+    def __init__(self, names):
+        # Alphabetical ids make every posting list sorted for free.
+        self.names = sorted({str(n).strip() for n in names if str(n).strip()}, key=lambda s: s.lower())
+        self._lower = [n.lower() for n in self.names]
+        self._trie = {}
+        self._grams = {}
+
+        for idx, name in enumerate(self._lower):
+            starts = [0] + [i + 1 for i, ch in enumerate(name) if ch in " -.'" and i + 1 < len(name)]
+            for start in starts:
+                self._insert(name[start:], idx)
+            for n in (2, self.NGRAM):
+                for i in range(len(name) - n + 1):
+                    postings = self._grams.setdefault(name[i:i + n], [])
+                    if not postings or postings[-1] != idx:
+                        postings.append(idx)
+
+    def _insert(self, suffix: str, idx: int) -> None:
+        node = self._trie
+        for ch in suffix:
+            node = node.setdefault(ch, {})
+            ids = node.setdefault("", [])
+            if not ids or ids[-1] != idx:
+                ids.append(idx)
+
+    def _word_prefix_ids(self, term: str):
+        node = self._trie
+        for ch in term:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node.get("", [])
+
+    def _substring_ids(self, term: str):
+        n = min(len(term), self.NGRAM)
+        grams = {term[i:i + n] for i in range(len(term) - n + 1)}
+        postings = []
+        for g in grams:
+            p = self._grams.get(g)
+            if not p:
+                return []
+            postings.append(p)
+        postings.sort(key=len)
+        candidates = postings[0]
+        if len(postings) > 1:
+            rest = [set(p) for p in postings[1:]]
+            candidates = [i for i in candidates if all(i in r for r in rest)]
+        return [i for i in candidates if term in self._lower[i]]
+
+    def search(self, term: str, limit: int = 50):
+        term = (term or "").strip().lower()
+        if not term:
+            return []
+        full, word, mid = [], [], []
+        seen = set()
+        for idx in self._word_prefix_ids(term):
+            (full if self._lower[idx].startswith(term) else word).append(idx)
+            seen.add(idx)
+        if len(full) + len(word) < limit:
+            mid = [i for i in self._substring_ids(term) if i not in seen]
+        return [self.names[i] for i in (full + word + mid)[:limit]]
+
+    def __len__(self):
+        return len(self.names)
@@ -0,0 +1,217 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from rankings_store import COMPILED_DIR, NUMERIC_COLS, _content_hash, load_rankings
+from season_dataset import normalize_name
+
+# Bump when the on-disk store layout changes so stale artifacts are ignored.
+HISTORY_FORMAT = 1
+TEXT_COLS = ("Team", "Pos", "Inj")
+# Columns summarized as first -> last season in a player's history.
+TREND_COLS = ("Rank", "Value", "puntV")
+
+
+class PlayerHistory:
+    """
+    Every rankings sheet stacked into one columnar table: a row per
+    (player, season, data type), all numeric columns in one float matrix, and
+    a name index to each player's rows in season order.
+    """
+
+    def __init__(self, seasons, data_types, columns, values, season_pos, type_pos, names, text, version=None):
+        self.seasons = list(seasons)
+        self.data_types = list(data_types)
+        self.columns = list(columns)
+        self.values = values
+        self.season_pos = season_pos
+        self.type_pos = type_pos
+        self.names = names
+        self.text = text
+        self.version = version
+        self._col_pos = {c: j for j, c in enumerate(self.columns)}
+
+        rows = {}
+        for r in np.lexsort((type_pos, season_pos)).tolist():
+            rows.setdefault(normalize_name(names[r]), []).append(r)
+        self._rows = {k: np.array(v, dtype=np.intp) for k, v in rows.items()}
+
+    @classmethod
+    def from_frames(cls, frames, version=None):
+        """Build from [(season, data_type, normalized rankings DataFrame)]."""
+        frames = [(s, t, df) for s, t, df in frames if df is not None and "Name" in df.columns]
+        seasons = sorted({s for s, _, _ in frames})
+        data_types = sorted({t for _, t, _ in frames})
+        columns = [c for c in NUMERIC_COLS if any(c in df.columns for _, _, df in frames)]
+        n = sum(len(df) for _, _, df in frames)
+
+        values = np.full((n, len(columns)), np.nan)
+        season_pos = np.empty(n, dtype=np.int16)
+        type_pos = np.empty(n, dtype=np.int8)
+        names = np.empty(n, dtype=object)
+        text = {c: np.full(n, "", dtype=object) for c in TEXT_COLS}
+        start = 0
+        for season, data_type, df in frames:
+            end = start + len(df)
+            for j, c in enumerate(columns):
+                if c in df.columns:
+                    values[start:end, j] = df[c].to_numpy(dtype=float, na_value=np.nan)
+            season_pos[start:end] = seasons.index(season)
+            type_pos[start:end] = data_types.index(data_type)
+            names[start:end] = df["Name"].astype(str).str.strip().to_numpy()
+            for c in TEXT_COLS:
+                if c in df.columns:
+                    text[c][start:end] = df[c].fillna("").astype(str).str.strip().to_numpy()
+            start = end
+        return cls(seasons, data_types, columns, values, season_pos, type_pos,
+                   names.astype(str), {c: a.astype(str) for c, a in text.items()}, version=version)
+
+    def __contains__(self, name) -> bool:
+        return normalize_name(name) in self._rows
+
+    def __len__(self):
+        return len(self.names)
+
+    def display_name(self, name):
+        """Spelling used in the most recent season the player appears in."""
+        rows = self._rows.get(normalize_name(name))
+        return None if rows is None else str(self.names[rows[-1]])
+
+    def history(self, name, data_type="nopunts", cols=None):
+        """One dict per season the player appears in (oldest first), or None for an unknown player."""
+        rows = self._rows.get(normalize_name(name))
+        if rows is None or data_type not in self.data_types:
+            return None
+        rows = rows[self.type_pos[rows] == self.data_types.index(data_type)]
+        cols = self.columns if cols is None else [c for c in cols if c in self._col_pos]
+        block = self.values[np.ix_(rows, [self._col_pos[c] for c in cols])]
+        out = []
+        for k, r in enumerate(rows.tolist()):
+            entry = {"season": self.seasons[self.season_pos[r]]}
+            entry.update({c: str(self.text[c][r]) for c in TEXT_COLS})
+            entry.update({c: (None if np.isnan(v) else float(v)) for c, v in zip(cols, block[k].tolist())})
+            out.append(entry)
+        return out
+
+    def compare(self, names, col, data_type="nopunts"):
+        """{display name: [value per season in self.seasons, None where missing]} for one column."""
+        j = self._col_pos.get(col)
+        if j is None or data_type not in self.data_types:
+            return {}
+        t = self.data_types.index(data_type)
+        out = {}
+        for name in names:
+            rows = self._rows.get(normalize_name(name))
+            if rows is None:
+                continue
+            rows = rows[self.type_pos[rows] == t]
+            series = [None] * len(self.seasons)
+            for r in rows.tolist():
+                v = self.values[r, j]
+                series[self.season_pos[r]] = None if np.isnan(v) else float(v)
+            out[self.display_name(name)] = series
+        return out
+
+    def save(self, path: str, meta: dict) -> None:
+        arrays = {
+            "seasons": np.array(self.seasons, dtype=str),
+            "data_types": np.array(self.data_types, dtype=str),
+            "columns": np.array(self.columns, dtype=str),
+            "values": self.values,
+            "season_pos": self.season_pos,
+            "type_pos": self.type_pos,
+            "names": self.names,
+            "meta": np.array(json.dumps(dict(meta, format=HISTORY_FORMAT))),
+        }
+        arrays.update({f"text:{c}": a for c, a in self.text.items()})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write next to the target and rename so readers never see a half-written store.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path, allow_pickle=False) as z:
+            members = {name: z[name] for name in z.files}
+        meta = json.loads(str(members["meta"]))
+        if meta.get("format") != HISTORY_FORMAT:
+            return None
+        return cls(
+            members["seasons"].tolist(), members["data_types"].tolist(), members["columns"].tolist(),
+            members["values"], members["season_pos"], members["type_pos"], members["names"],
+            {c: members[f"text:{c}"] for c in TEXT_COLS}, version=meta.get("version"),
+        )
+
+
+def trend(history, cols=TREND_COLS):
+    """{col: {"from", "to", "change"}} between the first and last season with a value."""
+    out = {}
+    for c in cols:
+        points = [(h["season"], h[c]) for h in history if h.get(c) is not None]
+        if points:
+            (first_season, first), (last_season, last) = points[0], points[-1]
+            out[c] = {"from": first, "to": last, "change": round(last - first, 4),
+                      "from_season": first_season, "to_season": last_season}
+    return out
+
+
+def history_path(version: str) -> str:
+    return os.path.join(COMPILED_DIR, f"history.{version[:16]}.npz")
+
+
+def load_history(sources, force: bool = False):
+    """
+    PlayerHistory over [(season, data_type, workbook path)], persisted as one
+    .npz keyed by the sources' content hashes so a restart skips the per-season
+    loads. Unreadable workbooks are left out.
+    """
+    sources = [(s, t, p) for s, t, p in sources if p and os.path.exists(p)]
+    stamp = "|".join(f"{s}:{t}:{_content_hash(p)}" for s, t, p in sorted(sources))
+    version = hashlib.sha1(stamp.encode("utf-8")).hexdigest()
+    path = history_path(version)
+    if not force and os.path.exists(path):
+        try:
+            store = PlayerHistory.load(path)
+            if store is not None:
+                return store
+        except Exception:
+            pass
+
+    store = PlayerHistory.from_frames([(s, t, load_rankings(p)[0]) for s, t, p in sources], version=version)
+    try:
+        store.save(path, {"version": version, "sources": [os.path.basename(p) for _, _, p in sources]})
+    except OSError:
+        pass  # read-only deploys rebuild on start
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the cross-season player store and print a player's history.")
+    parser.add_argument("--player", action="append", default=[], help="Player to print (repeatable).")
+    parser.add_argument("--data-type", default="nopunts", help="nopunts or tovpunt (default: nopunts).")
+    parser.add_argument("--force", action="store_true", help="Rebuild even when a stored copy exists.")
+    args = parser.parse_args()
+
+    import app
+
+    store = load_history(app._history_sources(), force=args.force)
+    print(f"{len(store)} rows, {len(store._rows)} players, seasons {', '.join(store.seasons)} -> "
+          f"{os.path.relpath(history_path(store.version), os.path.dirname(__file__))}")
+    for name in args.player:
+        rows = store.history(name, args.data_type, cols=["Rank", "Value", "puntV", "g", "m/g"])
+        if rows is None:
+            print(f"{name}: not found")
+            continue
+        print(store.display_name(name))
+        for r in rows:
+            stats = "  ".join(f"{c} {r[c]:.2f}" for c in ("Rank", "Value", "puntV", "g", "m/g") if r.get(c) is not None)
+            print(f"  {r['season']}  {r['Team']:4s} {stats}")
+
+
+if __name__ == "__main__":
+    main()
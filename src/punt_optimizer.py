@@ -0,0 +1,194 @@
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from season_dataset import normalize_name
+
+ROSTER_SIZE = 13
+# Roster mode: how many of the weakest players (for each build) may be swapped for waiver pickups.
+ROSTER_SWAPS = 2
+_CACHE_MAX = 256
+# Results by (mode, dataset source, dataset version, ...); least recently used first.
+PUNT_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def subset_masks(n_cats: int) -> np.ndarray:
+    """(2**n_cats, n_cats) boolean matrix; row k punts the categories set in the bits of k."""
+    k = np.arange(2 ** n_cats)[:, None]
+    return ((k >> np.arange(n_cats)[None, :]) & 1).astype(bool)
+
+
+def _draftable(ds) -> np.ndarray:
+    """Row positions of players that can be rostered (not out for the season), best Rank first."""
+    df = ds.df
+    keep = np.ones(len(df), dtype=bool)
+    if "Inj" in df.columns:
+        keep &= ~df["Inj"].fillna("").astype(str).str.strip().str.upper().str.startswith("X").to_numpy()
+    rows = np.flatnonzero(keep)
+    if "Rank" in df.columns:
+        rank = pd.to_numeric(df["Rank"], errors="coerce").to_numpy(dtype=float)[rows]
+        rows = rows[np.argsort(np.where(np.isfinite(rank), rank, np.inf), kind="stable")]
+    return rows
+
+
+def _baseline(values, teams):
+    """League-average team totals and the spread between teams, from the top teams*ROSTER_SIZE players."""
+    league = values[: teams * ROSTER_SIZE]
+    mean = league.mean(axis=0) * ROSTER_SIZE
+    spread = np.maximum(league.std(axis=0) * math.sqrt(ROSTER_SIZE), 1e-6)
+    return mean, spread
+
+
+def expected_wins(totals, baseline, spread) -> np.ndarray:
+    """Expected categories won against a league-average team (normal approximation), per row of `totals`."""
+    z = (totals - baseline[None, :]) / (spread[None, :] * math.sqrt(2.0))
+    win = 0.5 * (1.0 + _erf(z).astype(float))
+    return win.sum(axis=1), win
+
+
+def _cache_get(key):
+    with _CACHE_LOCK:
+        hit = PUNT_CACHE.get(key)
+        if hit is not None:
+            PUNT_CACHE.move_to_end(key)
+        return hit
+
+
+def _cache_put(key, value):
+    # Uploaded sheets have no version, so their results are never cached.
+    if key[2] is None:
+        return value
+    with _CACHE_LOCK:
+        PUNT_CACHE[key] = value
+        while len(PUNT_CACHE) > _CACHE_MAX:
+            PUNT_CACHE.popitem(last=False)
+    return value
+
+
+def _builds(masks, wins, per_cat, totals, cols, labels, top, extra=None):
+    order = np.lexsort((masks.sum(axis=1), -np.round(wins, 6)))[:top]
+    out = []
+    for k in order:
+        punted = [labels.get(c, c) for c, m in zip(cols, masks[k]) if m]
+        build = {
+            "punts": punted,
+            "label": "+".join(punted) if punted else "No punt",
+            "expected_wins": round(float(wins[k]), 2),
+            "win_prob": {labels.get(c, c): round(float(p), 3) for c, p in zip(cols, per_cat[k])},
+            "totals": {labels.get(c, c): round(float(v), 2) for c, v in zip(cols, totals[k])},
+        }
+        if extra:
+            build.update(extra(k))
+        out.append(build)
+    return out
+
+
+def optimize_roster(ds, roster, cols, teams=12, swaps=ROSTER_SWAPS, labels=None, top=5):
+    """
+    Best punt builds for an existing roster.
+
+    For every subset of `cols` the roster's weakest `swaps` players (by value in
+    the categories that build keeps) are replaced with the best free agents
+    for it; free agents are players outside the top teams*ROSTER_SIZE by Rank.
+    All 2**len(cols) builds are scored at once; results are memoized per roster.
+    """
+    labels = labels or {}
+    roster_key = hashlib.sha1("\n".join(sorted({normalize_name(n) for n in roster})).encode("utf-8")).hexdigest()
+    key = ("roster", ds.source, ds.version, tuple(cols), roster_key, teams, swaps, top)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    col_pos = [ds.value_cols.index(c) for c in cols]
+    values = np.nan_to_num(ds.values[:, col_pos])
+    mine, _ = ds.lookup(roster)
+    pool = _draftable(ds)
+    baseline, spread = _baseline(values[pool], teams)
+    masks = subset_masks(len(cols))
+    weights = (~masks).astype(float)
+
+    base_totals = values[mine].sum(axis=0)
+    totals = np.repeat(base_totals[None, :], len(masks), axis=0)
+    drop_idx = np.empty((len(masks), 0), dtype=np.intp)
+    add_idx = np.empty((len(masks), 0), dtype=np.intp)
+    free = np.setdiff1d(pool[teams * ROSTER_SIZE:], mine)
+    swaps = min(swaps, len(mine), len(free))
+    if swaps > 0:
+        mine_scores = weights @ values[mine].T            # (subsets, roster)
+        free_scores = weights @ values[free].T            # (subsets, free agents)
+        drop_idx = np.argsort(mine_scores, axis=1, kind="stable")[:, :swaps]
+        add_idx = np.argsort(-free_scores, axis=1, kind="stable")[:, :swaps]
+        gain = np.take_along_axis(free_scores, add_idx, axis=1).sum(axis=1) - np.take_along_axis(mine_scores, drop_idx, axis=1).sum(axis=1)
+        # Only make the moves when they help the build.
+        swap = gain > 0
+        delta = values[free[add_idx]].sum(axis=1) - values[mine[drop_idx]].sum(axis=1)
+        totals[swap] += delta[swap]
+    else:
+        swap = np.zeros(len(masks), dtype=bool)
+
+    wins, per_cat = expected_wins(totals, baseline, spread)
+    names = ds.df["Name"].to_numpy()
+
+    def moves(k):
+        if not swap[k]:
+            return {"drop": [], "add": []}
+        return {"drop": [str(names[mine[i]]) for i in drop_idx[k]], "add": [str(names[free[i]]) for i in add_idx[k]]}
+
+    current, _ = expected_wins(base_totals[None, :], baseline, spread)
+    result = {
+        "current_wins": round(float(current[0]), 2),
+        "builds": _builds(masks, wins, per_cat, totals, cols, labels, top, moves),
+        "evaluated": len(masks),
+    }
+    return _cache_put(key, result)
+
+
+def optimize_pool(ds, cols, teams=12, slot=None, labels=None, top=5):
+    """
+    Best punt builds to draft from the full player pool.
+
+    Each build drafts greedily from draft slot `slot` (middle of the round by
+    default): at every pick it takes the best player for that build among those
+    still on the board, assuming the rest of the league drafts by Rank.
+    """
+    labels = labels or {}
+    slot = (teams + 1) // 2 if slot is None else min(max(1, int(slot)), teams)
+    key = ("pool", ds.source, ds.version, tuple(cols), teams, slot, top)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    col_pos = [ds.value_cols.index(c) for c in cols]
+    pool = _draftable(ds)
+    values = np.nan_to_num(ds.values[np.ix_(pool, col_pos)])
+    baseline, spread = _baseline(values, teams)
+    masks = subset_masks(len(cols))
+    scores = (~masks).astype(float) @ values.T            # (subsets, players)
+    totals = np.zeros((len(masks), len(cols)))
+    subsets = np.arange(len(masks))
+
+    for rnd in range(ROSTER_SIZE):
+        pick_no = rnd * teams + (slot if rnd % 2 == 0 else teams + 1 - slot)
+        # Everyone ranked ahead of this pick (minus my own picks) is assumed gone.
+        gone = max(pick_no - 1 - rnd, 0)
+        avail = scores.copy()
+        avail[:, :gone] = -np.inf
+        pick = np.argmax(avail, axis=1)
+        totals += values[pick]
+        scores[subsets, pick] = -np.inf
+
+    wins, per_cat = expected_wins(totals, baseline, spread)
+    result = {
+        "teams": teams,
+        "slot": slot,
+        "builds": _builds(masks, wins, per_cat, totals, cols, labels, top),
+        "evaluated": len(masks),
+    }
+    return _cache_put(key, result)
@@ -0,0 +1,274 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+# Bump when the on-disk artifact layout changes so stale artifacts are ignored.
+ARTIFACT_FORMAT = 2
+COMPILED_DIR = os.getenv(
+    "COURTCRAFT_COMPILED_DIR",
+    os.path.join(os.path.dirname(__file__), ".compiled"),
+)
+DEFAULT_DATA_DIRS = ("Nopunts", "Tovpunts")
+# Columns coerced to numbers when a sheet is normalized.
+NUMERIC_COLS = [
+    "Round", "Rank", "Value", "g", "m/g", "p/g", "3/g", "r/g", "a/g", "s/g", "b/g",
+    "fg%", "fga/g", "ft%", "fta/g", "to/g", "USG",
+    "pV", "3V", "rV", "aV", "sV", "bV", "fg%V", "ft%V", "toV",
+    "LeagV", "puntV"
+]
+
+# -----------------------------------------------------------------------------
+# SAFE EXCEL READER (handles .xls/.xlsx and engine selection)
+# -----------------------------------------------------------------------------
+@metrics.timed("excel_parse")
+def _read_excel_safe(path: str):
+    """
+    Return a DataFrame or None. Picks the appropriate engine for .xls or .xlsx.
+    Requires: xlrd==2.0.1 for .xls, openpyxl for .xlsx.
+    """
+    if not os.path.exists(path):
+        return None
+    _, ext = os.path.splitext(path.lower())
+    try_paths = [path]
+
+    # Fallback to sibling extension when one file is missing/locked/unsupported.
+    stem = os.path.splitext(path)[0]
+    if ext == ".xls":
+        xlsx_sibling = stem + ".xlsx"
+        if os.path.exists(xlsx_sibling):
+            try_paths.append(xlsx_sibling)
+    elif ext == ".xlsx":
+        xls_sibling = stem + ".xls"
+        if os.path.exists(xls_sibling):
+            try_paths.append(xls_sibling)
+
+    for candidate in try_paths:
+        _, c_ext = os.path.splitext(candidate.lower())
+        try:
+            if c_ext == ".xlsx":
+                return pd.read_excel(candidate, engine="openpyxl")
+            if c_ext == ".xls":
+                return pd.read_excel(candidate, engine="xlrd")
+            return pd.read_excel(candidate)
+        except Exception:
+            continue
+    return None
+
+def _read_excel_bytes(data: bytes, filename: str = ""):
+    """
+    Return a DataFrame or None for an in-memory workbook (e.g. an upload).
+    Tries the engine matching the extension first, then the other one.
+    """
+    if not data:
+        return None
+    ext = os.path.splitext((filename or "").lower())[1]
+    engines = ["xlrd", "openpyxl"] if ext == ".xls" else ["openpyxl", "xlrd"]
+    for engine in engines:
+        try:
+            return pd.read_excel(io.BytesIO(data), engine=engine)
+        except Exception:
+            continue
+    return None
+
+def _normalize_rankings_df(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize rankings columns so numeric comparisons/sums are always safe."""
+    out = df.copy()
+    out.columns = [str(c).strip() for c in out.columns]
+
+    if "Name" in out.columns:
+        out["Name"] = out["Name"].astype(str).str.strip()
+        # Basketball Monster export repeats header rows in the table body; drop placeholder names.
+        out = out[~out["Name"].str.lower().isin({"name", "", "nan"})].copy()
+
+    # Unify alternate value headers that may appear in exported files.
+    rename_map = {}
+    for c in out.columns:
+        lc = c.lower()
+        if lc in ("leagv", "leaguev"):
+            rename_map[c] = "LeagV"
+        if lc in ("puntv", "puntiv"):
+            rename_map[c] = "puntV"
+    if rename_map:
+        out.rename(columns=rename_map, inplace=True)
+
+    for c in NUMERIC_COLS:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce")
+
+    # Remove any residual non-player rows (e.g., repeated headers with no numeric values).
+    if "Rank" in out.columns:
+        out = out[out["Rank"].notna()].copy()
+
+    return out
+
+# -----------------------------------------------------------------------------
+# Compiled columnar artifacts (.npz)
+# -----------------------------------------------------------------------------
+def _content_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def artifact_path(path: str, content_hash: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(COMPILED_DIR, f"{stem}.{content_hash[:16]}.npz")
+
+def _save_artifact(df: pd.DataFrame, out_path: str, meta: dict) -> None:
+    # Numeric columns are stored as one 2-D block per dtype so a load touches a
+    # handful of arrays instead of one .npy member per column.
+    arrays = {
+        "columns": np.array([str(c) for c in df.columns], dtype=str),
+        "dtypes": np.array([str(t) for t in df.dtypes], dtype=str),
+        "index": df.index.to_numpy(dtype=np.int64),
+    }
+    blocks = {}
+    for i, c in enumerate(df.columns):
+        col = df[c]
+        if col.dtype.kind in "iufb":
+            blocks.setdefault(col.dtype.str, []).append(i)
+        else:
+            mask = col.isna().to_numpy()
+            arrays[f"c{i}"] = np.array(["" if m else str(v) for v, m in zip(col.tolist(), mask)], dtype=str)
+            arrays[f"m{i}"] = mask
+    for k, (dtype, positions) in enumerate(blocks.items()):
+        arrays[f"b{k}"] = np.column_stack([df.iloc[:, i].to_numpy() for i in positions]).astype(dtype)
+        arrays[f"bcols{k}"] = np.array(positions, dtype=np.int64)
+    arrays["meta"] = np.array(json.dumps(meta))
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    # Write next to the target and rename so readers never see a half-written artifact.
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        np.savez(fh, **arrays)
+    os.replace(tmp_path, out_path)
+
+@metrics.timed("artifact_load")
+def _load_artifact(art_path: str):
+    with np.load(art_path, allow_pickle=False) as z:
+        members = {name: z[name] for name in z.files}
+    meta = json.loads(str(members["meta"]))
+    if meta.get("format") != ARTIFACT_FORMAT:
+        return None
+
+    columns = members["columns"].tolist()
+    dtypes = members["dtypes"].tolist()
+    index = pd.Index(members["index"])
+    data = [None] * len(columns)
+    k = 0
+    while f"b{k}" in members:
+        block = members[f"b{k}"]
+        for j, i in enumerate(members[f"bcols{k}"].tolist()):
+            data[i] = block[:, j]
+        k += 1
+    for i, dtype in enumerate(dtypes):
+        if data[i] is not None:
+            continue
+        obj = members[f"c{i}"].astype(object)
+        obj[members[f"m{i}"]] = np.nan
+        data[i] = pd.array(obj, dtype=None if dtype == "object" else dtype)
+    return pd.DataFrame(dict(zip(columns, data)), index=index, columns=columns)
+
+def _compile(path: str, version: str, out_path: str, strict: bool = True):
+    df = _read_excel_safe(path)
+    if df is None or "Name" not in df.columns:
+        return None
+    df = _normalize_rankings_df(df)
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "source": os.path.abspath(path),
+        "mtime": os.path.getmtime(path),
+        "sha1": version,
+    }
+    try:
+        _save_artifact(df, out_path, meta)
+    except OSError:
+        # Read-only deploys still serve requests; they just keep paying the parse cost.
+        if strict:
+            raise
+    return df
+
+def compile_rankings(path: str, force: bool = False):
+    """
+    Normalize a rankings workbook once and persist it as an .npz artifact.
+
+    Artifacts are keyed by the source content hash; the source path and mtime are
+    recorded alongside so stale files are easy to spot. Returns (path, version) or
+    (None, None) when the workbook cannot be read.
+    """
+    if not path or not os.path.exists(path):
+        return None, None
+    version = _content_hash(path)
+    out_path = artifact_path(path, version)
+    if not force and os.path.exists(out_path):
+        return out_path, version
+    if _compile(path, version, out_path) is None:
+        return None, None
+    return out_path, version
+
+def load_rankings(path: str):
+    """
+    Return (normalized DataFrame, version) for a rankings workbook, compiling it on
+    first sight. Falls back to parsing the workbook when the artifact is unusable.
+    """
+    if not path or not os.path.exists(path):
+        return None, None
+    version = _content_hash(path)
+    art_path = artifact_path(path, version)
+    if os.path.exists(art_path):
+        try:
+            df = _load_artifact(art_path)
+            if df is not None:
+                return df, version
+        except Exception:
+            pass
+
+    df = _compile(path, version, art_path, strict=False)
+    if df is None:
+        return None, None
+    return df, version
+
+def _workbooks_in(dirs):
+    for d in dirs:
+        if not os.path.isdir(d):
+            continue
+        for fname in sorted(os.listdir(d)):
+            if fname.lower().endswith((".xls", ".xlsx")) and not fname.startswith("~$"):
+                yield os.path.join(d, fname)
+
+def main() -> None:
+    base = os.path.dirname(__file__)
+    parser = argparse.ArgumentParser(description="Precompile BBM rankings workbooks into .npz artifacts.")
+    parser.add_argument(
+        "paths", nargs="*",
+        help="Workbooks or directories to compile (default: Nopunts/ and Tovpunts/)."
+    )
+    parser.add_argument("--force", action="store_true", help="Recompile even when an artifact exists.")
+    args = parser.parse_args()
+
+    targets = args.paths or [os.path.join(base, d) for d in DEFAULT_DATA_DIRS]
+    files = [p for p in targets if os.path.isfile(p)]
+    files += list(_workbooks_in([p for p in targets if os.path.isdir(p)]))
+
+    failed = 0
+    for path in files:
+        out_path, version = compile_rankings(path, force=args.force)
+        if out_path:
+            print(f"{os.path.basename(path)} -> {os.path.relpath(out_path, base)}")
+        else:
+            failed += 1
+            print(f"{os.path.basename(path)}: could not read workbook")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
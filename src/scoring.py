@@ -0,0 +1,40 @@
+import numpy as np
+
+# Extra weight given to a team's weakest categories when ranking additions.
+NEED_BOOST = 0.35
+# Assemble Team treats a category total below this as a punt candidate.
+PUNT_THRESHOLD = -1.0
+
+
+def category_weights(effective_cols, punt_valcols, totals):
+    """
+    Board-style weights aligned with `effective_cols`: 0 for punted categories,
+    1 otherwise, plus NEED_BOOST on the three weakest categories (by current
+    totals) that are not punted.
+    """
+    punt_valcols = punt_valcols or set()
+    weights = np.array([0.0 if c in punt_valcols else 1.0 for c in effective_cols])
+    ordered_needs = sorted(range(len(effective_cols)), key=lambda j: totals.get(effective_cols[j], 0.0))
+    for j in set(ordered_needs[:3]):
+        if weights[j] > 0:
+            weights[j] += NEED_BOOST
+    return weights
+
+
+def category_weights_batch(effective_cols, punt_valcols, totals):
+    """
+    category_weights for many rosters at once: `totals` is (n, len(effective_cols))
+    and the result has the same shape. Ties break by column order, as above.
+    """
+    punt_valcols = punt_valcols or set()
+    base = np.array([0.0 if c in punt_valcols else 1.0 for c in effective_cols])
+    weights = np.repeat(base[None, :], len(totals), axis=0)
+    needs = np.argsort(totals, axis=1, kind="stable")[:, :3]
+    rows = np.arange(len(totals))[:, None]
+    weights[rows, needs] += np.where(weights[rows, needs] > 0, NEED_BOOST, 0.0)
+    return weights
+
+
+def inferred_punts(effective_cols, totals):
+    """Categories a roster is already conceding (the Assemble Team punt heuristic)."""
+    return {c for c in effective_cols if totals.get(c, 0.0) < PUNT_THRESHOLD}
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+# Shallow views of a shared frame are only safe under Copy-on-Write, which
+# pandas 3 always uses. Older pandas gets real copies from view() instead.
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+
+def normalize_name(name) -> str:
+    return str(name or "").strip().lower()
+
+
+class NameIndex:
+    """
+    Normalized player name -> row position for one rankings DataFrame, plus the
+    value columns as a float matrix so roster totals are a gather + sum.
+
+    Row positions follow the DataFrame order (and any .copy() of it).
+    """
+
+    def __init__(self, df: pd.DataFrame, value_cols):
+        self.value_cols = list(value_cols)
+        self._col_pos = {c: j for j, c in enumerate(self.value_cols)}
+        self._rows = {}
+        for pos, name in enumerate(df["Name"].astype(str).tolist()):
+            self._rows.setdefault(normalize_name(name), []).append(pos)
+
+        values = np.full((len(df), len(self.value_cols)), np.nan)
+        for j, c in enumerate(self.value_cols):
+            if c in df.columns:
+                values[:, j] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+        values.flags.writeable = False
+        self.values = values
+
+    def __contains__(self, name) -> bool:
+        return normalize_name(name) in self._rows
+
+    def lookup(self, names):
+        """Return (sorted unique row positions, names not found in the index)."""
+        rows = set()
+        missing = []
+        for n in names:
+            hit = self._rows.get(normalize_name(n))
+            if hit is None:
+                if normalize_name(n):
+                    missing.append(n)
+            else:
+                rows.update(hit)
+        return np.array(sorted(rows), dtype=np.intp), missing
+
+    def totals(self, names, cols=None):
+        """Return ({col: summed value}, missing names); NaNs count as zero."""
+        cols = self.value_cols if cols is None else cols
+        rows, missing = self.lookup(names)
+        sums = np.nansum(self.values[rows], axis=0) if len(rows) else np.zeros(len(self.value_cols))
+        return {c: float(sums[self._col_pos[c]]) if c in self._col_pos else 0.0 for c in cols}, missing
+
+
+class SeasonDataset:
+    """
+    Read-only rankings for one season/data type, shared by every request.
+
+    `df` must never be mutated in place; callers that need to change data take
+    `view()`, which on pandas 3 is copy-on-write, so the shared frame is never
+    copied up front.
+    """
+
+    def __init__(self, df: pd.DataFrame, value_cols, version=None, source=None):
+        self.df = df
+        self.index = NameIndex(df, value_cols)
+        self.values = self.index.values
+        self.value_cols = self.index.value_cols
+        self.version = version
+        self.source = source
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def columns(self):
+        return self.df.columns
+
+    def lookup(self, names):
+        return self.index.lookup(names)
+
+    def totals(self, names, cols=None):
+        return self.index.totals(names, cols)
+
+    def rows(self, positions) -> pd.DataFrame:
+        """Frame for the given row positions (a new object; safe to read or modify)."""
+        return self.df.iloc[positions]
+
+    def view(self, mask=None) -> pd.DataFrame:
+        """Frame safe to modify, optionally filtered by a boolean mask; mutations stay local."""
+        frame = self.df if mask is None else self.df[mask]
+        if not COPY_ON_WRITE:
+            return frame.copy()
+        return frame.copy(deep=False) if mask is None else frame
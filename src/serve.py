@@ -0,0 +1,12 @@
+import os
+
+# Spawned scan/simulation workers re-import this file as __mp_main__; everything
+# below stays behind the guard so they never load the app.
+if __name__ == "__main__":
+    from app import app
+
+    app.run(
+        debug=(os.getenv("FLASK_DEBUG", "0") == "1"),
+        host=os.getenv("FLASK_HOST", "127.0.0.1"),
+        port=int(os.getenv("FLASK_PORT", "5000")),
+    )
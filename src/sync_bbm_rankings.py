@@ -1,118 +1,359 @@
 import argparse
+import http.client
 import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from http.cookies import SimpleCookie
 import re
-from io import StringIO
 import urllib.parse
-import urllib.request
-import http.cookiejar
 
 import pandas as pd
+from lxml import etree
 
 BBM_URL = "https://basketballmonster.com/playerrankings.aspx"
-EXPECTED_COLS = [
-    "Round", "Rank", "Value", "Name", "Team", "Pos", "Inj", "g", "m/g", "p/g",
+STAT_COLS = [
+    "Name", "Team", "Pos", "Inj", "g", "m/g", "p/g",
     "3/g", "r/g", "a/g", "s/g", "b/g", "fg%", "fga/g", "ft%", "fta/g", "to/g", "USG",
     "pV", "3V", "rV", "aV", "sV", "bV", "fg%V", "ft%V", "toV"
 ]
+EXPECTED_COLS = ["Round", "Rank", "Value"] + STAT_COLS
+# Punt views rank by the punt value and keep the league value alongside (as in the Tovpunts exports).
+PUNT_COLS = ["Round", "Rank", "PuntV", "LeagV", "Punt+"] + STAT_COLS
+TEXT_COLS = {"Name", "Team", "Pos", "Inj"}
+
+# Rankings views: file-name tag, default output directory (as the app expects), the
+# columns the table must have (and that are kept, in this order) and the extra
+# postback fields that select the view on the BBM page.
+VARIANTS = {
+    "nopunts": {"tag": "nopunt", "dir": "Nopunts", "cols": EXPECTED_COLS, "fields": {}},
+    "tovpunt": {"tag": "tovpunt", "dir": "Tovpunts", "cols": PUNT_COLS, "fields": {"PuntTOCheckBox": "on"}},
+}
+# Postback field that picks the season, by the season's starting year (e.g. 24-25 -> 2024).
+SEASON_FIELD = "SeasonDropDownList"
+SYNC_WORKERS = 4
+# An All Players page has well over this many rows; fewer means the postback did not take.
+MIN_ROWS = 350
+HTTP_TIMEOUT = 30
 
 
 def _season_key_from_year(year: int) -> str:
     return f"{year % 100:02d}-{(year + 1) % 100:02d}"
 
 
-def _filename_for_season_key(season_key: str) -> str:
+def _filename_for_season_key(season_key: str, variant: str = "nopunts") -> str:
     a, b = season_key.split("-")
-    return f"BBM_PlayerRankings{a}{b}_nopunt.xlsx"
+    return f"BBM_PlayerRankings{a}{b}_{VARIANTS[variant]['tag']}.xlsx"
 
 
-def _runtime_filename_for_season_key(season_key: str) -> str:
+def _runtime_filename_for_season_key(season_key: str, variant: str = "nopunts") -> str:
     a, b = season_key.split("-")
-    return f"BBM_PlayerRankings{a}{b}_nopunt_runtime.xlsx"
-
-
-def _fetch_html(url: str) -> str:
-    jar = http.cookiejar.CookieJar()
-    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
-
-    first = opener.open(url, timeout=30).read().decode("utf-8", "ignore")
-    hidden = dict(re.findall(
-        r"<input[^>]*type=['\"]hidden['\"][^>]*name=['\"]([^'\"]+)['\"][^>]*value=['\"]([^'\"]*)['\"]",
-        first,
-        flags=re.I,
-    ))
-
-    # Trigger ASP.NET postback to switch from "Only Top Players" to "All Players".
-    payload = dict(hidden)
-    payload["__EVENTTARGET"] = "PlayerFilterControl"
-    payload["__EVENTARGUMENT"] = ""
-    payload["PlayerFilterControl"] = "AllPlayers"
-
-    req = urllib.request.Request(
-        url,
-        data=urllib.parse.urlencode(payload).encode("utf-8"),
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-    )
-    html = opener.open(req, timeout=30).read().decode("utf-8", "ignore")
-    return html
+    return f"BBM_PlayerRankings{a}{b}_{VARIANTS[variant]['tag']}_runtime.xlsx"
+
+
+def _season_start_year(season_key: str) -> int:
+    return 2000 + int(season_key.split("-")[0])
+
+
+class KeepAlivePool:
+    """
+    Persistent HTTP/1.1 connections shared across threads, at most `size` in use
+    at once. Idle connections are reused per host; one that the server closed
+    is replaced and the request retried once.
+    """
+
+    def __init__(self, size: int = SYNC_WORKERS, timeout: float = HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.opened = 0
+        self._slots = threading.BoundedSemaphore(max(1, int(size)))
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _connection(self, scheme, netloc):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+            self.opened += 1
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout), False
+
+    def request(self, method: str, url: str, body=None, headers=None):
+        """(status, headers, body bytes) for one request."""
+        parts = urllib.parse.urlsplit(url)
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        with self._slots:
+            for attempt in range(2):
+                conn, reused = self._connection(parts.scheme, parts.netloc)
+                try:
+                    conn.request(method, path, body=body, headers=headers or {})
+                    resp = conn.getresponse()
+                    data = resp.read()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    conn.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except Exception:
+                    conn.close()
+                    raise
+                if resp.will_close:
+                    conn.close()
+                else:
+                    with self._lock:
+                        self._idle.setdefault((parts.scheme, parts.netloc), []).append(conn)
+                return resp.status, resp.headers, data
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+class _Browser:
+    """Cookie-carrying client over a KeepAlivePool (the postback needs the ASP.NET session cookie)."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.cookies = {}
+
+    def open(self, url, form=None):
+        for _ in range(5):
+            headers = {"User-Agent": "CourtCraft", "Accept-Encoding": "identity"}
+            if self.cookies:
+                headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+            body = None
+            if form is not None:
+                body = urllib.parse.urlencode(form).encode("utf-8")
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+            status, resp_headers, data = self.pool.request("POST" if form is not None else "GET", url, body, headers)
+            for raw in resp_headers.get_all("Set-Cookie") or []:
+                jar = SimpleCookie()
+                jar.load(raw)
+                self.cookies.update({k: m.value for k, m in jar.items()})
+            if status in (301, 302, 303, 307, 308) and resp_headers.get("Location"):
+                url = urllib.parse.urljoin(url, resp_headers["Location"])
+                form = form if status in (307, 308) else None
+                continue
+            if status >= 400:
+                raise RuntimeError(f"HTTP {status} from {url}")
+            return data
+        raise RuntimeError(f"Too many redirects from {url}")
+
+
+def _fetch_html(url: str, fields=None, pool=None) -> bytes:
+    """
+    Rankings page in All Players mode (plus any extra postback `fields`, e.g.
+    season or punt selection), fetched over `pool` (a private pool when None).
+    """
+    own_pool = pool is None
+    pool = pool or KeepAlivePool(1)
+    try:
+        browser = _Browser(pool)
+        first = browser.open(url).decode("utf-8", "ignore")
+        hidden = dict(re.findall(
+            r"<input[^>]*type=['\"]hidden['\"][^>]*name=['\"]([^'\"]+)['\"][^>]*value=['\"]([^'\"]*)['\"]",
+            first,
+            flags=re.I,
+        ))
+
+        # Trigger ASP.NET postback to switch from "Only Top Players" to "All Players".
+        payload = dict(hidden)
+        payload["__EVENTTARGET"] = "PlayerFilterControl"
+        payload["__EVENTARGUMENT"] = ""
+        payload["PlayerFilterControl"] = "AllPlayers"
+        payload.update(fields or {})
+        return browser.open(url, form=payload)
+    finally:
+        if own_pool:
+            pool.close()
 
 
-def fetch_bbm_rankings(url: str = BBM_URL) -> pd.DataFrame:
-    html = _fetch_html(url)
-    tables = pd.read_html(StringIO(html))
-    if not tables:
-        raise RuntimeError("No tables found on Basketball Monster page.")
+def parse_rankings_table(html, columns=EXPECTED_COLS, chunk_size: int = 64 * 1024) -> pd.DataFrame:
+    """
+    The rankings table from a BBM page in one streaming lxml pass.
 
-    df = tables[0].copy()
-    df.columns = [str(c).strip() for c in df.columns]
+    Rows are read as the parser reaches them, and everything before the table
+    whose header has all `columns` (matched case-insensitively) is skipped.
+    Each row is freed once it has been read, and parsing stops at the end of
+    that table. Header rows repeated inside the table are dropped. Returns
+    just `columns`, in that order.
+    """
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    wanted = {c.lower() for c in columns}
+    parser = etree.HTMLPullParser(events=("end",), encoding="utf-8")
+    header, rows = None, []
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        for _, el in parser.read_events():
+            if el.tag == "tr":
+                cells = ["".join(c.itertext()).strip() for c in el if c.tag in ("td", "th")]
+                if header is None:
+                    if wanted <= {c.lower() for c in cells}:
+                        header = cells
+                elif len(cells) == len(header) and cells != header:
+                    rows.append(cells)
+                el.clear()
+                while el.getprevious() is not None:
+                    del el.getparent()[0]
+            elif el.tag == "table" and header is not None:
+                return _rankings_frame(header, rows, columns)
+    parser.close()
+    if header is None:
+        raise RuntimeError("No rankings table found on Basketball Monster page.")
+    return _rankings_frame(header, rows, columns)
 
-    missing = [c for c in EXPECTED_COLS if c not in df.columns]
-    if missing:
-        raise RuntimeError(f"Missing expected columns: {missing}")
 
-    df = df[EXPECTED_COLS].copy()
+def _rankings_frame(header, rows, columns) -> pd.DataFrame:
+    canonical = {c.lower(): c for c in columns}
+    df = pd.DataFrame(rows, columns=[canonical.get(c.lower(), c) for c in header])
+    df = df.loc[:, ~df.columns.duplicated()][list(columns)].copy()
+    for col in columns:
+        if col not in TEXT_COLS:
+            df[col] = pd.to_numeric(df[col].str.replace(",", "", regex=False), errors="coerce")
+    df["Inj"] = df["Inj"].replace("", None)
+    return df
+
+
+def fetch_bbm_rankings(url: str = BBM_URL, fetch_html=None, fields=None, pool=None, columns=EXPECTED_COLS) -> pd.DataFrame:
+    """Rankings table from the BBM page; `fetch_html(url) -> str` replaces the network fetch (e.g. a saved page)."""
+    html = fetch_html(url) if fetch_html else _fetch_html(url, fields=fields, pool=pool)
+    df = parse_rankings_table(html, columns=columns)
     df["Name"] = df["Name"].astype(str).str.strip()
     return df
 
 
-def sync_nopunt_xlsx(output_dir: str, season_key: str, url: str = BBM_URL) -> str:
-    df = fetch_bbm_rankings(url=url)
-    if len(df) < 350:
-        raise RuntimeError(f"Expected all-players dataset (>=350 rows), got {len(df)} rows.")
+def _atomic_copy(src: str, dst: str) -> None:
+    """Copy src over dst via a temp file in dst's directory, so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst), prefix=".sync-", suffix=os.path.splitext(dst)[1])
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def sync_rankings_xlsx(output_dir: str, season_key: str, variant: str = "nopunts", url: str = BBM_URL,
+                       fetch_html=None, progress=None, pool=None, fields=None) -> str:
+    report = progress or (lambda message: None)
+    report("Fetching rankings")
+    df = fetch_bbm_rankings(url=url, fetch_html=fetch_html, fields={**VARIANTS[variant]["fields"], **(fields or {})},
+                            pool=pool, columns=VARIANTS[variant]["cols"])
+    if len(df) < MIN_ROWS:
+        raise RuntimeError(f"Expected all-players dataset (>={MIN_ROWS} rows), got {len(df)} rows.")
     os.makedirs(output_dir, exist_ok=True)
 
     # Keep a runtime copy that the app can read even when the main file is open in Excel.
-    runtime_name = _runtime_filename_for_season_key(season_key)
+    # It is written to a temp file and renamed into place, so the app never reads half a workbook.
+    report(f"Writing {len(df)} players")
+    runtime_name = _runtime_filename_for_season_key(season_key, variant)
     runtime_path = os.path.join(output_dir, runtime_name)
-    df.to_excel(runtime_path, index=False, engine="openpyxl")
+    fd, tmp = tempfile.mkstemp(dir=output_dir, prefix=".sync-", suffix=".xlsx")
+    os.close(fd)
+    try:
+        df.to_excel(tmp, index=False, engine="openpyxl")
+        os.replace(tmp, runtime_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
 
-    # Best effort: also refresh the main export file. This can fail if the file is open in Excel.
-    out_name = _filename_for_season_key(season_key)
+    # Best effort: also refresh the main export file (a byte copy; no second Excel write).
+    # This can fail if the file is open in Excel.
+    out_name = _filename_for_season_key(season_key, variant)
     out_path = os.path.join(output_dir, out_name)
     try:
-        df.to_excel(out_path, index=False, engine="openpyxl")
+        _atomic_copy(runtime_path, out_path)
     except PermissionError:
         pass
 
     return runtime_path
 
 
+def sync_nopunt_xlsx(output_dir: str, season_key: str, url: str = BBM_URL, fetch_html=None, progress=None) -> str:
+    return sync_rankings_xlsx(output_dir, season_key, "nopunts", url=url, fetch_html=fetch_html, progress=progress)
+
+
+def sync_batch(seasons, variants=("nopunts",), output_root=None, url: str = BBM_URL,
+               workers: int = SYNC_WORKERS, output_dir=None):
+    """
+    Sync every (season, variant) pair concurrently, at most `workers` at a time,
+    over one shared keep-alive connection pool. Files go to `output_dir` when
+    given, else to each variant's directory under `output_root`. Returns one
+    {"season", "variant", "path" | "error"} dict per pair, in request order.
+    """
+    output_root = output_root or os.path.dirname(__file__)
+    jobs = [(season, variant) for season in seasons for variant in variants]
+    pool = KeepAlivePool(size=workers)
+
+    def run(job):
+        season, variant = job
+        try:
+            path = sync_rankings_xlsx(
+                output_dir or os.path.join(output_root, VARIANTS[variant]["dir"]), season, variant,
+                url=url, pool=pool, fields={SEASON_FIELD: str(_season_start_year(season))},
+            )
+            return {"season": season, "variant": variant, "path": path}
+        except Exception as e:
+            return {"season": season, "variant": variant, "error": str(e)}
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="bbm-sync") as executor:
+            return list(executor.map(run, jobs))
+    finally:
+        pool.close()
+
+
 def main() -> None:
     now = datetime.now()
     default_season = _season_key_from_year(now.year)
 
-    parser = argparse.ArgumentParser(description="Sync BBM rankings into local Nopunts Excel file.")
-    parser.add_argument("--season", default=default_season, help="Season key format YY-YY (default: current season).")
+    parser = argparse.ArgumentParser(description="Sync BBM rankings into the local Nopunts/Tovpunts Excel files.")
+    parser.add_argument("--season", action="append",
+                        help="Season key format YY-YY, repeatable (default: current season).")
+    parser.add_argument("--variant", action="append", choices=sorted(VARIANTS),
+                        help="Rankings view to sync, repeatable (default: nopunts).")
     parser.add_argument(
         "--output-dir",
-        default=os.path.join(os.path.dirname(__file__), "Nopunts"),
-        help="Directory to save the generated .xlsx file."
+        help="Directory to save the generated .xlsx files (default: Nopunts/ or Tovpunts/ per variant)."
     )
     parser.add_argument("--url", default=BBM_URL, help="Basketball Monster rankings URL.")
+    parser.add_argument("--workers", type=int, default=SYNC_WORKERS, help=f"Concurrent syncs (default: {SYNC_WORKERS}).")
+    parser.add_argument("--html", help="Parse a saved rankings page instead of fetching --url (single season only).")
     args = parser.parse_args()
+    seasons = args.season or [default_season]
+    variants = args.variant or ["nopunts"]
+
+    if args.html:
+        if len(seasons) * len(variants) != 1:
+            parser.error("--html takes exactly one --season and --variant")
+
+        def fetch_html(_url):
+            with open(args.html, encoding="utf-8", errors="ignore") as f:
+                return f.read()
+
+        variant = variants[0]
+        out_path = sync_rankings_xlsx(
+            args.output_dir or os.path.join(os.path.dirname(__file__), VARIANTS[variant]["dir"]),
+            seasons[0], variant, url=args.url, fetch_html=fetch_html,
+        )
+        print(f"Synced BBM rankings to: {out_path}")
+        return
 
-    out_path = sync_nopunt_xlsx(output_dir=args.output_dir, season_key=args.season, url=args.url)
-    print(f"Synced BBM rankings to: {out_path}")
+    results = sync_batch(seasons, variants, url=args.url, workers=args.workers, output_dir=args.output_dir)
+    for r in results:
+        if "path" in r:
+            print(f"{r['season']} {r['variant']}: synced to {r['path']}")
+        else:
+            print(f"{r['season']} {r['variant']}: failed: {r['error']}")
+    if any("error" in r for r in results):
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
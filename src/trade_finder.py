@@ -0,0 +1,132 @@
+import itertools
+import time
+
+import numpy as np
+
+from scoring import category_weights, inferred_punts
+
+# (players I send, players I receive)
+TRADE_SHAPES = ((1, 1), (2, 1), (1, 2), (2, 2))
+
+
+def _packages(rows, size):
+    """All `size`-player packages from a roster as an (n, size) array of row positions."""
+    combos = list(itertools.combinations(rows.tolist(), size))
+    return np.array(combos, dtype=np.intp).reshape(len(combos), size)
+
+
+def _pareto_ranked(gain_a, gain_b, limit):
+    """
+    Up to `limit` trade indices, peeling non-dominated fronts on (gain_a, gain_b)
+    so dominated trades only appear once every better one is listed.
+    """
+    remaining = np.lexsort((-gain_b, -gain_a))
+    picked = []
+    while len(remaining) and len(picked) < limit:
+        front, rest = [], []
+        best_b = -np.inf
+        for i in remaining.tolist():
+            if gain_b[i] > best_b:
+                front.append(i)
+                best_b = gain_b[i]
+            else:
+                rest.append(i)
+        picked.extend(front)
+        remaining = np.array(rest, dtype=np.intp)
+    picked = picked[:limit]
+    return sorted(picked, key=lambda i: (-gain_a[i], -gain_b[i]))
+
+
+def search_trades(values, my_rows, opp_rows, cols, my_punts=(), limit=10, budget_s=0.25):
+    """
+    Core search over a value matrix whose columns are `cols` (NaN treated as 0).
+
+    Returns {"trades": [(send_rows, receive_rows, my_gain, opp_gain, delta)], ...}
+    with row positions rather than names, so it can run in a worker process.
+    """
+    result = {"trades": [], "evaluated": 0, "truncated": False}
+    if not len(my_rows) or not len(opp_rows) or not cols:
+        return result
+
+    my_totals = dict(zip(cols, np.nansum(values[my_rows], axis=0).tolist()))
+    opp_totals = dict(zip(cols, np.nansum(values[opp_rows], axis=0).tolist()))
+    w_me = category_weights(cols, set(my_punts), my_totals)
+    w_opp = category_weights(cols, inferred_punts(cols, opp_totals), opp_totals)
+
+    packs = {}
+    for side, rows in (("me", my_rows), ("opp", opp_rows)):
+        for size in (1, 2):
+            idx = _packages(rows, size)
+            packs[(side, size)] = (idx, np.nan_to_num(values[idx]).sum(axis=1))
+
+    started = time.perf_counter()
+    found = []
+    for send_n, recv_n in TRADE_SHAPES:
+        if time.perf_counter() - started > budget_s:
+            result["truncated"] = True
+            break
+        send_idx, send_vals = packs[("me", send_n)]
+        recv_idx, recv_vals = packs[("opp", recv_n)]
+        if not len(send_idx) or not len(recv_idx):
+            continue
+        # delta[i, j] = my category change when sending package i for package j.
+        delta = recv_vals[None, :, :] - send_vals[:, None, :]
+        gain_me = delta @ w_me
+        gain_opp = -delta @ w_opp
+        result["evaluated"] += gain_me.size
+        si, rj = np.nonzero((gain_me > 0) & (gain_opp > 0))
+        if len(si):
+            found.append((gain_me[si, rj], gain_opp[si, rj], send_idx[si], recv_idx[rj], delta[si, rj]))
+
+    if not found:
+        return result
+    g_me = np.concatenate([f[0] for f in found])
+    g_opp = np.concatenate([f[1] for f in found])
+    offsets = np.cumsum([0] + [len(f[0]) for f in found])
+    for k in _pareto_ranked(g_me, g_opp, limit):
+        part = int(np.searchsorted(offsets, k, side="right")) - 1
+        _, _, send, recv, d = found[part]
+        local = k - offsets[part]
+        result["trades"].append((
+            send[local].tolist(), recv[local].tolist(),
+            float(g_me[k]), float(g_opp[k]), d[local].tolist(),
+        ))
+    return result
+
+
+def format_trades(trades, names, cols, labels=None):
+    """Turn raw search_trades tuples into JSON/template-friendly dicts."""
+    labels = labels or {}
+    out = []
+    for send, recv, gain_me, gain_opp, d in trades:
+        delta = {labels.get(c, c): round(float(v), 2) for c, v in zip(cols, d)}
+        out.append({
+            "send": [str(names[i]) for i in send],
+            "receive": [str(names[i]) for i in recv],
+            "my_gain": round(gain_me, 2),
+            "opp_gain": round(gain_opp, 2),
+            "delta": delta,
+            "improved": [lbl for lbl, v in delta.items() if v > 0],
+            "declined": [lbl for lbl, v in delta.items() if v < 0],
+        })
+    return out
+
+
+def find_trades(ds, my_roster, opp_roster, cols, my_punts=(), labels=None, limit=10, budget_s=0.25):
+    """
+    Enumerate every 1-for-1, 2-for-1, 1-for-2 and 2-for-2 swap between two rosters.
+
+    Each side scores a trade as its category delta weighted Board-style (punts
+    zeroed, weakest categories boosted). My punts come from the form; the
+    opponent's are inferred from categories they are already losing badly. Only
+    trades that help both sides are kept; dominated trades are only listed after
+    every trade that beats them, and the final list is ordered by my gain.
+    Shapes are evaluated smallest first and enumeration stops early once
+    `budget_s` is spent.
+    """
+    my_rows, _ = ds.lookup(my_roster)
+    opp_rows, _ = ds.lookup(opp_roster)
+    values = ds.values[:, [ds.value_cols.index(c) for c in cols]]
+    result = search_trades(values, my_rows, opp_rows, cols, my_punts=my_punts, limit=limit, budget_s=budget_s)
+    result["trades"] = format_trades(result["trades"], ds.df["Name"].to_numpy(), cols, labels)
+    return result
@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from season_dataset import SeasonDataset
+
+# Value column -> per-game column it is computed from (counting categories).
+COUNTING = {"pV": "p/g", "3V": "3/g", "rV": "r/g", "aV": "a/g", "sV": "s/g", "bV": "b/g", "toV": "to/g"}
+# Value column -> (percentage column, attempts column).
+PERCENTAGE = {"fg%V": ("fg%", "fga/g"), "ft%V": ("ft%", "fta/g")}
+LOWER_IS_BETTER = {"toV"}
+
+DEFAULT_POOL_SIZE = 156  # 12 teams x 13 players
+ROUND_SIZE = 12
+POOL_ITERATIONS = 4
+CACHE_SIZE = 32
+
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _numeric(df, col):
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[col], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+
+def compute_values(df: pd.DataFrame, value_cols, punts=(), pool_size=DEFAULT_POOL_SIZE):
+    """
+    Recompute z-score values from per-game stats.
+
+    Each counting category is (x - mean) / std over the player pool (turnovers
+    negated). Percentages use impact, (pct - pool pct) * attempts, where the
+    pool pct is makes / attempts across the pool, so high-volume shooters
+    count for more. The pool is the top `pool_size` players by value for this
+    punt set, refined a few times since it depends on the values. Value is the
+    mean over the categories not punted; all columns keep their z-scores.
+
+    Returns a new frame with value_cols, Value, Rank and Round replaced and
+    rows ordered by Rank.
+    """
+    value_cols = [c for c in value_cols if c in COUNTING or c in PERCENTAGE]
+    n = len(df)
+    raw = np.zeros((n, len(value_cols)))
+    pct_parts = {}
+    for j, c in enumerate(value_cols):
+        if c in COUNTING:
+            raw[:, j] = _numeric(df, COUNTING[c])
+            if c in LOWER_IS_BETTER:
+                raw[:, j] = -raw[:, j]
+        else:
+            pct_col, att_col = PERCENTAGE[c]
+            pct_parts[j] = (_numeric(df, pct_col), _numeric(df, att_col))
+    kept = np.array([c not in set(punts) for c in value_cols])
+    pool_size = max(2, min(int(pool_size), n))
+
+    # Start from the sheet's own ranking when it has one, else from everyone.
+    if "Value" in df.columns:
+        pool = np.argsort(-_numeric(df, "Value"), kind="stable")[:pool_size]
+    else:
+        pool = np.arange(n)
+    for _ in range(POOL_ITERATIONS):
+        stats = raw.copy()
+        for j, (pct, att) in pct_parts.items():
+            made = (pct[pool] * att[pool]).sum()
+            tried = att[pool].sum()
+            stats[:, j] = (pct - (made / tried if tried > 0 else 0.0)) * att
+        mean = stats[pool].mean(axis=0)
+        std = stats[pool].std(axis=0)
+        z = (stats - mean) / np.where(std > 0, std, 1.0)
+        value = z[:, kept].mean(axis=1) if kept.any() else np.zeros(n)
+        new_pool = np.argsort(-value, kind="stable")[:pool_size]
+        if np.array_equal(np.sort(new_pool), np.sort(pool)):
+            break
+        pool = new_pool
+
+    order = np.argsort(-value, kind="stable")
+    out = df.iloc[order].reset_index(drop=True)
+    out[value_cols] = z[order]
+    out["Value"] = value[order]
+    rank = np.arange(1, n + 1)
+    out["Rank"] = rank
+    out["Round"] = (rank - 1) // ROUND_SIZE + 1
+    return out
+
+
+def punt_view(ds, value_cols, punts=(), pool_size=DEFAULT_POOL_SIZE, season=None):
+    """
+    SeasonDataset with values recomputed for `punts` and `pool_size`, served
+    from an LRU keyed by (season, dataset version, punts, pool size).
+    """
+    key = (season, ds.source, ds.version, tuple(sorted(set(punts))), int(pool_size))
+    cacheable = ds.version is not None
+    if cacheable:
+        with _CACHE_LOCK:
+            view = _CACHE.get(key)
+            if view is not None:
+                _CACHE.move_to_end(key)
+                return view
+
+    df = compute_values(ds.df, value_cols, punts=punts, pool_size=pool_size)
+    version = None if ds.version is None else f"{ds.version}:{'+'.join(key[3]) or 'nopunts'}:{key[4]}"
+    view = SeasonDataset(df, value_cols, version=version, source=ds.source)
+    if cacheable:
+        with _CACHE_LOCK:
+            _CACHE[key] = view
+            while len(_CACHE) > CACHE_SIZE:
+                _CACHE.popitem(last=False)
+    return view
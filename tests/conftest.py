@@ -0,0 +1,16 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+# Keep the app's SQLite files, headshot cache and compiled rankings out of src/:
+# these must be set before anything imports app.
+_STATE = tempfile.mkdtemp(prefix="courtcraft-tests-")
+atexit.register(shutil.rmtree, _STATE, True)
+os.environ["COURTCRAFT_DATABASE"] = os.path.join(_STATE, "users.db")
+os.environ["COURTCRAFT_HEADSHOT_DB"] = os.path.join(_STATE, "headshots.db")
+os.environ["COURTCRAFT_HEADSHOT_CACHE_DIR"] = os.path.join(_STATE, "headshots")
+os.environ["COURTCRAFT_COMPILED_DIR"] = os.path.join(_STATE, "compiled")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
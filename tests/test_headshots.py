@@ -0,0 +1,117 @@
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import headshots
+from headshots import HeadshotResolver, ImageCache, placeholder_url
+
+PLAYERS = {"nikola jokic": 246, "luka doncic": 132}
+PNG = b"\x89PNG\r\n\x1a\nstub"
+
+
+class _Stub(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        self.hits.append(url.path)
+        if url.path == "/players":
+            term = urllib.parse.parse_qs(url.query).get("search", [""])[0].lower()
+            if term == "boom":
+                self.send_error(500)
+                return
+            data = [{"id": pid, "first_name": n.split()[0].title(), "last_name": n.split()[1].title()}
+                    for n, pid in PLAYERS.items() if n == term]
+            body, ctype = json.dumps({"data": data}).encode(), "application/json"
+        elif url.path.startswith("/img/") and url.path != "/img/404.png":
+            body, ctype = PNG, "image/png"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(headshots, "CDN_URL", base + "/img/{pid}.png")
+    _Stub.hits = []
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def resolver(stub, tmp_path):
+    r = HeadshotResolver(db_path=str(tmp_path / "headshots.db"), api_url=stub + "/players", workers=2)
+    yield r
+    r.shutdown()
+
+
+def test_resolve_hit_persists_across_restarts(resolver, stub, tmp_path):
+    assert resolver.resolve("Nikola Jokic") == stub + "/img/246.png"
+    fresh = HeadshotResolver(db_path=str(tmp_path / "headshots.db"), api_url=stub + "/players")
+    assert fresh.lookup("nikola jokic") == (stub + "/img/246.png", False)
+    assert _Stub.hits == ["/players"]
+
+
+def test_miss_and_error_fall_back_to_placeholder(resolver):
+    assert resolver.resolve("Nobody Special") is None
+    assert resolver.lookup("Nobody Special") == (placeholder_url("Nobody Special"), False)
+    assert resolver.resolve("boom") is None
+    assert resolver.lookup("boom") == (placeholder_url("boom"), False)
+
+
+def test_error_keeps_serving_previous_photo(resolver, stub):
+    resolver.resolve("Luka Doncic")
+    resolver.api_url = stub + "/gone"
+    assert resolver.resolve("Luka Doncic") == stub + "/img/132.png"
+
+
+def test_lookup_queues_background_resolution(resolver, stub):
+    url, pending = resolver.lookup("Luka Doncic")
+    assert pending and url == placeholder_url("Luka Doncic")
+    resolver.shutdown()
+    assert resolver.lookup("Luka Doncic") == (stub + "/img/132.png", False)
+
+
+def test_image_cache_fetches_once(stub, tmp_path):
+    images = ImageCache(directory=str(tmp_path / "images"), max_bytes=1 << 20)
+    path, ctype, sha = images.get(stub + "/img/246.png")
+    assert ctype == "image/png" and open(path, "rb").read() == PNG
+    assert images.get(stub + "/img/246.png") == (path, ctype, sha)
+    assert _Stub.hits.count("/img/246.png") == 1
+
+
+def test_image_cache_failed_fetch_releases_lock(stub, tmp_path):
+    images = ImageCache(directory=str(tmp_path / "images"), max_bytes=1 << 20)
+    with pytest.raises(Exception):
+        images.get(stub + "/img/404.png")
+    assert images._url_locks == {}
+
+
+def test_headshots_endpoint_only_queues_known_players(resolver, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, "HEADSHOTS", resolver)
+    known = app.load_all_player_names(sorted(app.data_files)[-1])[0]
+    client = app.app.test_client()
+    out = client.post("/headshots", json={"names": ["Not A Player 123"]}).get_json()
+    assert out["Not A Player 123"].endswith("v=" + app.url_version(placeholder_url("Not A Player 123")))
+    assert resolver._pending == set()
+    client.post("/headshots", json={"names": [known]})
+    assert resolver._pending == {known.lower()}
+    resp = client.get("/headshot/Not%20A%20Player%20123")
+    assert resp.status_code == 302 and resp.headers["Location"] == placeholder_url("Not A Player 123")
@@ -0,0 +1,99 @@
+import os
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+import sync_bbm_rankings as sync
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class _SavedBBM(BaseHTTPRequestHandler):
+    """Serves saved BBM pages the way the site does: GET sets the session cookie, the postback picks the view."""
+    protocol_version = "HTTP/1.1"
+    posts = []
+
+    def _send(self, body, cookie=False):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if cookie:
+            self.send_header("Set-Cookie", "ASP.NET_SessionId=stub; path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(_fixture("bbm_nopunt.html"), cookie=True)
+
+    def do_POST(self):
+        form = urllib.parse.parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        form = {k: v[0] for k, v in form.items()}
+        if "ASP.NET_SessionId=stub" not in (self.headers.get("Cookie") or "") or "__VIEWSTATE" not in form:
+            self.send_error(400)
+            return
+        self.posts.append(form)
+        self._send(_fixture("bbm_tovpunt.html" if form.get("PuntTOCheckBox") == "on" else "bbm_nopunt.html"))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def bbm(monkeypatch):
+    monkeypatch.setattr(sync, "MIN_ROWS", 10)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SavedBBM)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _SavedBBM.posts = []
+    yield f"http://127.0.0.1:{server.server_address[1]}/playerrankings.aspx"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("fixture,variant", [("bbm_nopunt.html", "nopunts"), ("bbm_tovpunt.html", "tovpunt")])
+def test_parse_keeps_variant_columns(fixture, variant):
+    df = sync.parse_rankings_table(_fixture(fixture), columns=sync.VARIANTS[variant]["cols"])
+    assert list(df.columns) == sync.VARIANTS[variant]["cols"]
+    assert len(df) == 12 and df["Name"].iloc[0] == "Nikola Jokic"
+    assert df["Rank"].tolist() == sorted(df["Rank"].tolist())
+
+
+def test_parse_rejects_page_without_table():
+    with pytest.raises(RuntimeError, match="No rankings table"):
+        sync.parse_rankings_table(_fixture("bbm_nopunt.html"), columns=sync.PUNT_COLS)
+
+
+def test_batch_sync_end_to_end(bbm, tmp_path):
+    results = sync.sync_batch(["24-25", "23-24"], ("nopunts", "tovpunt"), output_root=str(tmp_path), url=bbm, workers=2)
+    assert [("path" in r, r["season"], r["variant"]) for r in results] == [
+        (True, "24-25", "nopunts"), (True, "24-25", "tovpunt"), (True, "23-24", "nopunts"), (True, "23-24", "tovpunt"),
+    ]
+    assert sorted((p["SeasonDropDownList"], p.get("PuntTOCheckBox", "")) for p in _SavedBBM.posts) == [
+        ("2023", ""), ("2023", "on"), ("2024", ""), ("2024", "on"),
+    ]
+    for r in results:
+        variant = sync.VARIANTS[r["variant"]]
+        assert os.path.dirname(r["path"]) == str(tmp_path / variant["dir"])
+        assert os.path.basename(r["path"]) == sync._runtime_filename_for_season_key(r["season"], r["variant"])
+        df = pd.read_excel(r["path"])
+        assert list(df.columns) == variant["cols"] and len(df) == 12
+        export = os.path.join(os.path.dirname(r["path"]), sync._filename_for_season_key(r["season"], r["variant"]))
+        assert os.path.exists(export)
+    tov = pd.read_excel(tmp_path / "Tovpunts" / sync._runtime_filename_for_season_key("24-25", "tovpunt"))
+    assert tov["LeagV"].notna().all() and tov["PuntV"].notna().all()
+
+
+def test_app_registers_synced_files(bbm, tmp_path):
+    import app
+
+    sync.sync_batch(["24-25"], ("tovpunt",), output_root=str(tmp_path), url=bbm)
+    files = app._synced_data_files(app.data_files, root=str(tmp_path))
+    assert files["24-25"]["tovpunt"] == sync._runtime_filename_for_season_key("24-25", "tovpunt")
+    assert files["24-25"]["nopunts"] == app.data_files["24-25"]["nopunts"]